@@ -7,9 +7,17 @@ func_heuristic(state):              Function for estimating the remainding cost
 func_adjacent_states(state):         Function for generating the successing nodes for a given state.
 func_goal_evaluate(state):          Function returns True if the state is the goal, else False.
 func_cost(state, next_state):       Function returning the cost of going from one state to another. Set to 1 by default.
+priority_order:                     Class used for the open list. By default a BucketPriorityOrder is used as long as
+                                    all f-costs are integers close enough to each other for
+                                    its max_buckets, and an IndexedMinPriorityOrder otherwise.
 
 Behavour:
-Only run() should be called. It returns a path of nodes.
+Only run() should be called. It returns a path of nodes. With run(lazy=True) it returns a generator giving the states on
+the path from the start to the goal instead, without making a list of nodes.
+step(max_expansions=1) and run_until(deadline) run the same search a part at a time, for programs like a game loop that
+can not wait for the whole search. They return IN_PROGRESS, FOUND or FAILED, and the open nodes and the node map are kept
+between the calls. path(lazy=False) gives the path when the status is FOUND.
+expand(node) generates the successors of one node, for searches that choose the order of the expansions themselves.
 """
 #*************************
 # Global static variables
@@ -19,34 +27,53 @@ verbose = False  # Should be used during debugging.
 #*************************
 #        Imports
 #*************************
-from MinPriorityOrder import MinPriorityOrder
+import time
+from math import inf
+
+from IndexedMinPriorityOrder import IndexedMinPriorityOrder
+from BucketPriorityOrder import BucketPriorityOrder, is_integral
 
 
 #*************************
 #    Class for nodes
 #*************************
+
+# Status flags telling which list a node is in.
+NEW = 0
+OPEN = 1
+CLOSED = 2
+
 class Node():
 
+    # The attributes are kept in slots instead of a dict on every node, which saves memory when there are many nodes.
+    __slots__ = ('state', 'g_cost', 'h_cost', 'f_cost', 'parent', 'successors', 'status')
+
 # Constructor
-    def __init__(self, state, g_cost=None, h_cost=None, f_cost=None, parent=None, successors=None):
+    def __init__(self, state, g_cost=None, h_cost=None, f_cost=None, parent=None, successors=None, status=NEW):
 
         self.state = state
         self.g_cost = g_cost
         self.h_cost = h_cost
         self.f_cost = f_cost
         self.parent = parent
-        self.successors = successors if successors else []
+        self.successors = tuple(successors) if successors else ()
+        self.status = status
 
 
 #*************************
 # A* algorithm as a class
 #*************************
 
+# Status of a search run a part at a time.
+IN_PROGRESS = 'in progress'
+FOUND = 'found'
+FAILED = 'failed'
+
 # Method for running the algoritm.
 class AStar():
 
 # Constructor to take in all functions and states.
-    def __init__(self, start_state, func_heuristic, func_adjacent_states, func_goal_evaluate, func_cost=lambda x, y: 1):
+    def __init__(self, start_state, func_heuristic, func_adjacent_states, func_goal_evaluate, func_cost=lambda x, y: 1, priority_order=None):
 
         # Functions to be saved and used during the algorithm.
         self.func_heuristic = func_heuristic
@@ -54,59 +81,28 @@ class AStar():
         self.func_goal_evaluate = func_goal_evaluate
         self.func_cost = func_cost
 
-        # Make the open nodes as a min priority order
+        # Map every state to its corresponding node. This gives a overview of what nodes exists, and together with the
+        # status flag on every node it answers whether a state is open or closed in constant time.
+        self.state_node_map = {}
+
+        # Make the open nodes as a min priority order. Nodes can be moved in it when their cost is lowered.
+        self.priority_order = priority_order
         self.open = self.initiate_priority_order(start_state)
 
-        # The closed once does not need a specific order.
+        # The closed once does not need a specific order. Membership is given by the status flag, not by this list.
         self.closed = []
 
-        # Map every state to its corresponding node. This gives a overview of what nodes exists.
-        self.state_node_map = {}
+        # The status of the search, and the goal node once it is found.
+        self.status = IN_PROGRESS
+        self.goal_node = None
 
     # Method for runing the actual algorithm
-    def run(self):
-
-        # Loop to be executed until all nodes are explored or a solution is found.
-        while self.open.size():
-
-            # Takes the first node in open, and puts it in close.
-            current_node = self.open.pop()
-            if verbose: print('pop id: ', current_node.state)
-            self.closed.append(current_node)
+    def run(self, lazy=False):
 
-            # If this node is the answer, it should return all the parents as well as it self.
-            if self.func_goal_evaluate(current_node.state):
-                print("Path found!")
-                return  self.find_path(current_node)
-
-            # Make a list of all possible successor states, make them into nodes, and loop through them.
-            adjacent_states = self.func_adjacent_states(current_node.state)
-            adjacent_nodes = self.create_nodes(adjacent_states)
-
-            for adjacent_node in adjacent_nodes:
-
-                # If a node with the same state has been made before we should use the old one.
-                if adjacent_node.state in self.state_node_map.keys():
-                    adjacent_node = self.state_node_map[adjacent_node.state]
-                
-                # Add the adjacent node to the current nodes successors.
-                current_node.successors.append(adjacent_node)
-
-                # If the node is new it needs to get its costs and parent initiated. In addition it should be added to the mapping.
-                if adjacent_node.state not in self.state_node_map.keys():
-                    self.attach_and_eval(adjacent_node, current_node)
-                    if verbose: print('push id:', adjacent_node.state)
-                    self.open.push(adjacent_node)
-                    self.state_node_map[adjacent_node.state] = adjacent_node
-                
-                # If the adjacent node existed before current node was expanded from, and the path to the adjacent node will be shorter
-                # through the current node, adjacent node should be updated with new parent and costs.
-                elif (current_node.g_cost + self.func_cost(current_node.state, adjacent_node.state)) < adjacent_node.g_cost:
-                    self.attach_and_eval(adjacent_node, current_node)
-
-                    # If the node has children, the children should also be updated.
-                    if adjacent_node in self.closed:
-                        self.propagate_path_improvements(adjacent_node)
+        # If the goal is found, it should return all the parents as well as it self.
+        if self.step(None) == FOUND:
+            print("Path found!")
+            return  self.find_path(self.goal_node, lazy)
 
         # If no solution was found this is printed.
         print("No solution was found.")
@@ -119,40 +115,162 @@ class AStar():
                 pass
         return 
 
+    # Method for expanding at most max_expansions nodes, or all of them if it is None. The search goes on from where the
+    # last call stopped, and the status is returned.
+    def step(self, max_expansions=1):
+        if self.status != IN_PROGRESS:
+            return self.status
+        remaining = inf if max_expansions is None else max_expansions
+
+        # Loop to be executed until all nodes are explored, a solution is found, or the expansions are used up.
+        while remaining > 0 and self.open.size():
+            remaining -= 1
+
+            # Takes the first node in open, and puts it in close.
+            current_node = self.open.pop()
+            if verbose: print('pop id: ', current_node.state)
+            current_node.status = CLOSED
+            self.closed.append(current_node)
+
+            # If this node is the answer, the search is done.
+            if self.func_goal_evaluate(current_node.state):
+                self.goal_node = current_node
+                self.status = FOUND
+                return self.status
+
+            self.expand(current_node)
+
+        if not self.open.size():
+            self.status = FAILED
+        return self.status
+
+    # Method for expanding nodes until time.perf_counter() has passed the deadline. At least one node is expanded every
+    # call, so the search always moves on.
+    def run_until(self, deadline):
+        status = self.step(1)
+        while status == IN_PROGRESS and time.perf_counter() < deadline:
+            status = self.step(1)
+        return status
+
+    # Returns the path found by step or run_until, or None if the status is not FOUND.
+    def path(self, lazy=False):
+        return self.find_path(self.goal_node, lazy) if self.status == FOUND else None
+
+    # Generates the successors of a node, and opens them or gives them a cheaper path through the node. The successors
+    # are kept on the node as a tuple, which is smaller than a list, and returned.
+    def expand(self, current_node):
+        successors = []
+
+        # Loop through all possible successor states.
+        for adjacent_state in self.func_adjacent_states(current_node.state):
+
+            # If a node with the same state has been made before we should use the old one.
+            adjacent_node = self.state_node_map.get(adjacent_state)
+            is_new = adjacent_node is None
+            if is_new:
+                adjacent_node = Node(adjacent_state)
+
+            # Add the adjacent node to the current nodes successors.
+            successors.append(adjacent_node)
+
+            # If the node is new it needs to get its costs and parent initiated. In addition it should be added to the mapping.
+            if is_new:
+                self.attach_and_eval(adjacent_node, current_node)
+                if verbose: print('push id:', adjacent_node.state)
+                self.push_open(adjacent_node)
+                adjacent_node.status = OPEN
+                self.state_node_map[adjacent_state] = adjacent_node
+
+            # If the adjacent node existed before current node was expanded from, and the path to the adjacent node will be shorter
+            # through the current node, adjacent node should be updated with new parent and costs.
+            elif (current_node.g_cost + self.func_cost(current_node.state, adjacent_node.state)) < adjacent_node.g_cost:
+                self.attach_and_eval(adjacent_node, current_node)
+
+                # If the node has children, the children should also be updated.
+                if adjacent_node.status == CLOSED:
+                    self.propagate_path_improvements(adjacent_node)
+
+        current_node.successors = tuple(successors)
+        return current_node.successors
+
+    # Returns True if a node with the given state is waiting in open.
+    def is_open(self, state):
+        node = self.state_node_map.get(state)
+        return node is not None and node.status == OPEN
+
+    # Returns True if a node with the given state has been expanded.
+    def is_closed(self, state):
+        node = self.state_node_map.get(state)
+        return node is not None and node.status == CLOSED
+
 
 # Helping methods
 
-    # Initiates the min priority order with the first node.
+    # Initiates the min priority order with the first node. Without a given class the bucket queue is tried first.
     def initiate_priority_order(self, start_state):
         if verbose: print('initiate with start state:', start_state)
-        return MinPriorityOrder(lambda node: node.f_cost, Node(state=start_state, g_cost=0, h_cost=self.func_heuristic(start_state)))
-
-    # Return the desired outcome from the A* algorithm.
-    def find_path(self, node):
-        if node.parent is None: # Base case
-            return [node]
-        return self.find_path(node.parent) + [node] # Recurevly calls on it self.
-
-    # Creates nodes for all states supplied.
-    def create_nodes(self, states):
-        new_nodes = []
-        for state in states:
-            new_nodes.append(Node(state))
-        return new_nodes
-
-    # Method for setting costs and paret for a new node.
+        h_cost = self.func_heuristic(start_state)
+        start_node = Node(state=start_state, g_cost=0, h_cost=h_cost, f_cost=h_cost, status=OPEN)
+        self.state_node_map[start_state] = start_node
+        if self.priority_order is not None:
+            return self.priority_order(lambda node: node.f_cost, start_node)
+        if is_integral(h_cost):
+            return BucketPriorityOrder(lambda node: node.f_cost, start_node)
+        return IndexedMinPriorityOrder(lambda node: node.f_cost, start_node)
+
+    # Pushes a node in open, or moves it if it is allready there. If the bucket queue was chosen automatically and gets
+    # a cost that is not an integer, or so far from the others that it would need too many buckets, all open nodes are
+    # moved to a heap.
+    def push_open(self, node):
+        try:
+            self.open.push(node)
+        except (TypeError, OverflowError):
+            if self.priority_order is not None:
+                raise
+            if verbose: print('Non integer cost or too many buckets, open is changed to a heap.')
+            self.open = IndexedMinPriorityOrder(self.open.meth_sorting_value, *self.open.elements())
+            self.open.push(node)
+
+    # Return the desired outcome from the A* algorithm. The parents are followed in a loop, so long paths do not hit
+    # the recursion limit. If lazy is True the states are given one at a time instead.
+    def find_path(self, node, lazy=False):
+        if lazy:
+            return self.iter_path(node)
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        return path
+
+    # Generator giving the states on the path from the start to the node. Only the states are kept, not the nodes.
+    def iter_path(self, node):
+        states = []
+        while node is not None:
+            states.append(node.state)
+            node = node.parent
+        while states:
+            yield states.pop()
+
+    # Method for setting costs and paret for a new node. If the node is allready open it is moved in the order.
     def attach_and_eval(self, node, parent):
         node.parent = parent
-        node.g_cost = parent.g_cost + self.func_cost(node.state, parent.state)
+        node.g_cost = parent.g_cost + self.func_cost(parent.state, node.state)
         node.h_cost = self.func_heuristic(node.state)
         node.f_cost = node.g_cost + node.h_cost
+        if node.status == OPEN:
+            self.push_open(node)
 
-    # Mehtod for updating path of successors after its parent got its cost updated.
+    # Mehtod for updating path of successors after its parent got its cost updated. The nodes still to be checked are
+    # kept on a stack instead of recursing.
     def propagate_path_improvements(self, parent_node):
-        for successor in parent_node.successors:
-            if successor.g_cost > (parent_node.g_cost + self.func_cost(parent_node.state, successor.state)):
-                self.attach_and_eval(successor, parent_node)
-                self.propagate_path_improvements(successor)
+        stack = [parent_node]
+        while stack:
+            parent_node = stack.pop()
+            for successor in parent_node.successors:
+                if successor.g_cost > (parent_node.g_cost + self.func_cost(parent_node.state, successor.state)):
+                    self.attach_and_eval(successor, parent_node)
+                    stack.append(successor)
 
 
 
@@ -200,5 +318,43 @@ def func_test():
         id_path.append(node.state)
     print('Got:', id_path)
 
+    # A path far longer than the recursion limit, where every state improves the one after it.
+    length = 100000
+    a_star = AStar(0, lambda x: 0, lambda x: [x + 1] if x < length else [], lambda x: x == length)
+    print('Long path found:', [node.state for node in a_star.run()] == list(range(length + 1)))
+    a_star = AStar(0, lambda x: 0, lambda x: [x + 1] if x < length else [], lambda x: x == length)
+    print('Lazy path gives the states in order:', list(a_star.run(lazy=True)) == list(range(length + 1)))
+
+    # Two ways to state 2, where the cheaper is found after 2 and the states after it are expanded. The improvement
+    # should be passed down the whole chain.
+    graph = {0: {1: 1, 2: 5}, 1: {2: 1}, 2: {3: 1}, 3: {4: 1}, 4: {5: 1}, 5: {}}
+    expansion_order = [0, 2, 3, 4, 1]
+    a_star = AStar(0, lambda x: 0, lambda x: list(graph[x]), lambda x: False, lambda x, y: graph[x][y])
+    for state in expansion_order:
+        node = a_star.state_node_map[state]
+        node.status = CLOSED
+        a_star.expand(node)
+    print('Improvements passed on:', [a_star.state_node_map[state].g_cost for state in range(6)] == [0, 1, 2, 3, 4, 5])
+
+    # Integer costs in the millions would need millions of buckets, so open has to be changed to a heap.
+    graph = {0: {1: 5000000, 2: 5000003}, 1: {3: 5000007}, 2: {3: 4999999}, 3: {}}
+    a_star = AStar(0, lambda x: 0, lambda x: list(graph[x]), lambda x: x == 3, lambda x, y: graph[x][y])
+    start = time.perf_counter()
+    node_path = a_star.run()
+    print('Large integer costs, path:', [node.state for node in node_path], 'cost:', node_path[-1].g_cost,
+          'open is a heap:', isinstance(a_star.open, IndexedMinPriorityOrder),
+          'ms: {:.1f}'.format(1e3 * (time.perf_counter() - start)))
+
+    # The same search a few expansions at a time gives the same path as run, and a search without a path fails.
+    a_star = AStar(1, level, lambda x: dic_graph[x], lambda x: x == 12)
+    statuses = [a_star.step(2)]
+    while statuses[-1] == IN_PROGRESS:
+        statuses.append(a_star.step(2))
+    print('Stepped path:', [node.state for node in a_star.path()], 'calls:', len(statuses), 'status:', statuses[-1])
+    a_star = AStar(0, lambda x: 0, lambda x: [x + 1] if x < 1000 else [], lambda x: False)
+    past_deadline = a_star.run_until(time.perf_counter() - 1)
+    print('Past the deadline one node is expanded:', past_deadline == IN_PROGRESS and len(a_star.closed) == 1,
+          'status without a path:', a_star.run_until(time.perf_counter() + 10), 'path:', a_star.path())
+
 if __name__ == "__main__":
     func_test()
\ No newline at end of file
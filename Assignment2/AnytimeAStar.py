@@ -0,0 +1,211 @@
+"""
+Contains anytime repairing A* (ARA*), which gives a path quickly and then better paths as long as there is time.
+
+The nodes are sorted by g + weight * h. With a weight above 1 the search goes more directly towards the goal and finds a
+path after few expansions, but the path can cost up to weight times the shortest. When a path is found the weight is
+lowered and the search goes on with the nodes it allready has. A node that gets a cheaper path after it has been
+expanded in the current round is put in a list of inconsistent nodes instead of open, and opened again in the next round.
+Every round therefore only expands the nodes whose costs changed.
+
+After every round the path and a bound on how far it can be from the shortest are given. The bound is the cost of the
+path divided by the smallest g + h among the nodes that are open or inconsistent, since every cheaper path has to go
+through one of them. The heuristic has to be consistent for the bound to hold.
+
+AnytimeAStar is an AStar, and takes the same input, and:
+initial_weight:                     The weight on the heuristic in the first round.
+weight_step:                        How much the weight is lowered after every round. The last round always uses 1.
+
+Behaviour:
+paths(time_budget=None):            Generator giving (path, bound) after every round that finds a cheaper path or a
+                                    tighter bound. The path is a list of states. Stops when the path is the shortest,
+                                    or when time_budget seconds have passed. The first round is always finished, so
+                                    there is a path if one exists.
+run(time_budget=None):              Returns the last path from paths, like AStar.run but as states.
+cost:                               Cost of the last path given.
+bound:                              The bound of the last path given.
+expansions:                         Amount of nodes expanded in all the rounds.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+import time
+
+from AStar import AStar, Node, NEW, OPEN, CLOSED
+from IndexedMinPriorityOrder import IndexedMinPriorityOrder
+from BucketPriorityOrder import BucketPriorityOrder, is_integral
+
+
+#*************************
+#     ARA* as a class
+#*************************
+class AnytimeAStar(AStar):
+
+# Constructor sets up the search like AStar, with the first weight on the heuristic.
+    def __init__(self, start_state, func_heuristic, func_adjacent_states, func_goal_evaluate, func_cost=lambda x, y: 1,
+                 priority_order=None, initial_weight=3, weight_step=0.5):
+
+        self.weight = initial_weight
+        self.weight_step = weight_step
+        AStar.__init__(self, start_state, func_heuristic, func_adjacent_states, func_goal_evaluate, func_cost,
+                       priority_order)
+        # Nodes that got a cheaper path after being expanded in this round.
+        self.incons = {}
+        self.goal_node = None
+        self.cost = None
+        self.bound = None
+        self.expansions = 0
+
+    # Generator giving a path and its bound after every round.
+    def paths(self, time_budget=None):
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        while True:
+            finished = self.improve_path(deadline if self.goal_node is not None else None)
+            if self.goal_node is None:
+                print("No solution was found.")
+                return
+            if not finished:
+                return
+
+            # A round can end without a cheaper path or a tighter bound, and is then not given.
+            bound = float(self.find_bound())
+            if verbose: print('Weight', self.weight, 'cost', self.goal_node.g_cost, 'bound', bound)
+            if self.cost is None or self.goal_node.g_cost < self.cost or bound < self.bound:
+                self.cost, self.bound = self.goal_node.g_cost, bound
+                yield list(self.iter_path(self.goal_node)), bound
+            if bound <= 1 or self.weight == 1:
+                return
+            self.next_round()
+
+    # Runs paths until it stops, and returns the last path.
+    def run(self, time_budget=None):
+        path = None
+        for path, bound in self.paths(time_budget):
+            pass
+        return path
+
+
+# Helping methods
+
+    # Expands nodes until no open node can give a cheaper path to the goal with the current weight. Returns False if
+    # the deadline was reached first.
+    def improve_path(self, deadline=None):
+        while self.open.size():
+            if self.goal_node is not None and self.goal_node.g_cost <= self.open.peek().f_cost:
+                return True
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            current_node = self.open.pop()
+            if verbose: print('pop id: ', current_node.state)
+            current_node.status = CLOSED
+            self.closed.append(current_node)
+            self.expansions += 1
+            if self.func_goal_evaluate(current_node.state):
+                if self.goal_node is None or current_node.g_cost < self.goal_node.g_cost:
+                    self.goal_node = current_node
+                continue
+            self.expand(current_node)
+        return True
+
+    # Gives the successors of a node a cheaper path through it. Nodes expanded in this round are put in incons.
+    def expand(self, current_node):
+        for adjacent_state in self.func_adjacent_states(current_node.state):
+            adjacent_node = self.state_node_map.get(adjacent_state)
+            if adjacent_node is None:
+                adjacent_node = Node(adjacent_state)
+                self.state_node_map[adjacent_state] = adjacent_node
+            new_cost = current_node.g_cost + self.func_cost(current_node.state, adjacent_state)
+            if adjacent_node.g_cost is not None and new_cost >= adjacent_node.g_cost:
+                continue
+            self.attach_and_eval(adjacent_node, current_node)
+            if self.func_goal_evaluate(adjacent_state) and \
+                    (self.goal_node is None or adjacent_node.g_cost < self.goal_node.g_cost):
+                self.goal_node = adjacent_node
+            if adjacent_node.status == CLOSED:
+                self.incons[adjacent_state] = adjacent_node
+            elif adjacent_node.status == NEW:
+                adjacent_node.status = OPEN
+                self.push_open(adjacent_node)
+
+    # Sets the costs and parent of a node, with the heuristic weighted.
+    def attach_and_eval(self, node, parent):
+        node.parent = parent
+        node.g_cost = parent.g_cost + self.func_cost(parent.state, node.state)
+        node.h_cost = self.func_heuristic(node.state)
+        node.f_cost = node.g_cost + self.weight * node.h_cost
+        if node.status == OPEN:
+            self.push_open(node)
+
+    # The cost of the path divided by a lower bound on the shortest path, but never more than the weight.
+    def find_bound(self):
+        lowest = min((node.g_cost + node.h_cost for node in self.open_nodes() + list(self.incons.values())),
+                     default=self.goal_node.g_cost)
+        if lowest >= self.goal_node.g_cost:
+            return 1
+        return min(self.weight, self.goal_node.g_cost / lowest)
+
+    # Lowers the weight, opens the inconsistent nodes and sorts open again. Closed nodes may be expanded again.
+    def next_round(self):
+        self.weight = max(1, self.weight - self.weight_step)
+        for node in self.closed:
+            if node.status == CLOSED:
+                node.status = NEW
+        for node in self.incons.values():
+            node.status = OPEN
+            self.push_open(node)
+        self.incons = {}
+        self.closed = []
+
+        # The new f-costs may no longer be integers, so the order is made again like in initiate_priority_order.
+        nodes = self.open_nodes()
+        for node in nodes:
+            node.f_cost = node.g_cost + self.weight * node.h_cost
+        if self.priority_order is not None:
+            self.open = self.priority_order(lambda node: node.f_cost, *nodes)
+        elif all(is_integral(node.f_cost) for node in nodes):
+            self.open = BucketPriorityOrder(lambda node: node.f_cost, *nodes)
+        else:
+            self.open = IndexedMinPriorityOrder(lambda node: node.f_cost, *nodes)
+
+    # The nodes in open.
+    def open_nodes(self):
+        return [node for node in self.state_node_map.values() if node.status == OPEN]
+
+
+
+#*************************
+#         Test
+#*************************
+import Part1and2
+from Map import Map_Obj
+
+# Checks that the paths get cheaper, stay within their bounds, and end with the shortest path. With no time the search
+# should still give the first path.
+def func_test():
+    for task in (3, 4):
+        map_obj = Map_Obj(task)
+        start_state = (map_obj, *map_obj.get_start_pos())
+        a_star = AStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                       Part1and2.goal_evaluate, Part1and2.find_cost)
+        shortest = a_star.run()[-1].g_cost
+        anytime = AnytimeAStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                               Part1and2.goal_evaluate, Part1and2.find_cost)
+        rounds = []
+        for path, bound in anytime.paths():
+            cost = sum(Part1and2.find_cost(a, b) for a, b in zip(path[:-1], path[1:]))
+            rounds.append((cost, bound, anytime.expansions))
+        print('Task', task, 'rounds (cost, bound, expansions):', rounds, 'shortest:', shortest)
+        print('Within bounds:', all(cost <= bound * shortest + 1e-9 for cost, bound, expansions in rounds),
+              'costs never increase:', all(a[0] >= b[0] for a, b in zip(rounds[:-1], rounds[1:])),
+              'ends with shortest:', rounds[-1][0] == shortest and rounds[-1][1] == 1)
+
+        anytime = AnytimeAStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                               Part1and2.goal_evaluate, Part1and2.find_cost)
+        print('Paths with no time:', len(list(anytime.paths(time_budget=0))))
+
+if __name__ == "__main__":
+    func_test()
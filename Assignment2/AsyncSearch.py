@@ -0,0 +1,110 @@
+"""
+Contains searches run a slice at a time on an asyncio event loop, so many searches can share one thread with the rest
+of a program, like the frames of a game loop, without any of them blocking it.
+
+Every search is an AStar, run with step or run_until. After every slice the coroutine awaits asyncio.sleep(0), which
+lets the event loop run the other searches and tasks before the search goes on. A slice is an amount of expansions, or
+an amount of seconds if slice_seconds is given. The searches are not run in parallel, only taking turns, so the time of
+the longest slice is the longest the loop is kept waiting. A slice can take longer than slice_seconds when the garbage
+collector of python runs during it, which on large maps with many nodes can take far longer than the slice itself.
+
+Behaviour:
+search_async(search, max_expansions=100, slice_seconds=None, lazy=False):
+                                    Coroutine running the search a slice at a time. Returns the path like AStar.run, or
+                                    None if there is no path.
+run_searches(searches, max_expansions=100, slice_seconds=None, lazy=False):
+                                    Runs the searches taking turns on a new event loop, and returns their paths in the
+                                    same order as the searches.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+import asyncio
+import time
+
+from AStar import IN_PROGRESS
+
+
+#*************************
+#       Functions
+#*************************
+
+# Runs the search a slice at a time, and gives the event loop to the other tasks between the slices.
+async def search_async(search, max_expansions=100, slice_seconds=None, lazy=False):
+    status = IN_PROGRESS
+    while status == IN_PROGRESS:
+        if slice_seconds is None:
+            status = search.step(max_expansions)
+        else:
+            status = search.run_until(time.perf_counter() + slice_seconds)
+        if verbose: print('Slice done, status:', status, 'expanded:', len(search.closed))
+        await asyncio.sleep(0)
+    return search.path(lazy)
+
+# Runs all the searches on one event loop.
+def run_searches(searches, max_expansions=100, slice_seconds=None, lazy=False):
+    async def run_all():
+        return await asyncio.gather(*(search_async(search, max_expansions, slice_seconds, lazy) for search in searches))
+    return asyncio.run(run_all())
+
+
+
+#*************************
+#         Test
+#*************************
+import numpy as np
+
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+
+# Makes an AStar from start_pos to goal_pos on its own copy of the map, since the goal is read from the map.
+def make_search(int_map, start_pos, goal_pos):
+    map_obj = Map_Obj.from_int_map(int_map, start_pos, goal_pos)
+    return AStar((map_obj, *start_pos), Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                 Part1and2.goal_evaluate, Part1and2.find_cost)
+
+# Checks that the searches taking turns give the same paths as run, and that a frame counter on the same loop keeps
+# ticking while they run.
+def func_test():
+    map_obj = Map_Obj(4)
+    rng = np.random.default_rng(0)
+    free = np.argwhere(map_obj.int_map != -1).tolist()
+    queries = [(free[rng.integers(len(free))], free[rng.integers(len(free))]) for i in range(10)]
+    expected = []
+    for start_pos, goal_pos in queries:
+        node_path = make_search(map_obj.int_map, start_pos, goal_pos).run()
+        expected.append(None if node_path is None else [node.state[1:] for node in node_path])
+
+    for setting, options in (('50 expansions', dict(max_expansions=50)), ('0.5 ms', dict(slice_seconds=0.0005))):
+        searches = [make_search(map_obj.int_map, start_pos, goal_pos) for start_pos, goal_pos in queries]
+        frames = []
+
+        async def frame_loop(tasks):
+            while not all(task.done() for task in tasks):
+                frames.append(time.perf_counter())
+                await asyncio.sleep(0)
+
+        async def run_with_frames():
+            tasks = [asyncio.ensure_future(search_async(search, **options)) for search in searches]
+            await frame_loop(tasks)
+            return [task.result() for task in tasks]
+
+        paths = asyncio.run(run_with_frames())
+        same = [None if path is None else [node.state[1:] for node in path] for path in paths] == expected
+        longest = max(np.diff(frames)) if len(frames) > 1 else 0
+        print('Slices of', setting, 'same paths:', same, 'frames:', len(frames),
+              'longest frame ms: {:.2f}'.format(1e3 * longest))
+
+    paths = run_searches([make_search(map_obj.int_map, start_pos, goal_pos) for start_pos, goal_pos in queries],
+                         lazy=True)
+    print('run_searches same paths:', [None if path is None else [state[1:] for state in path] for path in paths]
+          == expected)
+
+if __name__ == "__main__":
+    func_test()
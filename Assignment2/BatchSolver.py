@@ -0,0 +1,181 @@
+"""
+Contains a solver for many (start, goal) queries on the same map, spread over a pool of processes.
+
+Solving every query with its own Map_Obj reads the csv file and builds the map again each time. BatchSolver takes a map
+that is allready loaded and writes its padded costs, the array GridAStar searches, once into a block of shared memory.
+Every worker process attaches to the block when it starts, and builds a Map_Obj and a GridAStar that read the block
+without copying it. The map is therefore kept once for all the workers, and is never sent with the queries. Only the
+positions go to the workers, and only the paths and costs come back. What every worker keeps on its own are the arrays
+of the search itself, the g-costs, parents and closed flags.
+
+The queries are handed out with Pool.imap, so the results come back in the same order as the queries, and the first
+results can be used while the rest are still being solved. The queries are sent in chunks of chunksize to keep the
+overhead per query low.
+
+BatchSolver takes the following input:
+map_obj:                            The Map_Obj to solve the queries on.
+diagonal:                           If True diagonal moves are allowed, like in GridAStar.
+processes:                          Amount of worker processes. All the cores are used by default.
+chunksize:                          Amount of queries sent to a worker at a time.
+
+Behaviour:
+solve(queries):                     Generator giving (path, cost) for every (start_pos, goal_pos) in queries, in the same
+                                    order. The path is a list of positions [x, y], and both are None if there is no path.
+run(queries):                       Returns the results of solve as a list.
+close(terminate=False):             Stops the workers and frees the shared memory. Also done when used in a with block.
+                                    The workers are stopped at once if terminate is True, if a solve was not read to
+                                    the end, or if the with block ends with an exception. Otherwise they finish first.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+import contextlib
+import io
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from Map import Map_Obj
+from GridAStar import GridAStar, pad_costs
+
+# The map and search of a worker process, set by attach_map when the worker starts.
+worker_memory = None
+worker_grid = None
+
+
+#*************************
+#  Batch solver as class
+#*************************
+class BatchSolver():
+
+# Constructor puts the map in shared memory and starts the workers.
+    def __init__(self, map_obj, diagonal=False, processes=None, chunksize=16):
+
+        shape = np.shape(map_obj.int_map)
+        self.chunksize = chunksize
+        self.pool = None
+        # Amount of calls to solve whose results have not all been read.
+        self.unfinished = 0
+        self.shared_memory = shared_memory.SharedMemory(create=True, size=(shape[0] + 2) * (shape[1] + 2) * 8)
+        # The block is freed again if the workers can not be started.
+        try:
+            pad_costs(map_obj.int_map, np.ndarray((shape[0] + 2) * (shape[1] + 2), dtype=np.int64,
+                                                  buffer=self.shared_memory.buf))
+            self.pool = Pool(processes, initializer=attach_map,
+                             initargs=(self.shared_memory.name, shape, diagonal, map_obj.get_start_pos(),
+                                       map_obj.get_goal_pos()))
+        except BaseException:
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+            raise
+
+    # Generator giving the result of every query in order.
+    def solve(self, queries):
+        self.unfinished += 1
+        for result in self.pool.imap(solve_query, queries, self.chunksize):
+            yield result
+        self.unfinished -= 1
+
+    # Returns the result of every query as a list.
+    def run(self, queries):
+        return list(self.solve(queries))
+
+    # Stops the workers and frees the shared memory. Queries nobody will read are not solved.
+    def close(self, terminate=False):
+        if self.pool is None:
+            return
+        if terminate or self.unfinished:
+            self.pool.terminate()
+        else:
+            self.pool.close()
+        self.pool.join()
+        self.pool = None
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(terminate=exc_type is not None)
+
+
+
+#*************************
+#       Functions
+#*************************
+
+# Called when a worker starts. Attaches to the shared costs and makes the search used for every query in the worker.
+# The map of the worker is the inside of the padded costs, so neither is copied.
+def attach_map(name, shape, diagonal, start_pos, goal_pos):
+    global worker_memory, worker_grid
+    worker_memory = shared_memory.SharedMemory(name=name)
+    costs = np.ndarray((shape[0] + 2) * (shape[1] + 2), dtype=np.int64, buffer=worker_memory.buf)
+    costs.flags.writeable = False
+    int_map = costs.reshape(shape[0] + 2, shape[1] + 2)[1:-1, 1:-1]
+    worker_grid = GridAStar(Map_Obj.from_int_map(int_map, start_pos, goal_pos, copy=False), diagonal, costs=costs)
+    if verbose: print('Worker attached to', name)
+
+# Solves a single query in a worker. GridAStar prints when there is no path, which is kept out of the output.
+def solve_query(query):
+    start_pos, goal_pos = query
+    with contextlib.redirect_stdout(io.StringIO()):
+        path = worker_grid.run(start_pos, goal_pos)
+    return path, worker_grid.cost
+
+
+
+#*************************
+#         Test
+#*************************
+import os
+import time
+
+from MapGenerator import open_field, random_free_pos
+
+# Checks that the batch gives the same paths as GridAStar, in the same order, with one and with several workers.
+def func_test():
+    rng = np.random.default_rng(0)
+    for map_obj in (Map_Obj(3), Map_Obj.from_int_map(open_field(64, 64, 0.2, seed=0), [1, 1], [62, 62])):
+        queries = [(random_free_pos(map_obj.int_map, rng), random_free_pos(map_obj.int_map, rng)) for i in range(50)]
+        grid_a_star = GridAStar(map_obj)
+        expected = [(grid_a_star.run(start_pos, goal_pos), grid_a_star.cost) for start_pos, goal_pos in queries]
+        for processes in (1, 3):
+            with BatchSolver(map_obj, processes=processes, chunksize=4) as batch_solver:
+                results = batch_solver.run(queries)
+            print('Processes:', processes, 'same paths and costs as GridAStar, in order:', results == expected)
+
+    # Stopping after the first result does not wait for the rest to be solved.
+    map_obj = Map_Obj.from_int_map(open_field(200, 200, 0.2, seed=0), [1, 1], [198, 198])
+    queries = [(random_free_pos(map_obj.int_map, rng), random_free_pos(map_obj.int_map, rng)) for i in range(400)]
+    with BatchSolver(map_obj, processes=2, chunksize=4) as batch_solver:
+        for result in batch_solver.solve(queries):
+            break
+        start = time.perf_counter()
+    print('Close after the first of 400 results, ms: {:.0f}'.format(1e3 * (time.perf_counter() - start)))
+
+    # The worker searches on the shared block itself.
+    with BatchSolver(map_obj, processes=1) as batch_solver:
+        shares = batch_solver.pool.apply(shares_memory)
+    print('Worker map and costs read the shared block:', shares)
+
+    # A pool that can not start does not leave the block behind. The blocks are files in /dev/shm on Linux.
+    blocks = set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+    try:
+        BatchSolver(map_obj, processes=0)
+    except ValueError as error:
+        left = set(os.listdir('/dev/shm')) - blocks if os.path.isdir('/dev/shm') else set()
+        print('Pool that can not start gives:', error, 'blocks left:', len(left))
+
+# True if the map and costs of the worker are views of the shared block.
+def shares_memory():
+    block = np.ndarray(worker_memory.size, dtype=np.uint8, buffer=worker_memory.buf)
+    return np.shares_memory(worker_grid.costs, block) and np.shares_memory(worker_grid.map_obj.int_map, block)
+
+if __name__ == "__main__":
+    func_test()
@@ -0,0 +1,599 @@
+"""
+Contains benchmarks for the path finding code. Every benchmark prints a table and returns its rows.
+
+Behaviour:
+benchmark_scaling(sizes, obstacle_density, seed):    Runs AStar on generated maps of growing size and reports the time
+                                                     per expanded node. It should stay flat as the maps grow.
+benchmark_grid_engine(tasks):                        Compares time and memory allocated per expansion for AStar and
+                                                     GridAStar on the tasks.
+benchmark_bucket_queue(tasks, repeats):             Compares AStar with a heap and with a bucket queue as open list on
+                                                     map 2 and Edgar_full.
+benchmark_landmarks(tasks, queries, seed):           Preprocessing time of the landmarks, and expansions and time per
+                                                     query with walking_distance and with the landmarks.
+benchmark_contraction_hierarchy(tasks, sizes, queries, seed):
+                                                     Build time, query time and memory of the contraction hierarchy on
+                                                     the task maps and on generated maps, compared to GridAStar.
+benchmark_hierarchical(sizes, queries, changes, seed):
+                                                     Build time, query time and path cost of HPA* on generated maps,
+                                                     compared to GridAStar, and the time to update after cells change.
+benchmark_bidirectional(tasks, queries, seed):       Expansions and time of AStar and BidirectionalAStar on the tasks, from
+                                                     the start to the goal of the task and between random cells.
+benchmark_anytime(tasks, sizes, seed):               Cost, bound, time and expansions of every path AnytimeAStar gives,
+                                                     compared to the shortest path and time of AStar.
+benchmark_node_memory(task):                         Memory kept per expanded node when AStar expands every reachable
+                                                     cell of the task map, and the size of a Node.
+benchmark_distance_field(tasks, sizes, agents, seed):
+                                                     Time for many agents to find their path to the same goal, with a
+                                                     GridAStar search each and with one distance field.
+benchmark_wavefront(tasks, sizes, goals, seed):      Time per distance field with GridAStar.dijkstra, with the numpy
+                                                     wavefront or sweeps one field at a time, and as one batch.
+benchmark_batch(size, queries, processes, seed):   Queries per second solved by GridAStar in this process and by
+                                                     BatchSolver with a growing amount of worker processes.
+benchmark_path_cache(tasks, distinct, queries, change_every, seed):
+                                                     Time of a workload where the same queries come again, with
+                                                     GridAStar every time and with PathCache, while cells change.
+benchmark_map_loading(sizes, seed):                  Time and peak memory to make a Map_Obj from a csv file the way it
+                                                     was done with pandas, the first time through MapFile.py, and from
+                                                     the binary file after that.
+benchmark_startup(repeats):                          Time from a new python process starting to import the path
+                                                     finding modules and to find the path of task 1, and which heavy
+                                                     modules were imported on the way.
+benchmark_render(tasks, sizes, paths):               Time to draw a map with its path pixel by pixel like show_map did,
+                                                     with numpy from the string map and from int_map, and per path
+                                                     when many paths are saved as png files.
+benchmark_search_stats(tasks, sizes, repeats):       Time of AStar without SearchStats, with the counters only, with
+                                                     the times of the phases, and with the expansion trace as well.
+benchmark_time_slicing(tasks, sizes, searches, slices, seed):
+                                                     Total time of many AStar searches, and the longest the caller is
+                                                     kept waiting, with run and with step or run_until slices.
+benchmark_moving_goal():                             Expansions per replan of D* Lite and of a new search while the
+                                                     moving goal in task 5 is followed.
+benchmark_jump_points(tasks):                        Compares expansions of AStar, GridAStar and JumpPointSearch on the
+                                                     uniform cost tasks, with and without diagonal moves.
+"""
+
+#*************************
+#        Imports
+#*************************
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from Map import Map_Obj
+from AStar import AStar, IN_PROGRESS
+from IndexedMinPriorityOrder import IndexedMinPriorityOrder
+from BucketPriorityOrder import BucketPriorityOrder
+from GridAStar import GridAStar
+from JumpPointSearch import JumpPointSearch
+from DStarLite import track_moving_goal
+from Landmarks import Landmarks
+from ContractionHierarchy import ContractionHierarchy
+from HierarchicalAStar import HierarchicalAStar
+from BidirectionalAStar import BidirectionalAStar
+from AnytimeAStar import AnytimeAStar
+from DistanceField import DistanceField
+from Wavefront import distance_field, batch_fields
+from BatchSolver import BatchSolver
+from PathCache import PathCache
+from SearchStats import SearchStats
+from MapFile import read_csv_map, binary_path
+from MapRender import str_map_image, path_image, render_paths, pixel_image
+from MapGenerator import open_field, random_free_pos
+import Part1and2
+
+
+#*************************
+#       Functions
+#*************************
+
+# Returns the free cell closest to the given corner of the map.
+def free_corner(int_map, corner):
+    free = np.argwhere(int_map != -1)
+    distances = np.abs(free - np.array(corner)).sum(axis=1)
+    x, y = free[np.argmin(distances)]
+    return [int(x), int(y)]
+
+# Runs AStar with the task functions from Part1and2 on a map object. Returns the path and the amount of expansions.
+def run_astar(map_obj, func_cost=lambda x, y: 1, diagonal=False, priority_order=None):
+    expansions = [0]
+    func_adjacent_states = Part1and2.generate_adjacent_states_dagonal if diagonal else Part1and2.generate_adjacent_states
+    def counting_adjacent_states(state):
+        expansions[0] += 1
+        return func_adjacent_states(state)
+    func_heuristic = Part1and2.diagonal_distance if diagonal else Part1and2.walking_distance
+    start_state = (map_obj, map_obj.get_start_pos()[0], map_obj.get_start_pos()[1])
+    a_star = AStar(start_state, func_heuristic, counting_adjacent_states, Part1and2.goal_evaluate, func_cost, priority_order)
+    node_path = a_star.run()
+    return node_path, expansions[0]
+
+# Returns the cost function used by Part1and2 for a task.
+def task_cost(task):
+    return Part1and2.find_cost if task > 2 else (lambda x, y: 1)
+
+# Runs a function and returns its result and the time it took.
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+# Runs a function and returns its result and the peak memory allocated while it ran.
+def traced(func):
+    result, current, peak = traced_memory(func)
+    return result, peak
+
+# Runs a function and returns its result, the memory still allocated after it and the peak while it ran.
+def traced_memory(func):
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+# Returns the size of an object in bytes, together with its attribute dict if it has one.
+def object_size(obj):
+    return sys.getsizeof(obj) + (sys.getsizeof(obj.__dict__) if hasattr(obj, '__dict__') else 0)
+
+# Returns the map objects for the tasks and for generated maps of the given sizes, with a name for each.
+def benchmark_maps(tasks, sizes, obstacle_density=0.2, seed=0):
+    maps = [('task ' + str(task), Map_Obj(task)) for task in tasks]
+    for size in sizes:
+        int_map = open_field(size, size, obstacle_density, seed)
+        maps.append((str(size) + 'x' + str(size), Map_Obj.from_int_map(int_map, free_corner(int_map, (0, 0)),
+                                                                    free_corner(int_map, (size, size)))))
+    return maps
+
+# Returns random pairs of free positions on the map.
+def random_queries(map_obj, queries, rng):
+    free = np.argwhere(map_obj.int_map != -1).tolist()
+    return [(free[rng.integers(len(free))], free[rng.integers(len(free))]) for i in range(queries)]
+
+# Prints rows as a table with the given headers. Every column is wide enough for its longest value.
+def print_table(headers, rows):
+    cells = [[str(header) for header in headers]]
+    for row in rows:
+        cells.append(['{:.4g}'.format(value) if isinstance(value, float) else str(value) for value in row])
+    widths = [max(len(row[i]) for row in cells) + 2 for i in range(len(headers))]
+    for row in cells:
+        print(''.join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+#*************************
+#       Benchmarks
+#*************************
+
+# Expansion cost of AStar as the map grows. Duplicate detection is constant time, so us/expansion should stay flat.
+def benchmark_scaling(sizes=(50, 100, 200, 400), obstacle_density=0.1, seed=0):
+    rows = []
+    for size in sizes:
+        int_map = open_field(size, size, obstacle_density, seed)
+        map_obj = Map_Obj.from_int_map(int_map, free_corner(int_map, (0, 0)), free_corner(int_map, (size, size)))
+        (node_path, expansions), elapsed = timed(lambda: run_astar(map_obj))
+        rows.append((size * size, expansions, elapsed, 1e6 * elapsed / max(expansions, 1)))
+    print_table(('cells', 'expansions', 'seconds', 'us/expansion'), rows)
+    return rows
+
+# Time and peak memory per expansion of AStar and GridAStar. The time is measured in a second run without tracing.
+def benchmark_grid_engine(tasks=(1, 2, 3, 4)):
+    rows = []
+    for task in tasks:
+        map_obj = Map_Obj(task)
+        (node_path, expansions), a_star_peak = traced(lambda: run_astar(map_obj, task_cost(task)))
+        _, a_star_time = timed(lambda: run_astar(map_obj, task_cost(task)))
+        grid_a_star = GridAStar(map_obj)
+        _, grid_peak = traced(grid_a_star.run)
+        _, grid_time = timed(grid_a_star.run)
+        rows.append((task, 'AStar', expansions, 1e6 * a_star_time / expansions, a_star_peak / expansions))
+        rows.append((task, 'GridAStar', grid_a_star.expansions, 1e6 * grid_time / grid_a_star.expansions,
+                     grid_peak / grid_a_star.expansions))
+    print_table(('task', 'engine', 'expansions', 'us/expansion', 'bytes/expansion'), rows)
+    return rows
+
+# Time per query of AStar with the heap and the bucket queue as open list. Task 3 uses map 2 and task 4 Edgar_full.
+def benchmark_bucket_queue(tasks=(3, 4), repeats=50):
+    rows = []
+    for task in tasks:
+        map_obj = Map_Obj(task)
+        for priority_order in (IndexedMinPriorityOrder, BucketPriorityOrder):
+            def queries():
+                for i in range(repeats):
+                    result = run_astar(map_obj, Part1and2.find_cost, priority_order=priority_order)
+                return result
+            (node_path, expansions), elapsed = timed(queries)
+            rows.append((task, priority_order.__name__, expansions, node_path[-1].g_cost, 1e3 * elapsed / repeats))
+    print_table(('task', 'open list', 'expansions', 'path cost', 'ms/query'), rows)
+    return rows
+
+# Expansions and path cost of the three engines on the uniform cost tasks, for 4- and 8-connected movement.
+def benchmark_jump_points(tasks=(1, 2)):
+    rows = []
+    for diagonal in (False, True):
+        for task in tasks:
+            map_obj = Map_Obj(task)
+            func_cost = Part1and2.find_cost_diagonal if diagonal else Part1and2.find_cost
+            (node_path, expansions), a_star_time = timed(lambda: run_astar(map_obj, func_cost, diagonal))
+            rows.append((task, 8 if diagonal else 4, 'AStar', expansions, float(node_path[-1].g_cost), a_star_time))
+            for engine in (GridAStar(map_obj, diagonal), JumpPointSearch(map_obj, diagonal)):
+                _, elapsed = timed(engine.run)
+                rows.append((task, 8 if diagonal else 4, type(engine).__name__, engine.expansions, engine.cost, elapsed))
+    print_table(('task', 'connectivity', 'engine', 'expansions', 'path cost', 'seconds'), rows)
+    return rows
+
+
+# Expansions and time per query with walking_distance and the landmark heuristic on random queries.
+def benchmark_landmarks(tasks=(1, 3, 4), queries=50, seed=0):
+    rows = []
+    rng = np.random.default_rng(seed)
+    for task in tasks:
+        map_obj = Map_Obj(task)
+        landmarks, preprocessing_time = timed(lambda: Landmarks(map_obj, persist=False))
+        free = np.argwhere(map_obj.int_map != -1).tolist()
+        pairs = [(free[rng.integers(len(free))], free[rng.integers(len(free))]) for i in range(queries)]
+        for name, func_heuristic in (('walking_distance', Part1and2.walking_distance), ('landmarks', landmarks.heuristic)):
+            expansions, elapsed = 0, 0
+            for start_pos, goal_pos in pairs:
+                map_obj.goal_pos = goal_pos
+                start_state = (map_obj, start_pos[0], start_pos[1])
+                a_star = AStar(start_state, func_heuristic, Part1and2.generate_adjacent_states, Part1and2.goal_evaluate,
+                               Part1and2.find_cost)
+                _, query_time = timed(a_star.run)
+                expansions += len(a_star.closed)
+                elapsed += query_time
+            rows.append((task, name, preprocessing_time if name == 'landmarks' else 0.0, expansions / queries,
+                         1e3 * elapsed / queries))
+    print_table(('task', 'heuristic', 'preprocessing s', 'expansions/query', 'ms/query'), rows)
+    return rows
+
+# Build time, memory and query time of the contraction hierarchy. The memory is what is still allocated after building,
+# the peak is while building. Memory is traced in a separate build, since tracing slows the build down.
+def benchmark_contraction_hierarchy(tasks=(1, 3, 4), sizes=(64, 128), queries=200, seed=0):
+    rows = []
+    rng = np.random.default_rng(seed)
+    for name, map_obj in benchmark_maps(tasks, sizes, seed=seed):
+        hierarchy, build_time = timed(lambda: ContractionHierarchy(map_obj))
+        _, memory, peak = traced_memory(lambda: ContractionHierarchy(map_obj))
+        pairs = random_queries(map_obj, queries, rng)
+        grid_a_star = GridAStar(map_obj)
+        _, query_time = timed(lambda: [hierarchy.query(start_pos, goal_pos) for start_pos, goal_pos in pairs])
+        _, grid_time = timed(lambda: [grid_a_star.run(start_pos, goal_pos) for start_pos, goal_pos in pairs])
+        rows.append((name, len(hierarchy.rank), hierarchy.shortcuts, build_time, memory / 2 ** 20, peak / 2 ** 20,
+                     1e3 * query_time / queries, 1e3 * grid_time / queries))
+    print_table(('map', 'nodes', 'shortcuts', 'build s', 'index MiB', 'peak MiB', 'CH ms/query', 'GridAStar ms/query'),
+                rows)
+    return rows
+
+# Build time, query time and path cost of HPA* compared to GridAStar. After that single cells are changed, and the time
+# to update the clusters is compared to building them again.
+def benchmark_hierarchical(sizes=(128, 256), queries=100, changes=20, seed=0):
+    rows = []
+    rng = np.random.default_rng(seed)
+    for name, map_obj in benchmark_maps((), sizes, seed=seed):
+        hierarchy, build_time = timed(lambda: HierarchicalAStar(map_obj))
+        grid_a_star = GridAStar(map_obj)
+        pairs = [pair for pair in random_queries(map_obj, queries, rng) if grid_a_star.run(*pair) is not None]
+        _, grid_time = timed(lambda: [grid_a_star.run(start_pos, goal_pos) for start_pos, goal_pos in pairs])
+        shortest = sum(grid_a_star.run(start_pos, goal_pos) and grid_a_star.cost for start_pos, goal_pos in pairs)
+        _, query_time = timed(lambda: [hierarchy.query(start_pos, goal_pos) for start_pos, goal_pos in pairs])
+        cost = sum(hierarchy.query(start_pos, goal_pos) and hierarchy.cost for start_pos, goal_pos in pairs)
+        update_time = 0
+        for i in range(changes):
+            map_obj.replace_map_values(random_free_pos(map_obj.int_map, rng), int(rng.choice([-1, 2, 3, 4])),
+                                       map_obj.get_goal_pos())
+            update_time += timed(hierarchy.update)[1]
+        rows.append((name, len(hierarchy.intra_edges), build_time, 1e3 * query_time / len(pairs),
+                     1e3 * grid_time / len(pairs), cost / shortest, 1e3 * update_time / changes))
+    print_table(('map', 'nodes', 'build s', 'HPA* ms/query', 'GridAStar ms/query', 'cost / shortest',
+                 'update ms/change'), rows)
+    return rows
+
+# Expansions and time of AStar and BidirectionalAStar with walking_distance, on the task and on random queries.
+def benchmark_bidirectional(tasks=(3, 4), queries=50, seed=0):
+    rows = []
+    rng = np.random.default_rng(seed)
+    for task in tasks:
+        map_obj = Map_Obj(task)
+        pairs = [(map_obj.get_start_pos(), map_obj.get_goal_pos())] + random_queries(map_obj, queries, rng)
+        for name, pairs in (('task ' + str(task), pairs[:1]), ('task ' + str(task) + ' random', pairs[1:])):
+            expansions, bidirectional_expansions, time_used, bidirectional_time = 0, 0, 0, 0
+            for map_obj.start_pos, map_obj.goal_pos in pairs:
+                start_state, goal_state = (map_obj, *map_obj.start_pos), (map_obj, *map_obj.goal_pos)
+                a_star = AStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                               Part1and2.goal_evaluate, Part1and2.find_cost)
+                time_used += timed(a_star.run)[1]
+                expansions += len(a_star.closed)
+                bidirectional = BidirectionalAStar(start_state, goal_state, Part1and2.walking_distance,
+                                                   Part1and2.walking_distance_to_start,
+                                                   Part1and2.generate_adjacent_states, Part1and2.find_cost)
+                bidirectional_time += timed(bidirectional.run)[1]
+                bidirectional_expansions += bidirectional.expansions
+            rows.append((name, len(pairs), expansions, bidirectional_expansions, bidirectional_expansions / expansions,
+                         1e3 * time_used / len(pairs), 1e3 * bidirectional_time / len(pairs)))
+    print_table(('map', 'queries', 'AStar expansions', 'bidirectional expansions', 'ratio', 'AStar ms/query',
+                 'bidirectional ms/query'), rows)
+    return rows
+
+# Every path AnytimeAStar gives, with the time since the search started, compared to a single AStar search.
+def benchmark_anytime(tasks=(3, 4), sizes=(256,), seed=0):
+    rows = []
+    for name, map_obj in benchmark_maps(tasks, sizes, seed=seed):
+        start_state = (map_obj, *map_obj.get_start_pos())
+        search = AStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                       Part1and2.goal_evaluate, Part1and2.find_cost)
+        node_path, time_used = timed(search.run)
+        rows.append((name, 'AStar', node_path[-1].g_cost, 1, 1e3 * time_used, len(search.closed)))
+        anytime = AnytimeAStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                               Part1and2.goal_evaluate, Part1and2.find_cost)
+        start_time = time.perf_counter()
+        for path, bound in anytime.paths():
+            rows.append((name, 'weight ' + format(anytime.weight, 'g'), anytime.cost, bound,
+                         1e3 * (time.perf_counter() - start_time), anytime.expansions))
+    print_table(('map', 'search', 'cost', 'bound', 'ms', 'expansions'), rows)
+    return rows
+
+# Memory per expanded node for AStar when every reachable cell is expanded, on Edgar_full by default. The memory still
+# allocated after the search is what the nodes, the state map and the open and closed lists keep.
+def benchmark_node_memory(task=4):
+    map_obj = Map_Obj(task)
+    start_state = (map_obj, *map_obj.get_start_pos())
+    a_star = AStar(start_state, lambda state: 0, Part1and2.generate_adjacent_states, lambda state: False,
+                   task_cost(task))
+    _, memory, peak = traced_memory(lambda: a_star.run())
+    expansions = len(a_star.closed)
+    rows = [('task ' + str(task), expansions, memory / expansions, peak / expansions, object_size(a_star.closed[0]))]
+    print_table(('map', 'expansions', 'bytes/node kept', 'peak bytes/node', 'bytes in a Node'), rows)
+    return rows
+
+# Paths for many agents to the goal of the map, with a GridAStar search for every agent and with one distance field
+# that every agent follows.
+def benchmark_distance_field(tasks=(3, 4), sizes=(256,), agents=100, seed=0):
+    rows = []
+    rng = np.random.default_rng(seed)
+    for name, map_obj in benchmark_maps(tasks, sizes, seed=seed):
+        starts = [random_free_pos(map_obj.int_map, rng) for i in range(agents)]
+        grid_a_star = GridAStar(map_obj)
+        _, grid_time = timed(lambda: [grid_a_star.run(start_pos) for start_pos in starts])
+        distance_field = DistanceField(map_obj)
+        _, field_time = timed(distance_field.field)
+        _, path_time = timed(lambda: [distance_field.path(start_pos) for start_pos in starts])
+        rows.append((name, agents, 1e3 * grid_time, 1e3 * field_time, 1e3 * path_time, grid_time / (field_time + path_time)))
+    print_table(('map', 'agents', 'GridAStar ms', 'field ms', 'paths ms', 'speedup'), rows)
+    return rows
+
+# Time per field to compute the cost to many goals. Task 1 and 2 cost the same everywhere and use the wavefront, the
+# others use the sweeps.
+def benchmark_wavefront(tasks=(1, 2, 3, 4), sizes=(128,), goals=50, seed=0):
+    rows = []
+    rng = np.random.default_rng(seed)
+    for name, map_obj in benchmark_maps(tasks, sizes, seed=seed):
+        int_map = map_obj.int_map
+        goal_positions = [random_free_pos(int_map, rng) for i in range(goals)]
+        grid_a_star = GridAStar(map_obj)
+        _, grid_time = timed(lambda: [grid_a_star.dijkstra(goal_pos, reverse=True) for goal_pos in goal_positions])
+        _, single_time = timed(lambda: [distance_field(int_map, [goal_pos], reverse=True) for goal_pos in goal_positions])
+        _, batch_time = timed(lambda: batch_fields(int_map, goal_positions))
+        rows.append((name, goals, 1e3 * grid_time / goals, 1e3 * single_time / goals, 1e3 * batch_time / goals))
+    print_table(('map', 'goals', 'dijkstra ms/field', 'numpy ms/field', 'batch ms/field'), rows)
+    return rows
+
+# Throughput of many queries on one map against the amount of worker processes. The workers are started before the
+# time is taken, and the results are checked against the queries solved in this process.
+def benchmark_batch(size=256, queries=500, processes=(1, 2, 4), seed=0):
+    rng = np.random.default_rng(seed)
+    (name, map_obj), = benchmark_maps((), (size,), seed=seed)
+    query_list = random_queries(map_obj, queries, rng)
+    grid_a_star = GridAStar(map_obj)
+    expected, serial_time = timed(lambda: [(grid_a_star.run(*query), grid_a_star.cost) for query in query_list])
+    rows = [(name, 'serial', os.cpu_count(), queries / serial_time, 1.0, True)]
+    for count in processes:
+        with BatchSolver(map_obj, processes=count) as batch_solver:
+            results, batch_time = timed(lambda: batch_solver.run(query_list))
+        rows.append((name, count, os.cpu_count(), queries / batch_time, serial_time / batch_time, results == expected))
+    print_table(('map', 'processes', 'cores', 'queries/s', 'speedup', 'same results'), rows)
+    return rows
+
+# Repeated queries, with a few queries much more common than the rest, and a random cell changed every change_every
+# queries. The changes are made on copies of the map, so the same workload is run with and without the cache.
+def benchmark_path_cache(tasks=(3, 4), distinct=200, queries=2000, change_every=50, seed=0):
+    rows = []
+    for task in tasks:
+        rng = np.random.default_rng(seed)
+        map_obj = Map_Obj(task)
+        distinct_queries = random_queries(map_obj, distinct, rng)
+        order = np.minimum(rng.zipf(1.5, queries) - 1, distinct - 1)
+        changes = [(random_free_pos(map_obj.int_map, rng), int(rng.integers(1, 5)))
+                   for i in range(queries // change_every)]
+
+        # Runs the workload with the function, and returns its costs.
+        def workload(func_cost):
+            map_obj = Map_Obj(task)
+            costs = []
+            for i, query in enumerate(order):
+                if i % change_every == change_every - 1:
+                    pos, value = changes[i // change_every]
+                    map_obj.replace_map_values(pos, value, map_obj.get_goal_pos())
+                costs.append(func_cost(map_obj, *distinct_queries[query]))
+            return costs
+
+        def grid_cost(map_obj, start_pos, goal_pos):
+            grid_a_star = GridAStar(map_obj)
+            grid_a_star.run(start_pos, goal_pos)
+            return grid_a_star.cost
+
+        path_cache = PathCache(max_paths=distinct // 2)
+        grid_costs, grid_time = timed(lambda: workload(grid_cost))
+        cache_costs, cache_time = timed(lambda: workload(path_cache.cost))
+        rows.append(('task ' + str(task), queries, path_cache.hits / queries, path_cache.evictions,
+                     path_cache.invalidations, 1e3 * grid_time, 1e3 * cache_time, grid_costs == cache_costs))
+    print_table(('map', 'queries', 'hit rate', 'evictions', 'invalidations', 'GridAStar ms', 'cache ms', 'same costs'),
+                rows)
+    return rows
+
+# Time and peak memory to load generated maps. Before MapFile.py the csv file was parsed with pandas and the string map
+# was made every time.
+def benchmark_map_loading(sizes=(1024, 4096), seed=0):
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            int_map = open_field(size, size, seed=seed)
+            path = os.path.join(directory, str(size) + '.csv')
+            np.savetxt(path, int_map, fmt='%d', delimiter=',')
+            start_pos, goal_pos = free_corner(int_map, (0, 0)), free_corner(int_map, (size, size))
+
+            (_, pandas_peak), pandas_time = timed(lambda: traced(
+                lambda: Map_Obj.from_int_map(read_csv_map(path), start_pos, goal_pos).str_map))
+            (_, convert_peak), convert_time = timed(lambda: traced(lambda: Map_Obj.from_file(path, start_pos, goal_pos)))
+            (map_obj, binary_peak), binary_time = timed(lambda: traced(lambda: Map_Obj.from_file(path, start_pos,
+                                                                                                  goal_pos)))
+            rows.append((str(size) + 'x' + str(size), os.path.getsize(path) >> 10,
+                         os.path.getsize(binary_path(path)) >> 10, 1e3 * pandas_time, 1e3 * convert_time,
+                         1e3 * binary_time, pandas_peak >> 10, convert_peak >> 10, binary_peak >> 10,
+                         np.array_equal(map_obj.int_map, int_map)))
+    print_table(('map', 'csv kB', 'binary kB', 'pandas ms', 'first ms', 'binary ms', 'pandas peak kB',
+                 'first peak kB', 'binary peak kB', 'same map'), rows)
+    return rows
+
+# Cold start of a routing process, run in new processes so nothing is imported allready. The second row imports pandas
+# and PIL first, like Map.py did before they were only imported when needed.
+def benchmark_startup(repeats=5):
+    script = '''
+import sys, time
+start = time.perf_counter()
+{}
+import Part1and2
+imported = time.perf_counter()
+map_obj = Part1and2.Map_Obj(1)
+Part1and2.AStar((map_obj, *map_obj.get_start_pos()), Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                Part1and2.goal_evaluate).run()
+print(imported - start, time.perf_counter() - start, 'pandas' in sys.modules, 'PIL' in sys.modules)
+'''
+    rows = []
+    for name, heavy_imports in (('routing', ''), ('with pandas and PIL', 'import pandas, PIL.Image')):
+        times = []
+        for i in range(repeats):
+            output = subprocess.run([sys.executable, '-c', script.format(heavy_imports)], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+            import_time, path_time, pandas, pil = output.split('\n')[-2].split()
+            times.append((float(import_time), float(path_time)))
+        import_time, path_time = np.median(times, axis=0)
+        rows.append((name, 1e3 * import_time, 1e3 * path_time, pandas, pil))
+    print_table(('process', 'import ms', 'first path ms', 'pandas imported', 'PIL imported'), rows)
+    return rows
+
+# Drawing the maps with their paths. The png files are written to a temporary directory.
+def benchmark_render(tasks=(1, 4), sizes=(128,), paths=20):
+    rows = []
+    for name, map_obj in benchmark_maps(tasks, sizes):
+        path = GridAStar(map_obj).run()
+        map_with_path = Map_Obj.from_int_map(map_obj.int_map, map_obj.get_start_pos(), map_obj.get_goal_pos())
+        for position in path[1:]:
+            map_with_path.replace_map_values(position, 5, map_with_path.get_goal_pos())
+        str_map = map_with_path.str_map
+        pixel, pixel_time = timed(lambda: pixel_image(str_map))
+        _, str_time = timed(lambda: str_map_image(str_map))
+        image, path_time = timed(lambda: path_image(map_obj, path))
+        with tempfile.TemporaryDirectory() as directory:
+            _, batch_time = timed(lambda: render_paths(map_obj, [path] * paths, directory))
+        rows.append((name, 1e3 * pixel_time, 1e3 * str_time, 1e3 * path_time, 1e3 * batch_time / paths,
+                     np.array_equal(pixel, image)))
+    print_table(('map', 'pixel by pixel ms', 'str_map ms', 'int_map ms', 'png per path ms', 'same image'), rows)
+    return rows
+
+# The overhead of SearchStats. The best of repeats runs is used for every setting.
+def benchmark_search_stats(tasks=(3, 4), sizes=(256,), repeats=5):
+    rows = []
+    settings = (('off', None), ('counters', dict(timing=False)), ('timing', dict(timing=True)),
+                ('timing and trace', dict(timing=True, trace=True)))
+    for name, map_obj in benchmark_maps(tasks, sizes, obstacle_density=0.1):
+        start_state = (map_obj, *map_obj.get_start_pos())
+
+        # Makes the search, with the stats attached for every setting but off.
+        def make_search(options):
+            a_star = AStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                           Part1and2.goal_evaluate, Part1and2.find_cost)
+            return a_star, None if options is None else SearchStats(a_star, **options)
+
+        off_time = None
+        for setting, options in settings:
+            best, stats = None, None
+            for i in range(repeats):
+                a_star, search_stats = make_search(options)
+                _, run_time = timed(a_star.run)
+                best = run_time if best is None else min(best, run_time)
+                stats = search_stats.as_dict() if search_stats is not None else stats
+            off_time = best if off_time is None else off_time
+            rows.append((name, setting, len(a_star.closed), 1e3 * best, best / off_time,
+                         '' if stats is None else stats['generated']))
+    print_table(('map', 'stats', 'expanded', 'run ms', 'relative', 'generated'), rows)
+    return rows
+
+# The longest a search keeps the caller waiting, when it is run in one call and a slice at a time.
+def benchmark_time_slicing(tasks=(3, 4), sizes=(256,), searches=20, slices=(100, 1000, 0.001), seed=0):
+    rows = []
+    rng = np.random.default_rng(seed)
+    for name, map_obj in benchmark_maps(tasks, sizes, obstacle_density=0.1):
+        queries = random_queries(map_obj, searches, rng)
+
+        # Makes the searches on their own maps, since the goal is read from the map.
+        def make_searches():
+            return [AStar((Map_Obj.from_int_map(map_obj.int_map, start_pos, goal_pos), *start_pos),
+                          Part1and2.walking_distance, Part1and2.generate_adjacent_states, Part1and2.goal_evaluate,
+                          Part1and2.find_cost) for start_pos, goal_pos in queries]
+
+        # A slice is an amount of expansions for step, a float is seconds for run_until, and None is the whole search
+        # in one call, like run.
+        for size in (None,) + tuple(slices):
+            times = []
+            for a_star in make_searches():
+                status = IN_PROGRESS
+                while status == IN_PROGRESS:
+                    start = time.perf_counter()
+                    if size is None:
+                        status = a_star.step(None)
+                    elif isinstance(size, float):
+                        status = a_star.run_until(start + size)
+                    else:
+                        status = a_star.step(size)
+                    times.append(time.perf_counter() - start)
+            setting = 'run' if size is None else ('{:g} ms'.format(1e3 * size) if isinstance(size, float)
+                                                  else str(size) + ' expansions')
+            rows.append((name, setting, len(times), 1e3 * sum(times), 1e3 * max(times)))
+    print_table(('map', 'slice', 'calls', 'total ms', 'longest ms'), rows)
+    return rows
+
+# Expansions per replan while following the moving goal in task 5.
+def benchmark_moving_goal():
+    rows = [(tick, position, goal_pos, expansions, full_expansions)
+            for tick, position, goal_pos, expansions, full_expansions, cost, full_cost in track_moving_goal(Map_Obj(5))]
+    rows.append(('total', '', '', sum(row[3] for row in rows), sum(row[4] for row in rows)))
+    print_table(('replan', 'position', 'goal', 'D* Lite', 'new search'), rows)
+    return rows
+
+
+#*************************
+#          Main
+#*************************
+if __name__ == "__main__":
+    benchmark_scaling()
+    benchmark_grid_engine()
+    benchmark_bucket_queue()
+    benchmark_jump_points()
+    benchmark_moving_goal()
+    benchmark_landmarks()
+    benchmark_contraction_hierarchy()
+    benchmark_hierarchical()
+    benchmark_bidirectional()
+    benchmark_anytime()
+    benchmark_node_memory()
+    benchmark_distance_field()
+    benchmark_wavefront()
+    benchmark_batch()
+    benchmark_path_cache()
+    benchmark_map_loading()
+    benchmark_startup()
+    benchmark_render()
+    benchmark_search_stats()
+    benchmark_time_slicing()
@@ -0,0 +1,290 @@
+"""
+Contains a benchmark suite that runs the search engines on the Samfundet maps and on generated maps, and writes the
+results to a file that can be compared with the results of another version of the code.
+
+Every engine solves the same queries on every map. For every query the expansions, the time, the length and cost of the
+path, and the peak memory allocated during the search are recorded. The memory is measured with tracemalloc in a second
+run of the query, so it does not slow down the run that is timed. The task maps use the start and goal of the task as
+the first query, and all maps get random queries between free cells after that.
+
+The results are written as json, with the settings, the version of the code and the time the suite was run, or as csv
+with one row per query. With a json file from an earlier run given to --compare, the time, expansions and costs of
+every map and engine are compared. All the engines find the shortest path, so a cost that has changed is an error, not
+a tradeoff.
+
+Engines:
+AStar:                              AStar with walking_distance, generate_adjacent_states and find_cost from Part1and2.py.
+GridAStar:                          GridAStar, made once per map.
+JumpPointSearch:                    JumpPointSearch, made once per map. Only used on maps with uniform costs.
+BidirectionalAStar:                 BidirectionalAStar with walking_distance in both directions.
+
+Behaviour:
+suite_maps(tasks, kinds, sizes, obstacle_density=0.2, cost_weights=None, seed=0):
+                                    Returns (name, kind, Map_Obj) for the task maps and for a generated map of every
+                                    kind and size.
+run_suite(maps, engines, queries, seed=0, memory=True):
+                                    Runs every engine on every map, and returns one dict per engine and query.
+summarize(results):                 Returns one row per map and engine with the amount solved and the mean expansions,
+                                    time and peak memory per query.
+write_results(results, path, settings):
+                                    Writes the results as json or csv, chosen by the file extension.
+compare_results(old_results, results):
+                                    Returns rows with the old and new time and expansions of every map and engine, and
+                                    the amount of queries where the cost has changed.
+main(arguments=None):               The command line interface, run when the module is run. See python BenchmarkSuite.py
+                                    --help for the options.
+
+Example:
+python BenchmarkSuite.py --kinds maze rooms weighted --sizes 128 --queries 20 --output results.json
+python BenchmarkSuite.py --kinds maze rooms weighted --sizes 128 --queries 20 --compare results.json
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+import argparse
+import contextlib
+import csv
+import io
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+from GridAStar import GridAStar
+from JumpPointSearch import JumpPointSearch, has_uniform_costs
+from BidirectionalAStar import BidirectionalAStar
+from MapGenerator import generate_map, random_free_pos
+from Benchmark import print_table
+
+
+#*************************
+#        Engines
+#*************************
+
+# Every engine is made once per map, and returns a function solving one query as (path length, cost, expansions).
+# The length and cost are None if there is no path. An engine returns None if it can not be used on the map.
+
+def astar_engine(map_obj):
+    def solve(start_pos, goal_pos):
+        map_obj.start_pos, map_obj.goal_pos = start_pos, goal_pos
+        a_star = AStar((map_obj, *start_pos), Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                       Part1and2.goal_evaluate, Part1and2.find_cost)
+        node_path = a_star.run()
+        if node_path is None:
+            return None, None, len(a_star.closed)
+        return len(node_path), float(node_path[-1].g_cost), len(a_star.closed)
+    return solve
+
+def grid_engine(map_obj, grid_class=GridAStar):
+    grid = grid_class(map_obj)
+    def solve(start_pos, goal_pos):
+        path = grid.run(start_pos, goal_pos)
+        return None if path is None else len(path), grid.cost, grid.expansions
+    return solve
+
+def jump_point_engine(map_obj):
+    if not has_uniform_costs(map_obj.int_map):
+        return None
+    return grid_engine(map_obj, JumpPointSearch)
+
+def bidirectional_engine(map_obj):
+    def solve(start_pos, goal_pos):
+        map_obj.start_pos, map_obj.goal_pos = start_pos, goal_pos
+        bidirectional = BidirectionalAStar((map_obj, *start_pos), (map_obj, *goal_pos), Part1and2.walking_distance,
+                                           Part1and2.walking_distance_to_start, Part1and2.generate_adjacent_states,
+                                           Part1and2.find_cost)
+        path = bidirectional.run()
+        cost = None if bidirectional.cost is None else float(bidirectional.cost)
+        return None if path is None else len(path), cost, bidirectional.expansions
+    return solve
+
+ENGINES = {'AStar': astar_engine, 'GridAStar': grid_engine, 'JumpPointSearch': jump_point_engine,
+           'BidirectionalAStar': bidirectional_engine}
+
+
+
+#*************************
+#       Functions
+#*************************
+
+# Returns the maps of the suite. The generated maps get the start and goal of their first query.
+def suite_maps(tasks, kinds, sizes, obstacle_density=0.2, cost_weights=None, seed=0):
+    maps = [('task ' + str(task), 'task', Map_Obj(task)) for task in tasks]
+    rng = np.random.default_rng(seed)
+    for kind in kinds:
+        for size in sizes:
+            int_map = generate_map(kind, size, size, obstacle_density, cost_weights, seed)
+            map_obj = Map_Obj.from_int_map(int_map, random_free_pos(int_map, rng), random_free_pos(int_map, rng))
+            maps.append((kind + ' ' + str(size) + 'x' + str(size), kind, map_obj))
+    return maps
+
+# Runs the engines on the maps. The searches print when they finish, which is kept out of the output.
+def run_suite(maps, engines, queries, seed=0, memory=True):
+    results = []
+    rng = np.random.default_rng(seed)
+    for name, kind, map_obj in maps:
+        query_list = [(list(map_obj.get_start_pos()), list(map_obj.get_goal_pos()))]
+        query_list += [(random_free_pos(map_obj.int_map, rng), random_free_pos(map_obj.int_map, rng))
+                       for i in range(queries - 1)]
+        for engine in engines:
+            solve = ENGINES[engine](map_obj)
+            if solve is None:
+                if verbose: print(engine, 'can not be used on', name)
+                continue
+            for query, (start_pos, goal_pos) in enumerate(query_list):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    length, cost, expansions = solve(start_pos, goal_pos)
+                    seconds = time.perf_counter() - start
+                    peak = traced_peak(lambda: solve(start_pos, goal_pos)) if memory else None
+                results.append({'map': name, 'kind': kind, 'height': map_obj.int_map.shape[0],
+                                'width': map_obj.int_map.shape[1], 'engine': engine, 'query': query,
+                                'start': start_pos, 'goal': goal_pos, 'solved': cost is not None, 'length': length,
+                                'cost': cost, 'expansions': expansions, 'time_ms': 1e3 * seconds,
+                                'peak_kb': None if peak is None else peak / 1024})
+    return results
+
+# Returns one row per map and engine, in the order they were run.
+def summarize(results):
+    groups = {}
+    for result in results:
+        groups.setdefault((result['map'], result['engine']), []).append(result)
+    rows = []
+    for (name, engine), group in groups.items():
+        peaks = [result['peak_kb'] for result in group if result['peak_kb'] is not None]
+        rows.append((name, engine, len(group), sum(result['solved'] for result in group),
+                     float(np.mean([result['expansions'] for result in group])),
+                     float(np.mean([result['time_ms'] for result in group])),
+                     float(np.mean(peaks)) if peaks else '',
+                     sum(result['cost'] for result in group if result['cost'] is not None)))
+    return rows
+
+# Writes the results with the settings they were made with.
+def write_results(results, path, settings):
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        return
+    with open(path, 'w') as file:
+        json.dump({'settings': settings, 'version': code_version(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'python': platform.python_version(), 'numpy': np.__version__, 'results': results}, file, indent=1)
+
+# Compares the results with results read from an earlier run. Only the maps and engines in both are compared.
+def compare_results(old_results, results):
+    old = {(result['map'], result['engine'], result['query']): result for result in old_results}
+    groups = {}
+    for result in results:
+        old_result = old.get((result['map'], result['engine'], result['query']))
+        if old_result is not None:
+            groups.setdefault((result['map'], result['engine']), []).append((old_result, result))
+    rows = []
+    for (name, engine), pairs in groups.items():
+        old_time = sum(old_result['time_ms'] for old_result, result in pairs)
+        new_time = sum(result['time_ms'] for old_result, result in pairs)
+        rows.append((name, engine, len(pairs), old_time, new_time, new_time / old_time if old_time else '',
+                     sum(old_result['expansions'] for old_result, result in pairs),
+                     sum(result['expansions'] for old_result, result in pairs),
+                     sum(not same_cost(old_result['cost'], result['cost']) for old_result, result in pairs)))
+    return rows
+
+
+# Helping functions
+
+# The peak memory allocated while the function runs.
+def traced_peak(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+# True if the costs are the same, or both None.
+def same_cost(cost, other):
+    if cost is None or other is None:
+        return cost is None and other is None
+    return abs(cost - other) < 1e-9
+
+# The git commit the code is at, or None if it is not known.
+def code_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# The command line interface.
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Runs the search engines on the Samfundet maps and generated maps.')
+    parser.add_argument('--tasks', type=int, nargs='*', default=[1, 2, 3, 4], help='Samfundet tasks to run on.')
+    parser.add_argument('--kinds', nargs='*', default=['open', 'maze', 'rooms', 'weighted'],
+                        choices=['open', 'maze', 'rooms', 'weighted'], help='Kinds of generated maps.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[128], help='Sizes of the generated maps.')
+    parser.add_argument('--density', type=float, default=0.2, help='Share of walls on open and weighted maps.')
+    parser.add_argument('--cost-weights', type=float, nargs=4, default=None, metavar=('W1', 'W2', 'W3', 'W4'),
+                        help='Probabilities of the costs 1-4, to give every generated map weighted terrain.')
+    parser.add_argument('--engines', nargs='*', default=list(ENGINES), choices=list(ENGINES),
+                        help='Engines to run.')
+    parser.add_argument('--queries', type=int, default=20, help='Queries per map.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the maps and the queries.')
+    parser.add_argument('--no-memory', action='store_true', help='Do not measure the peak memory.')
+    parser.add_argument('--output', help='File to write the results to, .json or .csv.')
+    parser.add_argument('--compare', help='Json file from an earlier run to compare with.')
+    args = parser.parse_args(arguments)
+
+    maps = suite_maps(args.tasks, args.kinds, args.sizes, args.density, args.cost_weights, args.seed)
+    results = run_suite(maps, args.engines, args.queries, args.seed, not args.no_memory)
+    print_table(('map', 'engine', 'queries', 'solved', 'expansions', 'ms', 'peak kB', 'total cost'), summarize(results))
+    if args.output:
+        write_results(results, args.output, vars(args))
+        print('Results written to', args.output)
+    if args.compare:
+        with open(args.compare) as file:
+            old = json.load(file)
+        print('Compared with', args.compare, 'from version', old['version'], 'at', old['time'])
+        print_table(('map', 'engine', 'queries', 'old ms', 'new ms', 'ratio', 'old expansions', 'new expansions',
+                     'changed costs'), compare_results(old['results'], results))
+    return results
+
+
+
+#*************************
+#         Test
+#*************************
+import os
+import tempfile
+
+# Runs a small suite, checks that all engines agree on the costs, and that a run compared with itself shows no change.
+def func_test():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.json')
+        results = main(['--tasks', '1', '3', '--sizes', '48', '--queries', '5', '--output', path])
+        costs = {}
+        for result in results:
+            costs.setdefault((result['map'], result['query']), []).append(result['cost'])
+        print('All engines give the same costs:', all(same_cost(cost, group[0]) for group in costs.values()
+                                                      for cost in group))
+        with open(path) as file:
+            old = json.load(file)
+        rows = compare_results(old['results'], results)
+        print('Compared with itself, changed costs:', sum(row[-1] for row in rows), 'version:', old['version'])
+        main(['--tasks', '--kinds', 'maze', '--sizes', '32', '--queries', '3', '--no-memory', '--engines', 'GridAStar',
+              '--output', os.path.join(directory, 'results.csv')])
+        with open(os.path.join(directory, 'results.csv')) as file:
+            print('Csv rows:', len(file.readlines()) - 1)
+
+if __name__ == "__main__":
+    main()
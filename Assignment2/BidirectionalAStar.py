@@ -0,0 +1,156 @@
+"""
+Contains bidirectional A*, searching from the start and from the goal at the same time.
+
+The forward search is an AStar from the start. The backward search is an AStar from the goal that follows the edges the
+other way, so its g-cost is the cost from a state to the goal and its heuristic estimates the cost from the start. Every
+time a search reaches a state the other search has reached, the path through that state is a candidate, and the
+cheapest candidate is kept as mu.
+
+With consistent heuristics the smallest f-cost in the open list of either search is a lower bound on every path not yet
+found by that search. The search stops when mu is no more than the larger of the two, and mu is then the shortest path.
+The search with the smallest open list is expanded next, so the two searches stay about the same size.
+
+BidirectionalAStar takes the following input:
+start_state:                        The state of the start.
+goal_state:                         The state of the goal. The goal has to be a single state to search backwards from.
+func_heuristic(state):              Estimates the cost from the state to the goal, like in AStar.
+func_backward_heuristic(state):     Estimates the cost from the start to the state.
+func_adjacent_states(state):        Function for generating the successing states for a given state.
+func_cost(state, next_state):       Function returning the cost of going from one state to another. Set to 1 by default.
+func_predecessor_states(state):     Function for generating the states with an edge to the given state. For directed
+                                    graphs. By default the graph is taken to be symmetric and func_adjacent_states is
+                                    used.
+priority_order:                     Class used for the open lists, like in AStar.
+
+Behaviour:
+run():                              Returns the path as a list of states, or None if there is no path.
+cost:                               Cost of the path found.
+expansions:                         Amount of states expanded by both searches together.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from math import inf
+
+from AStar import AStar, CLOSED
+
+
+#*************************
+#   Bidirectional A*
+#*************************
+class BidirectionalAStar():
+
+# Constructor makes one AStar in each direction.
+    def __init__(self, start_state, goal_state, func_heuristic, func_backward_heuristic, func_adjacent_states,
+                 func_cost=lambda x, y: 1, func_predecessor_states=None, priority_order=None):
+
+        func_predecessor_states = func_adjacent_states if func_predecessor_states is None else func_predecessor_states
+        # The searches are driven from here, so they are never told they reached the goal.
+        self.forward = AStar(start_state, func_heuristic, func_adjacent_states, lambda state: False, func_cost,
+                             priority_order)
+        self.backward = AStar(goal_state, func_backward_heuristic, func_predecessor_states, lambda state: False,
+                              lambda state, predecessor: func_cost(predecessor, state), priority_order)
+        self.cost = None
+        self.expansions = 0
+
+    # Method for running the two searches until the shortest path is known.
+    def run(self):
+        searches = (self.forward, self.backward)
+        self.cost, meeting = inf, None
+        self.expansions = 0
+        if self.forward.open.peek().state in self.backward.state_node_map:
+            self.cost, meeting = 0, self.forward.open.peek().state
+
+        while self.forward.open.size() and self.backward.open.size():
+            if self.cost <= max(self.forward.open.peek().f_cost, self.backward.open.peek().f_cost):
+                break
+
+            # Expand the search with the fewest open nodes.
+            direction = 0 if self.forward.open.size() <= self.backward.open.size() else 1
+            search, other = searches[direction], searches[1 - direction]
+            current_node = search.open.pop()
+            if verbose: print('pop id:', current_node.state, 'backward' if direction else 'forward')
+            current_node.status = CLOSED
+            search.closed.append(current_node)
+            self.expansions += 1
+            successors = search.expand(current_node)
+
+            # Every state reached by both searches gives a path.
+            for node in successors:
+                other_node = other.state_node_map.get(node.state)
+                if other_node is not None and node.g_cost + other_node.g_cost < self.cost:
+                    self.cost, meeting = node.g_cost + other_node.g_cost, node.state
+
+        if meeting is None:
+            print("No solution was found.")
+            self.cost = None
+            return None
+        return self.find_path(meeting)
+
+
+# Helping methods
+
+    # Joins the path from the start to the meeting state with the path from the meeting state to the goal.
+    def find_path(self, meeting):
+        path = []
+        node = self.forward.state_node_map[meeting]
+        while node is not None:
+            path.append(node.state)
+            node = node.parent
+        path.reverse()
+        node = self.backward.state_node_map[meeting].parent
+        while node is not None:
+            path.append(node.state)
+            node = node.parent
+        return path
+
+
+
+#*************************
+#         Test
+#*************************
+import numpy as np
+
+import Part1and2
+from Map import Map_Obj
+
+# Checks that the costs are the same as AStar on random queries on the tasks, and that the paths cost what they should.
+def func_test():
+    rng = np.random.default_rng(0)
+    for task in (1, 3, 4):
+        map_obj = Map_Obj(task)
+        free = np.argwhere(map_obj.int_map != -1).tolist()
+        same_costs, valid_paths, expansions, bidirectional_expansions = True, True, 0, 0
+        for i in range(20):
+            map_obj.start_pos, map_obj.goal_pos = free[rng.integers(len(free))], free[rng.integers(len(free))]
+            start_state = (map_obj, *map_obj.get_start_pos())
+            goal_state = (map_obj, *map_obj.get_goal_pos())
+            a_star = AStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                           Part1and2.goal_evaluate, Part1and2.find_cost)
+            node_path = a_star.run()
+            bidirectional = BidirectionalAStar(start_state, goal_state, Part1and2.walking_distance,
+                                               Part1and2.walking_distance_to_start, Part1and2.generate_adjacent_states,
+                                               Part1and2.find_cost)
+            path = bidirectional.run()
+            same_costs = same_costs and node_path[-1].g_cost == bidirectional.cost
+            valid_paths = valid_paths and path[0] == start_state and path[-1] == goal_state and \
+                sum(Part1and2.find_cost(a, b) for a, b in zip(path[:-1], path[1:])) == bidirectional.cost
+            expansions += len(a_star.closed)
+            bidirectional_expansions += bidirectional.expansions
+        print('Task', task, 'same costs:', same_costs, 'valid paths:', valid_paths, 'expansions:', expansions, '->',
+              bidirectional_expansions)
+
+    # A directed graph, where the edges can only be followed backwards with the predecessors.
+    graph = {1: {2: 1, 3: 4}, 2: {3: 1, 4: 5}, 3: {4: 1}, 4: {}}
+    predecessors = {state: [other for other in graph if state in graph[other]] for state in graph}
+    bidirectional = BidirectionalAStar(1, 4, lambda state: 0, lambda state: 0, lambda state: list(graph[state]),
+                                       lambda state, next_state: graph[state][next_state], lambda state: predecessors[state])
+    print('Directed graph, expect: [1, 2, 3, 4] cost 3, got:', bidirectional.run(), 'cost', bidirectional.cost)
+
+if __name__ == "__main__":
+    func_test()
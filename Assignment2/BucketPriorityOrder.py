@@ -0,0 +1,234 @@
+"""
+Contains a bucket queue (Dial's algorithm) used as a min priority order when all sorting values are integers.
+
+Every integer value has its own bucket, and a cursor points at the lowest bucket that can be non-empty. In A* with a
+consistent heuristic the values that are popped never decrease, so the cursor only moves forward and push and pop are
+O(1) amortised. A value lower than the cursor moves the cursor back, so the order is always correct.
+
+Elements with the same sorting value are popped in the order they were pushed. An element that is moved by update is
+put last in its new bucket. The element is left behind in the old bucket and skipped when that bucket is reached.
+
+There is a bucket for every integer between the lowest and the highest value pushed, so a few values far apart, like
+edge costs in the millions, would need millions of buckets. The order refuses to span more than max_buckets values, and
+raises an OverflowError instead, so the caller can move the elements to a heap.
+
+The interface is the same as IndexedMinPriorityOrder, so AStar can use either.
+
+Input:
+meth_soring_value:      Method invoked on elements to be sorted, returning the value they should be sorted by.
+max_buckets:            The most buckets the order can have, i.e. the largest span between the lowest and highest value.
+
+Behaviour:
+push(element):          Pushes an element in the right bucket. Raises a TypeError if the value is not an integer, and an
+                        OverflowError if the values would span more than max_buckets buckets.
+pop():                  Returns the first element in the order and deletes it internally.
+peek():                 Returns the first element in the order without removing it.
+update(element):        Moves an element after its sorting value has changed. Without element the whole order is rebuilt.
+contains(element):      Returns True if the element is in the order.
+size():                 Returns the amount of elements in the order.
+elements():             Returns the elements in the order.
+is_integral(value):     Returns True if the value can be used as a bucket.
+"""
+
+
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+# The default largest amount of buckets. Every bucket is an empty deque of less than a kilobyte until it is used.
+MAX_BUCKETS = 1 << 14
+
+#*************************
+#        Imports
+#*************************
+from collections import deque
+from numbers import Integral
+
+
+#*************************
+#       Functions
+#*************************
+
+# Returns True if the value is an integer, also if it is a float or numpy number with an integer value.
+def is_integral(value):
+    if isinstance(value, Integral):
+        return True
+    try:
+        return float(value).is_integer()
+    except (TypeError, ValueError):
+        return False
+
+
+#*************************
+#         Class
+#*************************
+class BucketPriorityOrder():
+
+# Constructor
+    def __init__(self, meth_sorting_value, *elements, max_buckets=MAX_BUCKETS):
+
+        self.meth_sorting_value = meth_sorting_value
+        self.max_buckets = max_buckets
+
+        # Buckets from the lowest value to the highest value pushed, each holding (push number, element) in a deque.
+        self.__buckets = []
+        self.__offset = 0  # The value of the first bucket.
+        self.__cursor = 0  # Index of the lowest bucket that can be non-empty.
+        # Maps every element in the order to its bucket index and push number. Entries that do not match are stale.
+        self.__index = {}
+        self.__push_counter = 0
+        for element in elements:
+            self.push(element)
+
+    # Method for adding an element. An element allready in the order is only moved.
+    def push(self, push_element):
+        value = self.meth_sorting_value(push_element)
+        if not is_integral(value):
+            raise TypeError('BucketPriorityOrder can only sort by integer values, got ' + str(value))
+        bucket = self.__bucket_index(int(value))
+        self.__index[push_element] = (bucket, self.__push_counter)
+        self.__buckets[bucket].append((self.__push_counter, push_element))
+        self.__push_counter += 1
+        if bucket < self.__cursor:
+            self.__cursor = bucket
+        if verbose: print('push', value, 'in bucket', bucket)
+        return True
+
+    # Method for returning and removing the first element in the order
+    def pop(self):
+        buckets, index = self.__buckets, self.__index
+        while self.__cursor < len(buckets):
+            bucket = buckets[self.__cursor]
+            while bucket:
+                push_number, element = bucket.popleft()
+                if index.get(element) == (self.__cursor, push_number):
+                    del index[element]
+                    if verbose: print('Found element:', self.__cursor + self.__offset)
+                    return element
+            self.__cursor += 1
+        print('pop gave a IndexError')
+        return None
+
+    # Method for returning the first element without removing it. Stale entries in front are thrown away.
+    def peek(self):
+        buckets, index = self.__buckets, self.__index
+        while self.__cursor < len(buckets):
+            bucket = buckets[self.__cursor]
+            while bucket:
+                push_number, element = bucket[0]
+                if index.get(element) == (self.__cursor, push_number):
+                    return element
+                bucket.popleft()
+            self.__cursor += 1
+        return None
+
+    # Method for restacking the priority order. Given an element only that element is moved.
+    def update(self, element=None):
+        if element is None:
+            elements = self.elements()
+            self.__init__(self.meth_sorting_value, *elements, max_buckets=self.max_buckets)
+            return True
+        if element not in self.__index:
+            return False
+        return self.push(element)
+
+    # Method for checking if an element is in the order.
+    def contains(self, element):
+        return element in self.__index
+
+    def __contains__(self, element):
+        return element in self.__index
+
+    # Method for returning amount of elements in order
+    def size(self):
+        return len(self.__index)
+
+    # Method for returning the elements in the order, sorted.
+    def elements(self):
+        return [element for bucket_index, bucket in enumerate(self.__buckets) for push_number, element in bucket
+                if self.__index.get(element) == (bucket_index, push_number)]
+
+    # Prints the internal state of the order.
+    def print_order(self):
+        print([self.meth_sorting_value(element) for element in self.elements()])
+
+
+# Helping methods
+
+    # Returns the index of the bucket for the value, and adds buckets if needed. Nothing is changed if the buckets
+    # would be too many.
+    def __bucket_index(self, value):
+        if not self.__buckets:
+            self.__offset = value
+        span = max(value, self.__offset + len(self.__buckets) - 1) - min(value, self.__offset) + 1
+        if span > self.max_buckets:
+            raise OverflowError('BucketPriorityOrder would need ' + str(span) + ' buckets, more than '
+                                + str(self.max_buckets))
+        if value < self.__offset:
+            # Buckets are added in front, so every index has to be moved.
+            shift = self.__offset - value
+            self.__buckets[0:0] = [deque() for i in range(shift)]
+            self.__index = {element: (bucket + shift, push_number) for element, (bucket, push_number) in self.__index.items()}
+            self.__cursor += shift
+            self.__offset = value
+        bucket = value - self.__offset
+        while bucket >= len(self.__buckets):
+            self.__buckets.append(deque())
+        return bucket
+
+
+
+#*************************
+#         Test
+#*************************
+import random
+
+class Node():
+    def __init__(self, state, f_cost=None):
+        self.state = state
+        self.f_cost = f_cost
+
+def func_test():
+    nodes = []
+    for i in range(200):
+        nodes.append(Node(i, random.randrange(5, 25)))
+    order = BucketPriorityOrder(lambda x: x.f_cost, *nodes)
+
+    # Lower the value of some of the nodes, also below the lowest bucket, the order should follow.
+    for node in random.sample(nodes, 50):
+        node.f_cost -= random.randrange(0, 10)
+        order.update(node)
+
+    expected = sorted(nodes, key=lambda x: x.f_cost)
+    poped = []
+    while order.size():
+        poped.append(order.pop())
+    print('Sorted correctly:', [node.f_cost for node in poped] == [node.f_cost for node in expected])
+
+    # Equal values should come out in the order they were pushed.
+    order = BucketPriorityOrder(lambda x: x.f_cost, *[Node(i, 1) for i in range(10)])
+    print('FIFO on ties:', [order.pop().state for i in range(10)] == list(range(10)))
+
+    order = BucketPriorityOrder(lambda x: x.f_cost, *nodes)
+    print('Peek gives the next pop:', all(order.peek() is order.pop() for i in range(len(nodes))) and order.peek() is None)
+
+    try:
+        order.push(Node(10, 1.5))
+        print('Non integer value accepted.')
+    except TypeError:
+        print('Non integer value refused.')
+
+    # Values far apart are refused, above and below, and the order is left as it was.
+    order = BucketPriorityOrder(lambda x: x.f_cost, Node(0, 5000000), max_buckets=100)
+    refused = 0
+    for value in (5000100, 4999900):
+        try:
+            order.push(Node(1, value))
+        except OverflowError:
+            refused += 1
+    order.push(Node(2, 5000099))
+    print('Values too far apart refused:', refused == 2, 'order kept:', [order.pop().state for i in range(2)] == [0, 2])
+
+if __name__ == "__main__":
+    func_test()
@@ -0,0 +1,285 @@
+"""
+Contains a contraction hierarchy (CH), an index for answering many point-to-point queries on a map that does not change.
+
+The passable cells of the map are the nodes of a graph, with an edge to every neighbour. Like in find_cost, the weight of
+an edge is the cost of the cell that is entered (times sqrt(2) for diagonal moves). The graph is directed, since the
+two directions between two cells can have different costs.
+
+Building the index contracts the nodes one at a time, from the least to the most important. Contracting a node removes
+it from the graph, and for every path u -> node -> w that is the only shortest path between u and w, a shortcut edge
+u -> w is added. A node's rank is the order it was contracted in. The importance of a node is the amount of edges it
+would add minus the amount it removes, plus the amount of its neighbours allready contracted.
+
+A query is a Dijkstra search from the start that only goes up to nodes of higher rank, and one from the goal that goes
+up along reversed edges. The searches meet at the most important node on the shortest path. The shortcuts on the path
+are then unpacked into the cells they skipped, so the result is the full list of cells, like the paths from GridAStar.
+
+ContractionHierarchy takes the following input:
+map_obj:                            The Map_Obj to build the index for. Changes to the map afterwards are not seen.
+diagonal:                           If True diagonal moves are allowed, like in GridAStar.
+settle_limit:                       The most nodes a witness search may settle before a shortcut is added anyway.
+
+Behaviour:
+query(start_pos=None, goal_pos=None):   Returns the path as a list of positions [x, y], or None if there is no path.
+cost:                                   Cost of the path found by the last query.
+settled:                                Amount of nodes settled by the last query.
+shortcuts:                              Amount of shortcut edges added when building.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from heapq import heappush, heappop, heapify
+from math import inf, sqrt
+
+import numpy as np
+
+
+#*************************
+#    CH as a class
+#*************************
+class ContractionHierarchy():
+
+# Constructor builds the graph from the map and contracts it.
+    def __init__(self, map_obj, diagonal=False, settle_limit=64):
+
+        self.map_obj = map_obj
+        self.diagonal = diagonal
+        self.settle_limit = settle_limit
+        self.height, self.width = map_obj.int_map.shape
+
+        # Edges of the graph that is left while contracting, as {node: {neighbour: weight}} in both directions.
+        self.out_edges, self.in_edges = self.make_graph(map_obj.int_map)
+        # The node an edge skips, for every shortcut.
+        self.middles = {}
+        # The edges going up in rank from every node, as lists of (neighbour, weight). The upward edges into a node are
+        # used by the search from the goal.
+        self.up_out = {}
+        self.up_in = {}
+        self.rank = {}
+        self.shortcuts = 0
+        self.contract_all()
+
+        self.cost = None
+        self.settled = 0
+
+    # Method for finding the path between two positions.
+    def query(self, start_pos=None, goal_pos=None):
+        start_pos = self.map_obj.get_start_pos() if start_pos is None else start_pos
+        goal_pos = self.map_obj.get_goal_pos() if goal_pos is None else goal_pos
+        start, goal = self.to_node(start_pos), self.to_node(goal_pos)
+        self.settled = 0
+        if start not in self.rank or goal not in self.rank:
+            print("No solution was found.")
+            self.cost = None
+            return None
+
+        # One search in each direction, run in turns. A search stops when its smallest key is no better than the best
+        # meeting point found so far.
+        costs = ({start: 0}, {goal: 0})
+        parents = ({start: None}, {goal: None})
+        heaps = ([(0, start)], [(0, goal)])
+        settled = (set(), set())
+        edges = (self.up_out, self.up_in)
+        best, meeting = inf, None
+        direction = 0
+        while heaps[0] or heaps[1]:
+            if not heaps[direction]:
+                direction = 1 - direction
+            heap = heaps[direction]
+            cost, node = heappop(heap)
+            if cost >= best:
+                heap.clear()
+                direction = 1 - direction
+                continue
+            if node in settled[direction]:
+                continue
+            settled[direction].add(node)
+            self.settled += 1
+            if node in costs[1 - direction] and cost + costs[1 - direction][node] < best:
+                best, meeting = cost + costs[1 - direction][node], node
+            for neighbour, weight in edges[direction][node]:
+                new_cost = cost + weight
+                if new_cost < costs[direction].get(neighbour, inf):
+                    costs[direction][neighbour] = new_cost
+                    parents[direction][neighbour] = node
+                    heappush(heap, (new_cost, neighbour))
+            direction = 1 - direction
+
+        if meeting is None:
+            print("No solution was found.")
+            self.cost = None
+            return None
+        self.cost = best
+
+        # The nodes from the start up to the meeting node, and from there down to the goal.
+        nodes = []
+        node = meeting
+        while node is not None:
+            nodes.append(node)
+            node = parents[0][node]
+        nodes.reverse()
+        node = parents[1][meeting]
+        while node is not None:
+            nodes.append(node)
+            node = parents[1][node]
+        return [self.to_pos(node) for node in self.unpack(nodes)]
+
+
+# Helping methods
+
+    # Converts a position [x, y] to a node.
+    def to_node(self, pos):
+        return int(pos[0]) * self.width + int(pos[1])
+
+    # Converts a node to a position [x, y].
+    def to_pos(self, node):
+        return list(divmod(node, self.width))
+
+    # Makes the directed graph of the passable cells.
+    def make_graph(self, int_map):
+        moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        if self.diagonal:
+            moves += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        out_edges, in_edges = {}, {}
+        for x, y in np.argwhere(int_map != -1):
+            node = self.to_node([x, y])
+            out_edges.setdefault(node, {})
+            in_edges.setdefault(node, {})
+            for i, j in moves:
+                if 0 <= x + i < self.height and 0 <= y + j < self.width and int_map[x + i, y + j] != -1:
+                    neighbour = self.to_node([x + i, y + j])
+                    weight = float(int_map[x + i, y + j]) * (sqrt(2) if i != 0 and j != 0 else 1)
+                    out_edges[node][neighbour] = weight
+                    in_edges.setdefault(neighbour, {})[node] = weight
+        return out_edges, in_edges
+
+    # Contracts all nodes in order of importance. The importance is computed again when a node is popped, and the node
+    # is put back if it is no longer the least important.
+    def contract_all(self):
+        contracted_neighbours = dict.fromkeys(self.out_edges, 0)
+        heap = [(self.importance(node, 0), node) for node in self.out_edges]
+        heapify(heap)
+        while heap:
+            importance, node = heappop(heap)
+            importance = self.importance(node, contracted_neighbours[node])
+            if heap and importance > heap[0][0]:
+                heappush(heap, (importance, node))
+                continue
+            neighbours = set(self.out_edges[node]) | set(self.in_edges[node])
+            self.contract(node)
+            for neighbour in neighbours:
+                contracted_neighbours[neighbour] += 1
+            if verbose: print('Contracted', self.to_pos(node), 'as number', self.rank[node])
+
+    # How important a node is. Nodes adding few shortcuts compared to the edges they remove are contracted first.
+    def importance(self, node, contracted_neighbours):
+        shortcuts = len(self.find_shortcuts(node))
+        return shortcuts - len(self.out_edges[node]) - len(self.in_edges[node]) + contracted_neighbours
+
+    # Finds the shortcuts needed when the node is removed, as a list of (u, w, weight).
+    def find_shortcuts(self, node):
+        shortcuts = []
+        out_edges = self.out_edges[node]
+        for u, weight_in in self.in_edges[node].items():
+            targets = {w: weight_in + weight_out for w, weight_out in out_edges.items() if w != u}
+            if not targets:
+                continue
+            witness_costs = self.witness_search(u, node, targets, max(targets.values()))
+            for w, weight in targets.items():
+                if witness_costs.get(w, inf) > weight:
+                    shortcuts.append((u, w, weight))
+        return shortcuts
+
+    # Dijkstra from u without going through the node, stopping at max_cost or when enough nodes are settled. Returns
+    # the costs found to the targets.
+    def witness_search(self, u, node, targets, max_cost):
+        costs = {u: 0}
+        heap = [(0, u)]
+        settled = 0
+        remaining = len(targets)
+        while heap and settled < self.settle_limit and remaining:
+            cost, current = heappop(heap)
+            if cost > costs[current]:
+                continue
+            if cost > max_cost:
+                break
+            settled += 1
+            if current in targets:
+                remaining -= 1
+            for neighbour, weight in self.out_edges[current].items():
+                if neighbour == node:
+                    continue
+                new_cost = cost + weight
+                if new_cost < costs.get(neighbour, inf):
+                    costs[neighbour] = new_cost
+                    heappush(heap, (new_cost, neighbour))
+        return costs
+
+    # Removes a node from the graph, and adds the shortcuts needed to keep the shortest paths.
+    def contract(self, node):
+        self.rank[node] = len(self.rank)
+        self.up_out[node] = list(self.out_edges[node].items())
+        self.up_in[node] = list(self.in_edges[node].items())
+        for u, w, weight in self.find_shortcuts(node):
+            if weight < self.out_edges[u].get(w, inf):
+                self.out_edges[u][w] = weight
+                self.in_edges[w][u] = weight
+                self.middles[(u, w)] = node
+                self.shortcuts += 1
+        for w in self.out_edges.pop(node):
+            del self.in_edges[w][node]
+        for u in self.in_edges.pop(node):
+            del self.out_edges[u][node]
+
+    # Replaces every shortcut between two nodes on the path with the nodes it skipped.
+    def unpack(self, nodes):
+        path = [nodes[0]]
+        stack = [(nodes[i], nodes[i + 1]) for i in range(len(nodes) - 2, -1, -1)]
+        while stack:
+            u, w = stack.pop()
+            middle = self.middles.get((u, w))
+            if middle is None:
+                path.append(w)
+            else:
+                stack.append((middle, w))
+                stack.append((u, middle))
+        return path
+
+
+
+#*************************
+#         Test
+#*************************
+from Map import Map_Obj
+from GridAStar import GridAStar
+
+# Checks the costs of random queries against GridAStar, and that the paths are connected and cost what they should.
+def func_test():
+    rng = np.random.default_rng(0)
+    for diagonal in (False, True):
+        for task in (1, 3, 4):
+            map_obj = Map_Obj(task)
+            hierarchy = ContractionHierarchy(map_obj, diagonal)
+            grid_a_star = GridAStar(map_obj, diagonal)
+            free = np.argwhere(map_obj.int_map != -1).tolist()
+            same_costs, valid_paths = True, True
+            for i in range(100):
+                start_pos, goal_pos = free[rng.integers(len(free))], free[rng.integers(len(free))]
+                path = hierarchy.query(start_pos, goal_pos)
+                grid_a_star.run(start_pos, goal_pos)
+                same_costs = same_costs and abs(hierarchy.cost - grid_a_star.cost) < 1e-9
+                steps = zip(path[:-1], path[1:])
+                path_cost = sum(map_obj.get_cell_value(b) * (sqrt(2) if a[0] != b[0] and a[1] != b[1] else 1)
+                                for a, b in steps)
+                valid_paths = valid_paths and path[0] == start_pos and path[-1] == goal_pos and \
+                    abs(path_cost - hierarchy.cost) < 1e-9
+            print('Task', task, 'diagonal:', diagonal, 'shortcuts:', hierarchy.shortcuts, 'same costs:', same_costs,
+                  'valid paths:', valid_paths)
+
+if __name__ == "__main__":
+    func_test()
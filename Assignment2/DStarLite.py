@@ -0,0 +1,258 @@
+"""
+Contains D* Lite, an incremental planner for when the goal moves or the map changes between searches.
+
+In task 5 the goal moves towards end_goal_pos while we are walking towards it. Running A* again from scratch every tick
+throws away everything that was found in the previous search. D* Lite searches backwards from the goal, so the g-cost of
+a cell is the cost from that cell to the goal. The costs are kept between the searches, and only the cells whose costs
+are affected by a change are searched again:
+- When the start moves, the keys in the open list are corrected with an offset (km) instead of being recomputed.
+- When a cell in the map changes, only the cells next to it are updated.
+- When the goal moves, it is handled like a change of the edge from the old and the new goal to the end of the search.
+
+Changes to the map are found by comparing the map with the costs the planner knows of, so the map can be changed through
+replace_map_values or set_cell_value as usual.
+
+DStarLite is a GridAStar, and takes the same input.
+
+Behaviour:
+run(start_pos=None, goal_pos=None):     Plans from start_pos to goal_pos, reusing the previous searches. Returns the path
+                                        as a list of positions [x, y], or None if there is no path.
+expansions:                             Amount of cells expanded by the last run.
+track_moving_goal(map_obj, diagonal=False):
+                                        Walks one cell along the planned path for every tick of the map, until the goal
+                                        is reached. Returns a row for every replan with the expansions D* Lite used and
+                                        the expansions a new GridAStar search used.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from math import inf
+
+import numpy as np
+
+from GridAStar import GridAStar
+from IndexedMinPriorityOrder import IndexedMinPriorityOrder
+
+
+#*************************
+#   D* Lite as a class
+#*************************
+class DStarLite(GridAStar):
+
+# Constructor sets up the same arrays as GridAStar, and the arrays kept between the searches.
+    def __init__(self, map_obj, diagonal=False):
+        GridAStar.__init__(self, map_obj, diagonal)
+
+        # g_costs from GridAStar are the cost to the goal. rhs_costs are the one step lookahead of them.
+        self.rhs_costs = np.empty(self.size, dtype=np.float64)
+        self.keys = {}
+        self.open = None
+        self.km = 0
+        self.start = None
+        self.last_start = None
+        self.goal = None
+
+    # Method for planning from start_pos to goal_pos.
+    def run(self, start_pos=None, goal_pos=None):
+        start_pos = self.map_obj.get_start_pos() if start_pos is None else start_pos
+        goal_pos = self.map_obj.get_goal_pos() if goal_pos is None else goal_pos
+        start, goal = self.to_index(start_pos), self.to_index(goal_pos)
+        self.expansions = 0
+
+        if self.open is None:
+            self.initialize(start, goal)
+        else:
+            # The keys in open are lower bounds as long as km grows with the distance the start has moved.
+            self.start = start
+            self.km += self.heuristic(self.last_start, start)
+            self.last_start = start
+            for cell in self.changed_cells():
+                self.update_rhs(cell)
+                for offset, factor in self.neighbours:
+                    self.update_rhs(cell - offset)
+            if goal != self.goal:
+                old_goal, self.goal = self.goal, goal
+                self.rhs_costs[goal] = 0
+                self.update_vertex(goal)
+                self.update_rhs(old_goal)
+
+        self.compute_shortest_path()
+        if self.g_costs[start] == inf:
+            print("No solution was found.")
+            self.cost = None
+            return None
+        self.cost = float(self.g_costs[start])
+        return self.find_path(start)
+
+
+# Helping methods
+
+    # Sets up the first search.
+    def initialize(self, start, goal):
+        self.update_costs()
+        self.g_costs.fill(inf)
+        self.rhs_costs.fill(inf)
+        self.keys = {}
+        self.open = IndexedMinPriorityOrder(lambda cell: self.keys[cell])
+        self.km = 0
+        self.start = self.last_start = start
+        self.goal = goal
+        self.rhs_costs[goal] = 0
+        self.update_vertex(goal)
+
+    # Returns the cost of moving from one cell to the next, given the offset between them.
+    def move_cost(self, cell, factor):
+        cell_cost = self.costs[cell]
+        return inf if cell_cost == -1 else cell_cost * factor
+
+    # The heuristic between two cells. It is a lower bound since every cell costs at least 1.
+    def heuristic(self, cell, other):
+        row, col = divmod(int(cell), self.padded_width)
+        other_row, other_col = divmod(int(other), self.padded_width)
+        d_row, d_col = abs(row - other_row), abs(col - other_col)
+        if self.diagonal:
+            return max(d_row, d_col) + (2 ** 0.5 - 1) * min(d_row, d_col)
+        return d_row + d_col
+
+    # Returns the key of a cell in the open list.
+    def calculate_key(self, cell):
+        cost = min(self.g_costs[cell], self.rhs_costs[cell])
+        return (cost + self.heuristic(self.start, cell) + self.km, cost)
+
+    # Puts the cell in open if it is inconsistent, and takes it out if it is consistent.
+    def update_vertex(self, cell):
+        if self.g_costs[cell] != self.rhs_costs[cell]:
+            self.keys[cell] = self.calculate_key(cell)
+            self.open.push(cell)
+        elif self.open.contains(cell):
+            self.open.remove(cell)
+            del self.keys[cell]
+
+    # Computes the rhs of a cell from its successors, and updates it in open. A wall can not reach the goal.
+    def update_rhs(self, cell):
+        if cell == self.goal:
+            return
+        rhs = inf
+        if self.costs[cell] != -1:
+            for offset, factor in self.neighbours:
+                successor = cell + offset
+                rhs = min(rhs, self.move_cost(successor, factor) + self.g_costs[successor])
+        self.rhs_costs[cell] = rhs
+        self.update_vertex(cell)
+
+    # Expands cells until the start is consistent and no cell in open can give it a cheaper path.
+    def compute_shortest_path(self):
+        g_costs, rhs_costs = self.g_costs, self.rhs_costs
+        while self.open.size():
+            cell = self.open.peek()
+            old_key = self.keys[cell]
+            if old_key >= self.calculate_key(self.start) and rhs_costs[self.start] == g_costs[self.start]:
+                break
+            self.expansions += 1
+            if verbose: print('pop id:', self.to_pos(cell))
+            new_key = self.calculate_key(cell)
+            if old_key < new_key:
+                self.keys[cell] = new_key
+                self.open.update(cell)
+            elif g_costs[cell] > rhs_costs[cell]:
+                g_costs[cell] = rhs_costs[cell]
+                self.open.remove(cell)
+                del self.keys[cell]
+                for offset, factor in self.neighbours:
+                    predecessor = cell - offset
+                    if predecessor != self.goal and self.costs[predecessor] != -1:
+                        rhs_costs[predecessor] = min(rhs_costs[predecessor], self.move_cost(cell, factor) + g_costs[cell])
+                        self.update_vertex(predecessor)
+            else:
+                g_costs[cell] = inf
+                self.update_rhs(cell)
+                for offset, factor in self.neighbours:
+                    self.update_rhs(cell - offset)
+
+    # Returns the flat indices of the cells that have changed in the map, and reads in the new costs.
+    def changed_cells(self):
+        costs = self.costs.copy()
+        self.update_costs()
+        return np.flatnonzero(costs != self.costs)
+
+    # Follows the cheapest successors from the start to the goal.
+    def find_path(self, cell):
+        path = [self.to_pos(cell)]
+        while cell != self.goal:
+            cell = min(((cell + offset, factor) for offset, factor in self.neighbours),
+                       key=lambda move: self.move_cost(move[0], move[1]) + self.g_costs[move[0]])[0]
+            path.append(self.to_pos(cell))
+        return path
+
+
+#*************************
+#     Driver for task 5
+#*************************
+
+# Follows the moving goal one cell per tick until it is reached. Every tick is planned both with D* Lite and with a new
+# GridAStar search, so the amount of expansions can be compared.
+def track_moving_goal(map_obj, diagonal=False):
+    planner = DStarLite(map_obj, diagonal)
+    full_search = GridAStar(map_obj, diagonal)
+    position = map_obj.get_start_pos()
+    rows = []
+    while True:
+        goal_pos = map_obj.get_goal_pos()
+        full_search.update_costs()
+        full_search.run(position, goal_pos)
+        path = planner.run(position, goal_pos)
+        rows.append((len(rows), list(position), list(goal_pos), planner.expansions, full_search.expansions,
+                     planner.cost, full_search.cost))
+        if path is None or len(path) == 1:
+            return rows
+        position = path[1]
+        if position == map_obj.get_goal_pos():
+            return rows
+        map_obj.tick()
+
+
+
+#*************************
+#         Test
+#*************************
+from Map import Map_Obj
+
+# Tracks the moving goal in task 5 and checks that the plans are as cheap as a new search. Then random cells in map 3
+# are changed between the plans, and the start and goal are moved.
+def func_test():
+    rows = track_moving_goal(Map_Obj(5))
+    print('Replans:', len(rows), 'D* Lite expansions:', sum(row[3] for row in rows),
+          'new search expansions:', sum(row[4] for row in rows))
+    print('Same costs as new search:', all(row[5] == row[6] for row in rows))
+
+    rng = np.random.default_rng(0)
+    for diagonal in (False, True):
+        map_obj = Map_Obj(3)
+        planner, full_search = DStarLite(map_obj, diagonal), GridAStar(map_obj, diagonal)
+        free = [list(pos) for pos in np.argwhere(map_obj.int_map != -1)]
+        start_pos, goal_pos = map_obj.get_start_pos(), map_obj.get_goal_pos()
+        same_costs = True
+        for i in range(100):
+            pos = free[rng.integers(len(free))]
+            if pos != start_pos and pos != goal_pos:
+                map_obj.replace_map_values(pos, int(rng.choice([-1, 1, 2, 3, 4])), goal_pos)
+            if i % 10 == 0:
+                start_pos, goal_pos = free[rng.integers(len(free))], free[rng.integers(len(free))]
+                map_obj.replace_map_values(start_pos, 1, goal_pos)
+                map_obj.replace_map_values(goal_pos, 1, goal_pos)
+            planner.run(start_pos, goal_pos)
+            full_search.update_costs()
+            full_search.run(start_pos, goal_pos)
+            if planner.cost is None or full_search.cost is None:
+                same_costs = same_costs and planner.cost == full_search.cost
+            else:
+                same_costs = same_costs and abs(planner.cost - full_search.cost) < 1e-9
+        print('Diagonal:', diagonal, 'same costs after changing cells:', same_costs)
+
+if __name__ == "__main__":
+    func_test()
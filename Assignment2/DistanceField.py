@@ -0,0 +1,183 @@
+"""
+Contains a distance field, the exact cost from every cell on the map to a goal.
+
+When many agents go to the same goal it is cheaper to search once backwards from the goal than to run A* for every
+agent. The field is computed with GridAStar.dijkstra(goal, reverse=True), and kept for every goal asked for. A field is
+only used as long as the version of the map is the same as when it was computed, so a field made before a cell was
+changed through replace_map_values or set_cell_value is computed again. The fields used least recently are thrown away
+when there are more than max_fields.
+
+Since the field is the exact cost, it is a perfect heuristic. AStar with it only expands cells on the shortest paths.
+
+DistanceField takes the following input:
+map_obj:                            The Map_Obj to compute the fields for.
+diagonal:                           If True diagonal moves are allowed, like in GridAStar.
+max_fields:                         The most fields that are kept.
+
+Behaviour:
+field(goal_pos=None):               Returns the cost from every cell to the goal, as an array shaped like the map. Walls
+                                    and cells that can not reach the goal are inf. The goal of the map is used by default.
+heuristic(state):                   Can be given to AStar as func_heuristic. The state is (Map_Obj, x, y) like in
+                                    Part1and2.py, and the goal is the goal of the map.
+next_step(pos, goal_pos=None):      Returns the neighbour to move to from pos, or None if pos is the goal or can not
+                                    reach it.
+path(pos, goal_pos=None):           Returns the path from pos to the goal by following next_step, or None.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from collections import OrderedDict
+from math import inf
+
+import numpy as np
+
+from GridAStar import GridAStar
+
+
+#*************************
+# Distance field as class
+#*************************
+class DistanceField():
+
+# Constructor
+    def __init__(self, map_obj, diagonal=False, max_fields=8):
+
+        self.map_obj = map_obj
+        self.diagonal = diagonal
+        self.max_fields = max_fields
+        self.grid = GridAStar(map_obj, diagonal)
+        # The version of the map the costs in grid were read at.
+        self.version = map_obj.version
+
+        # The fields by (version, goal), with the one used last at the end. Every field is kept both shaped like the
+        # map, and flat with the padding of GridAStar so steps can be found from the flat indices.
+        self.fields = OrderedDict()
+
+    # Returns the cost from every cell to the goal.
+    def field(self, goal_pos=None):
+        return self.get_fields(goal_pos)[0]
+
+    # Method to give to AStar as func_heuristic.
+    def heuristic(self, state):
+        return float(self.field(state[0].get_goal_pos())[state[1], state[2]])
+
+    # Returns the neighbour with the lowest cost of moving there plus the cost from there to the goal.
+    def next_step(self, pos, goal_pos=None):
+        padded = memoryview(self.get_fields(goal_pos)[1])
+        cell = self.step(self.grid.to_index(pos), padded)
+        return None if cell is None else self.grid.to_pos(cell)
+
+    # Returns the path from pos to the goal, following next_step.
+    def path(self, pos, goal_pos=None):
+        padded = memoryview(self.get_fields(goal_pos)[1])
+        cell = self.grid.to_index(pos)
+        if padded[cell] == inf:
+            return None
+        path = [self.grid.to_pos(cell)]
+        cell = self.step(cell, padded)
+        while cell is not None:
+            path.append(self.grid.to_pos(cell))
+            cell = self.step(cell, padded)
+        return path
+
+
+# Helping methods
+
+    # Returns the field to the goal, and its padded flat version. The field is computed if it is not kept.
+    def get_fields(self, goal_pos):
+        goal_pos = self.map_obj.get_goal_pos() if goal_pos is None else goal_pos
+        key = (self.map_obj.version, int(goal_pos[0]), int(goal_pos[1]))
+        fields = self.fields.get(key)
+        if fields is not None:
+            self.fields.move_to_end(key)
+            return fields
+
+        if self.version != self.map_obj.version:
+            # Fields made for an older map can never be used again.
+            self.grid.update_costs()
+            self.version = self.map_obj.version
+            self.fields = OrderedDict((old_key, old_fields) for old_key, old_fields in self.fields.items()
+                                      if old_key[0] == self.version)
+        if verbose: print('Computing the field to', goal_pos, 'at version', self.version)
+        field = self.grid.dijkstra(goal_pos, reverse=True)
+        field.flags.writeable = False
+        fields = (field, self.grid.g_costs.copy())
+        self.fields[key] = fields
+        if len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        return fields
+
+    # Returns the flat index of the best neighbour of a cell, or None at the goal or where the goal can not be reached.
+    def step(self, cell, padded):
+        if padded[cell] == 0 or padded[cell] == inf:
+            return None
+        costs = memoryview(self.grid.costs)
+        best, best_cost = None, inf
+        for offset, factor in self.grid.neighbours:
+            adjacent = cell + offset
+            if costs[adjacent] != -1:
+                cost = costs[adjacent] * factor + padded[adjacent]
+                if cost < best_cost:
+                    best, best_cost = adjacent, cost
+        return best
+
+
+
+#*************************
+#         Test
+#*************************
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+
+# Checks the field against GridAStar from random cells, that AStar with the field only expands the path, and that the
+# fields are computed again when the map changes.
+def func_test():
+    rng = np.random.default_rng(0)
+    for task in (1, 3, 4):
+        map_obj = Map_Obj(task)
+        distance_field = DistanceField(map_obj)
+        grid_a_star = GridAStar(map_obj)
+        free = np.argwhere(map_obj.int_map != -1).tolist()
+        same_costs, valid_paths = True, True
+        for i in range(20):
+            pos = free[rng.integers(len(free))]
+            grid_a_star.run(pos, map_obj.get_goal_pos())
+            same_costs = same_costs and distance_field.field()[pos[0], pos[1]] == grid_a_star.cost
+            path = distance_field.path(pos)
+            valid_paths = valid_paths and path[-1] == map_obj.get_goal_pos() and \
+                sum(map_obj.get_cell_value(step) for step in path[1:]) == grid_a_star.cost
+
+        start_state = (map_obj, *map_obj.get_start_pos())
+        a_star = AStar(start_state, distance_field.heuristic, Part1and2.generate_adjacent_states,
+                       Part1and2.goal_evaluate, Part1and2.find_cost)
+        node_path = a_star.run()
+        print('Task', task, 'same costs as GridAStar:', same_costs, 'valid paths:', valid_paths,
+              'AStar expansions with the field:', len(a_star.closed), 'path length:', len(node_path))
+
+    # Walls are put on the path of task 3, and the field should follow.
+    map_obj = Map_Obj(3)
+    distance_field = DistanceField(map_obj)
+    field = distance_field.field()
+    recomputed, same_costs = True, True
+    path = distance_field.path(map_obj.get_start_pos())
+    while path is not None:
+        map_obj.replace_map_values(path[len(path) // 2], -1, map_obj.get_goal_pos())
+        old_field, field = field, distance_field.field()
+        recomputed = recomputed and field is not old_field
+        grid_a_star = GridAStar(map_obj)
+        grid_a_star.run()
+        cost = field[map_obj.get_start_pos()[0], map_obj.get_start_pos()[1]]
+        same_costs = same_costs and (cost == grid_a_star.cost or (cost == inf and grid_a_star.cost is None))
+        path = distance_field.path(map_obj.get_start_pos())
+    print('Fields computed again after changes:', recomputed, 'same costs as GridAStar:', same_costs)
+    map_obj.replace_map_values([0, 0], map_obj.get_cell_value([0, 0]), map_obj.get_goal_pos())
+    print('Field kept when nothing changed:', distance_field.field() is field)
+
+if __name__ == "__main__":
+    func_test()
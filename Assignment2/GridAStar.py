@@ -0,0 +1,264 @@
+"""
+Contains an A* implementation that works directly on the integer map of a Map_Obj.
+
+AStar in AStar.py is the general reference implementation. It works on any states, but on a grid every successor is a
+new (Map_Obj, x, y) tuple and a new Node. GridAStar gives every cell a flat index instead, and keeps g-costs, parents
+and closed flags in numpy arrays that are allocated once per map. The only thing allocated per expansion is the entries
+pushed on the heap.
+
+The map is padded with a border of walls, so neighbours are found by adding precomputed offsets to the flat index
+without any bounds checks. The cost of a move is the value of the cell that is entered, like find_cost in Part1and2.py.
+Diagonal moves cost sqrt(2) times the cell value. The heuristic is the manhattan distance, or the octile distance when
+diagonal moves are used. The heuristic has to be consistent, so the cheapest cell should cost at least 1. Diagonal
+moves are allowed past the corners of walls, like generate_adjacent_states_dagonal, unless corner_cutting is False. Then
+a diagonal move needs both of the cells it passes to be free, which is the rule of the MovingAI benchmarks.
+
+Equal f-costs are expanded in the order the cells were first pushed, the same as AStar, so the paths are the same as the
+ones AStar finds with the functions in Part1and2.py.
+
+GridAStar takes the following input:
+map_obj:                            The Map_Obj to search in.
+diagonal:                           If True diagonal moves are allowed, like generate_adjacent_states_dagonal.
+corner_cutting:                     If False diagonal moves past the corner of a wall are not allowed. Only used by run
+                                    and dijkstra.
+costs:                              Padded costs made by pad_costs to search on instead of reading them from the map,
+                                    e.g. in shared memory. They are not copied, so update_costs changes them.
+
+Behaviour:
+run(start_pos=None, goal_pos=None): Returns the path as a list of positions [x, y], or None if there is no path. The
+                                    start and goal of the map are used if no positions are given.
+dijkstra(pos, reverse=False):       Returns the cost from pos to every cell as an array shaped like the map, or the cost
+                                    from every cell to pos if reverse is True. Unreachable cells and walls are inf.
+update_costs():                     Reads the costs from the map again. Must be called after the map has been changed.
+expansions:                         Amount of cells expanded by the last run.
+cost:                               Cost of the path found by the last run.
+pad_costs(int_map, costs=None):     Returns the costs of the map as a flat int64 array with a border of walls, the way
+                                    GridAStar searches them. Fills costs if it is given.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from heapq import heappush, heappop
+from math import sqrt, inf
+
+import numpy as np
+
+
+#*************************
+#  A* on the grid as class
+#*************************
+class GridAStar():
+
+# Constructor to take in the map and allocate the arrays used during the search.
+    def __init__(self, map_obj, diagonal=False, corner_cutting=True, costs=None):
+
+        self.map_obj = map_obj
+        self.diagonal = diagonal
+        self.corner_cutting = corner_cutting
+        self.height, self.width = map_obj.int_map.shape
+
+        # The map is padded with one wall on every side. padded_width is the step between two rows.
+        self.padded_width = self.width + 2
+        self.size = (self.height + 2) * self.padded_width
+        self.costs = pad_costs(map_obj.int_map) if costs is None else costs
+
+        # Offsets to the neighbours in the same order as generate_adjacent_states and generate_adjacent_states_dagonal,
+        # together with the factor the cost of the neighbour is multiplied with.
+        if diagonal:
+            moves = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i != 0 or j != 0]
+        else:
+            moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        self.neighbours = [(i * self.padded_width + j, sqrt(2) if i != 0 and j != 0 else 1) for i, j in moves]
+        # The two cells a diagonal move passes, by the offset of the move, when they both have to be free.
+        self.corners = {} if corner_cutting else {i * self.padded_width + j: (i * self.padded_width, j)
+                                                   for i, j in moves if i != 0 and j != 0}
+
+        # Arrays used during the search. They are reset at the start of every run. The search loop reads and writes
+        # them through memoryviews, which gives plain python numbers instead of allocating numpy scalars.
+        self.g_costs = np.empty(self.size, dtype=np.float64)
+        self.parents = np.empty(self.size, dtype=np.int64)
+        self.closed = np.empty(self.size, dtype=bool)
+        self.push_order = np.empty(self.size, dtype=np.int64)
+
+        self.expansions = 0
+        self.cost = None
+
+    # Method for running the search from start_pos to goal_pos.
+    def run(self, start_pos=None, goal_pos=None):
+        start_pos = self.map_obj.get_start_pos() if start_pos is None else start_pos
+        goal_pos = self.map_obj.get_goal_pos() if goal_pos is None else goal_pos
+        start, goal = self.to_index(start_pos), self.to_index(goal_pos)
+
+        self.reset()
+        g_costs, parents, closed = memoryview(self.g_costs), memoryview(self.parents), memoryview(self.closed)
+        push_order, costs, neighbours = memoryview(self.push_order), memoryview(self.costs), self.neighbours
+        corners = self.corners
+        heuristic = self.heuristic_function(goal)
+
+        # The heap holds (f_cost, push number, index). Cells are pushed again when their cost is lowered, and the old
+        # entries are skipped when they are popped, since the cell is closed by then.
+        g_costs[start] = 0
+        parents[start] = -1
+        push_order[start] = 0
+        push_counter = 1
+        open_heap = [(heuristic(start), 0, start)]
+
+        while open_heap:
+            current = heappop(open_heap)[2]
+            if closed[current]:
+                continue
+            closed[current] = True
+            self.expansions += 1
+            if verbose: print('pop id:', self.to_pos(current))
+
+            if current == goal:
+                self.cost = float(g_costs[goal])
+                return self.find_path(goal)
+
+            g_current = g_costs[current]
+            for offset, factor in neighbours:
+                adjacent = current + offset
+                cell_cost = costs[adjacent]
+                if cell_cost == -1 or closed[adjacent]:
+                    continue
+                if offset in corners:
+                    side_a, side_b = corners[offset]
+                    if costs[current + side_a] == -1 or costs[current + side_b] == -1:
+                        continue
+                g_adjacent = g_current + cell_cost * factor
+                if g_adjacent < g_costs[adjacent]:
+                    if g_costs[adjacent] == inf:
+                        push_order[adjacent] = push_counter
+                        push_counter += 1
+                    g_costs[adjacent] = g_adjacent
+                    parents[adjacent] = current
+                    heappush(open_heap, (g_adjacent + heuristic(adjacent), push_order[adjacent], adjacent))
+
+        print("No solution was found.")
+        self.cost = None
+        return None
+
+    # Method for finding the cost between pos and every cell, without a goal or heuristic. Since the cost of a move is the
+    # cost of the cell that is entered, a reverse search adds the cost of the cell it comes from instead.
+    def dijkstra(self, pos, reverse=False):
+        source = self.to_index(pos)
+        self.reset()
+        g_costs, closed = memoryview(self.g_costs), memoryview(self.closed)
+        costs, neighbours, corners = memoryview(self.costs), self.neighbours, self.corners
+
+        g_costs[source] = 0
+        open_heap = [(0, source)]
+        while open_heap:
+            g_current, current = heappop(open_heap)
+            if closed[current]:
+                continue
+            closed[current] = True
+            self.expansions += 1
+            for offset, factor in neighbours:
+                adjacent = current + offset
+                if costs[adjacent] == -1 or closed[adjacent]:
+                    continue
+                if offset in corners:
+                    side_a, side_b = corners[offset]
+                    if costs[current + side_a] == -1 or costs[current + side_b] == -1:
+                        continue
+                g_adjacent = g_current + (costs[current] if reverse else costs[adjacent]) * factor
+                if g_adjacent < g_costs[adjacent]:
+                    g_costs[adjacent] = g_adjacent
+                    heappush(open_heap, (g_adjacent, adjacent))
+
+        return self.g_costs.reshape(self.height + 2, self.padded_width)[1:-1, 1:-1].copy()
+
+    # Reads the costs from the map again.
+    def update_costs(self):
+        pad_costs(self.map_obj.int_map, self.costs)
+
+
+# Helping methods
+
+    # Resets the search arrays.
+    def reset(self):
+        self.g_costs.fill(inf)
+        self.closed.fill(False)
+        self.expansions = 0
+
+    # Returns the heuristic towards the goal as a function of a flat index.
+    def heuristic_function(self, goal):
+        goal_row, goal_col = divmod(goal, self.padded_width)
+        padded_width = self.padded_width
+        if self.diagonal:
+            def octile_distance(index):
+                row, col = divmod(index, padded_width)
+                d_row, d_col = abs(row - goal_row), abs(col - goal_col)
+                return max(d_row, d_col) + (sqrt(2) - 1) * min(d_row, d_col)
+            return octile_distance
+        def manhattan_distance(index):
+            row, col = divmod(index, padded_width)
+            return abs(row - goal_row) + abs(col - goal_col)
+        return manhattan_distance
+
+    # Converts a position [x, y] to a flat index in the padded map.
+    def to_index(self, pos):
+        return (pos[0] + 1) * self.padded_width + pos[1] + 1
+
+    # Converts a flat index in the padded map to a position [x, y].
+    def to_pos(self, index):
+        row, col = divmod(int(index), self.padded_width)
+        return [row - 1, col - 1]
+
+    # Follows the parents from the given cell back to the start, and returns the path from the start.
+    def find_path(self, index):
+        path = []
+        while index != -1:
+            path.append(self.to_pos(index))
+            index = self.parents[index]
+        path.reverse()
+        return path
+
+
+
+#*************************
+#       Functions
+#*************************
+
+# Returns the costs of the map padded with one wall on every side, flattened.
+def pad_costs(int_map, costs=None):
+    height, width = np.shape(int_map)
+    costs = np.empty((height + 2) * (width + 2), dtype=np.int64) if costs is None else costs
+    padded = costs.reshape(height + 2, width + 2)
+    padded[[0, -1], :] = -1
+    padded[:, [0, -1]] = -1
+    padded[1:-1, 1:-1] = int_map
+    return costs
+
+
+
+#*************************
+#         Test
+#*************************
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+
+# Runs both AStar and GridAStar on task 1-4, and checks that the paths are the same.
+def func_test():
+    for task in (1, 2, 3, 4):
+        map_obj = Map_Obj(task)
+        start_state = (map_obj, map_obj.get_start_pos()[0], map_obj.get_start_pos()[1])
+        func_cost = Part1and2.find_cost if task > 2 else (lambda x, y: 1)
+        node_path = AStar(start_state, Part1and2.walking_distance, Part1and2.generate_adjacent_states,
+                          Part1and2.goal_evaluate, func_cost).run()
+        a_star_path = [[node.state[1], node.state[2]] for node in node_path]
+
+        grid_a_star = GridAStar(map_obj)
+        grid_path = grid_a_star.run()
+        print('Task', task, 'same path:', grid_path == a_star_path, 'cost:', grid_a_star.cost,
+              'expansions:', grid_a_star.expansions)
+
+if __name__ == "__main__":
+    func_test()
@@ -0,0 +1,349 @@
+"""
+Contains hierarchical path finding (HPA*) for maps too large for a search over every cell.
+
+The map is split into square clusters. Where two neighbouring clusters share a border, every stretch of passable cells
+on both sides of the border is an entrance. A short entrance gets one transition in its middle, a long one gets one at
+each end. The two cells of a transition are nodes in an abstract graph, with an edge across the border. Inside every
+cluster the cost between each pair of its nodes is computed once, with a search that stays inside the cluster.
+
+A query connects the start and the goal to the nodes of their clusters, searches the small abstract graph, and then
+refines the abstract path into cells with a search inside one cluster at a time. Like in find_cost, a move costs the
+value of the cell that is entered, and only horizontal and vertical moves are used. The paths are not always the
+shortest, since they have to go through the transitions, but they are usually close.
+
+When cells are changed through replace_map_values or set_cell_value, only the clusters containing them are rebuilt,
+together with the borders the cells lie on and the clusters on the other side of those borders. Changes are found by
+comparing the map with the costs used when the clusters were built, at the start of every query.
+
+HierarchicalAStar takes the following input:
+map_obj:                            The Map_Obj to search in.
+cluster_size:                       Width and height of the clusters, in cells.
+max_entrance_width:                 Entrances up to this width get one transition, wider ones get two.
+
+Behaviour:
+query(start_pos=None, goal_pos=None):   Returns the path as a list of positions [x, y], or None if there is no path.
+update():                               Rebuilds the clusters where the map has changed. Called by query.
+cost:                                   Cost of the path found by the last query.
+abstract_path:                          The nodes of the abstract graph the last path went through.
+rebuilt_clusters:                       The clusters rebuilt by the last update.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from heapq import heappush, heappop
+from math import inf
+
+import numpy as np
+
+
+#*************************
+#    HPA* as a class
+#*************************
+class HierarchicalAStar():
+
+# Constructor splits the map in clusters and builds the abstract graph.
+    def __init__(self, map_obj, cluster_size=10, max_entrance_width=6):
+
+        self.map_obj = map_obj
+        self.cluster_size = cluster_size
+        self.max_entrance_width = max_entrance_width
+        self.height, self.width = map_obj.int_map.shape
+        self.costs = np.array(map_obj.int_map, dtype=np.int64)
+        self.rows = (self.height + cluster_size - 1) // cluster_size
+        self.cols = (self.width + cluster_size - 1) // cluster_size
+
+        # Transitions over every border, as {(cluster, cluster): [(cell, cell)]} where the first cell is in the first
+        # cluster. Cells and clusters are (row, col) tuples.
+        self.borders = {}
+        # Edges of the abstract graph across borders, and inside clusters, as {node: {node: cost}}.
+        self.inter_edges = {}
+        self.intra_edges = {}
+        # The nodes in every cluster.
+        self.cluster_nodes = {}
+
+        for border in self.all_borders():
+            self.build_border(border)
+        for cluster in self.all_clusters():
+            self.build_cluster(cluster)
+
+        self.cost = None
+        self.abstract_path = None
+        self.rebuilt_clusters = set()
+
+    # Method for finding a path from start_pos to goal_pos.
+    def query(self, start_pos=None, goal_pos=None):
+        self.update()
+        start_pos = self.map_obj.get_start_pos() if start_pos is None else start_pos
+        goal_pos = self.map_obj.get_goal_pos() if goal_pos is None else goal_pos
+        start, goal = (int(start_pos[0]), int(start_pos[1])), (int(goal_pos[0]), int(goal_pos[1]))
+        if self.costs[start] == -1 or self.costs[goal] == -1:
+            return self.no_solution()
+
+        # Connect the start and the goal to the nodes in their clusters. If they are in the same cluster, the path
+        # inside the cluster is also an edge.
+        start_costs = self.cluster_search(start, self.cluster_of(start))[0]
+        goal_costs = self.cluster_search(goal, self.cluster_of(goal), reverse=True)[0]
+        start_edges = {node: start_costs[node] for node in self.cluster_nodes[self.cluster_of(start)] if node in start_costs}
+        if goal in start_costs:
+            start_edges[goal] = start_costs[goal]
+        goal_edges = {node: goal_costs[node] for node in self.cluster_nodes[self.cluster_of(goal)] if node in goal_costs}
+
+        self.abstract_path = self.abstract_search(start, goal, start_edges, goal_edges)
+        if self.abstract_path is None:
+            return self.no_solution()
+        return self.refine(self.abstract_path)
+
+    # Method for rebuilding the parts of the abstract graph where the map has changed.
+    def update(self):
+        changed = np.argwhere(self.costs != self.map_obj.int_map)
+        self.rebuilt_clusters = set()
+        if len(changed) == 0:
+            return
+        self.costs[:] = self.map_obj.int_map
+        borders, clusters = set(), set()
+        for cell in map(tuple, changed):
+            cluster = self.cluster_of(cell)
+            clusters.add(cluster)
+            for border in self.borders_of(cluster):
+                if cell in self.border_cells(border):
+                    borders.add(border)
+                    clusters.update(border)
+        for border in borders:
+            self.build_border(border)
+        for cluster in clusters:
+            self.build_cluster(cluster)
+        self.rebuilt_clusters = clusters
+        if verbose: print('Rebuilt clusters:', sorted(clusters))
+
+
+# Helping methods
+
+    # Returns the cluster a cell is in.
+    def cluster_of(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    # Returns the rows and columns of a cluster as (first row, end row, first col, end col).
+    def bounds_of(self, cluster):
+        size = self.cluster_size
+        return (cluster[0] * size, min((cluster[0] + 1) * size, self.height),
+                cluster[1] * size, min((cluster[1] + 1) * size, self.width))
+
+    def all_clusters(self):
+        return [(row, col) for row in range(self.rows) for col in range(self.cols)]
+
+    # Borders between a cluster and the one below it or to the right of it.
+    def all_borders(self):
+        borders = []
+        for row, col in self.all_clusters():
+            if row + 1 < self.rows:
+                borders.append(((row, col), (row + 1, col)))
+            if col + 1 < self.cols:
+                borders.append(((row, col), (row, col + 1)))
+        return borders
+
+    # The borders the cluster is part of.
+    def borders_of(self, cluster):
+        row, col = cluster
+        borders = [((row - 1, col), cluster), ((row, col - 1), cluster), (cluster, (row + 1, col)), (cluster, (row, col + 1))]
+        return [border for border in borders if border in self.borders]
+
+    # The pairs of cells facing each other over the border, with the first cell in the first cluster.
+    def border_cell_pairs(self, border):
+        first, second = border
+        first_row, end_row, first_col, end_col = self.bounds_of(first)
+        if second[0] != first[0]:
+            return [((end_row - 1, col), (end_row, col)) for col in range(first_col, end_col)]
+        return [((row, end_col - 1), (row, end_col)) for row in range(first_row, end_row)]
+
+    # All cells on either side of the border.
+    def border_cells(self, border):
+        return {cell for pair in self.border_cell_pairs(border) for cell in pair}
+
+    # Finds the entrances over the border and puts transitions in them.
+    def build_border(self, border):
+        for a, b in self.borders.get(border, []):
+            for node, other in ((a, b), (b, a)):
+                del self.inter_edges[node][other]
+                if not self.inter_edges[node]:
+                    del self.inter_edges[node]
+
+        transitions = []
+        entrance = []
+        # The pair of Nones at the end closes the last entrance.
+        for a, b in self.border_cell_pairs(border) + [(None, None)]:
+            if a is not None and self.costs[a] != -1 and self.costs[b] != -1:
+                entrance.append((a, b))
+                continue
+            if len(entrance) > self.max_entrance_width:
+                transitions += [entrance[0], entrance[-1]]
+            elif entrance:
+                transitions.append(entrance[len(entrance) // 2])
+            entrance = []
+
+        self.borders[border] = transitions
+        for a, b in transitions:
+            self.inter_edges.setdefault(a, {})[b] = int(self.costs[b])
+            self.inter_edges.setdefault(b, {})[a] = int(self.costs[a])
+
+    # Finds the nodes in the cluster, and the cost between every pair of them inside the cluster.
+    def build_cluster(self, cluster):
+        for node in self.cluster_nodes.get(cluster, []):
+            self.intra_edges.pop(node, None)
+        nodes = set()
+        for border in self.borders_of(cluster):
+            side = 0 if border[0] == cluster else 1
+            nodes.update(transition[side] for transition in self.borders[border])
+        self.cluster_nodes[cluster] = nodes
+        for node in nodes:
+            costs = self.cluster_search(node, cluster)[0]
+            self.intra_edges[node] = {other: costs[other] for other in nodes if other != node and other in costs}
+
+    # Dijkstra from a cell, staying inside the cluster. If reverse is True the costs are to the cell instead of from it.
+    # Returns the costs and the parents of the cells reached.
+    def cluster_search(self, source, cluster, target=None, reverse=False):
+        first_row, end_row, first_col, end_col = self.bounds_of(cluster)
+        costs, parents = {source: 0}, {source: None}
+        heap = [(0, source)]
+        closed = set()
+        while heap:
+            cost, cell = heappop(heap)
+            if cell in closed:
+                continue
+            closed.add(cell)
+            if cell == target:
+                break
+            for i, j in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                adjacent = (cell[0] + i, cell[1] + j)
+                if not (first_row <= adjacent[0] < end_row and first_col <= adjacent[1] < end_col):
+                    continue
+                if self.costs[adjacent] == -1 or adjacent in closed:
+                    continue
+                new_cost = cost + int(self.costs[cell] if reverse else self.costs[adjacent])
+                if new_cost < costs.get(adjacent, inf):
+                    costs[adjacent] = new_cost
+                    parents[adjacent] = cell
+                    heappush(heap, (new_cost, adjacent))
+        return costs, parents
+
+    # A* over the abstract graph, with the start and goal connected by the given edges. Returns the nodes on the path.
+    def abstract_search(self, start, goal, start_edges, goal_edges):
+        def heuristic(node):
+            return abs(node[0] - goal[0]) + abs(node[1] - goal[1])
+
+        costs, parents = {start: 0}, {start: None}
+        heap = [(heuristic(start), 0, start)]
+        closed = set()
+        while heap:
+            f_cost, cost, node = heappop(heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            if node == goal:
+                self.cost = cost
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path
+            # The start can be a node itself, and then also has its edges across the border.
+            edges = list(self.inter_edges.get(node, {}).items())
+            if node == start:
+                edges += start_edges.items()
+            else:
+                edges += self.intra_edges.get(node, {}).items()
+                if node in goal_edges:
+                    edges.append((goal, goal_edges[node]))
+            for neighbour, edge_cost in edges:
+                new_cost = cost + edge_cost
+                if neighbour not in closed and new_cost < costs.get(neighbour, inf):
+                    costs[neighbour] = new_cost
+                    parents[neighbour] = node
+                    heappush(heap, (new_cost + heuristic(neighbour), new_cost, neighbour))
+        return None
+
+    # Replaces the abstract path with the cells in it. Nodes in the same cluster are connected by a search in the
+    # cluster, nodes in different clusters are neighbours over a border.
+    def refine(self, abstract_path):
+        path = [list(abstract_path[0])]
+        for node, next_node in zip(abstract_path[:-1], abstract_path[1:]):
+            if self.cluster_of(node) != self.cluster_of(next_node):
+                path.append(list(next_node))
+                continue
+            parents = self.cluster_search(node, self.cluster_of(node), target=next_node)[1]
+            cells = []
+            cell = next_node
+            while cell != node:
+                cells.append(list(cell))
+                cell = parents[cell]
+            path += reversed(cells)
+        return path
+
+    def no_solution(self):
+        print("No solution was found.")
+        self.cost = None
+        self.abstract_path = None
+        return None
+
+
+
+#*************************
+#         Test
+#*************************
+from Map import Map_Obj
+from GridAStar import GridAStar
+from MapGenerator import open_field, random_free_pos
+
+# Returns the cost of walking the path, or None if it is not a connected path over passable cells.
+def path_cost(map_obj, path):
+    cost = 0
+    for a, b in zip(path[:-1], path[1:]):
+        if abs(a[0] - b[0]) + abs(a[1] - b[1]) != 1 or map_obj.get_cell_value(b) == -1:
+            return None
+        cost += map_obj.get_cell_value(b)
+    return cost
+
+# Checks that the paths are valid and close to the shortest, and that the graph after changing cells is the same as a
+# graph built from scratch.
+def func_test():
+    rng = np.random.default_rng(0)
+    for task in (1, 3, 4):
+        map_obj = Map_Obj(task)
+        hierarchy, grid_a_star = HierarchicalAStar(map_obj), GridAStar(map_obj)
+        path = hierarchy.query()
+        grid_a_star.run()
+        print('Task', task, 'valid path:', path_cost(map_obj, path) == hierarchy.cost, 'cost:', hierarchy.cost,
+              'shortest:', grid_a_star.cost)
+
+    int_map = open_field(80, 80, 0.2, seed=1)
+    int_map[int_map == 1] = rng.integers(1, 5, size=(int_map == 1).sum())
+    map_obj = Map_Obj.from_int_map(int_map, random_free_pos(int_map, rng), random_free_pos(int_map, rng))
+    hierarchy, grid_a_star = HierarchicalAStar(map_obj), GridAStar(map_obj)
+    valid_paths, same_as_new, costs, shortest_costs = True, True, 0, 0
+    for i in range(20):
+        for j in range(5):
+            map_obj.replace_map_values(random_free_pos(int_map, rng), int(rng.choice([-1, 1, 2, 3, 4])),
+                                       map_obj.get_goal_pos())
+        start_pos, goal_pos = random_free_pos(map_obj.int_map, rng), random_free_pos(map_obj.int_map, rng)
+        path = hierarchy.query(start_pos, goal_pos)
+        new_hierarchy = HierarchicalAStar(map_obj)
+        new_hierarchy.query(start_pos, goal_pos)
+        grid_a_star.update_costs()
+        grid_a_star.run(start_pos, goal_pos)
+        same_as_new = same_as_new and hierarchy.inter_edges == new_hierarchy.inter_edges and \
+            hierarchy.intra_edges == new_hierarchy.intra_edges and hierarchy.cost == new_hierarchy.cost
+        valid_paths = valid_paths and (path is None) == (grid_a_star.cost is None)
+        if path is not None and grid_a_star.cost is not None:
+            valid_paths = valid_paths and path_cost(map_obj, path) == hierarchy.cost
+            costs += hierarchy.cost
+            shortest_costs += grid_a_star.cost
+    print('Generated map, valid paths:', valid_paths, 'same as rebuilt:', same_as_new,
+          'cost compared to shortest:', round(costs / shortest_costs, 3))
+
+if __name__ == "__main__":
+    func_test()
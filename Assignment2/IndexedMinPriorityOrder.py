@@ -0,0 +1,204 @@
+"""
+Contains an indexed binary heap used as a min priority order.
+Replaces MinPriorityOrder in AStar. push and pop are O(log n), and the position of every element is kept in an index so
+an element can be moved when its sorting value is lowered (decrease-key).
+
+Elements with the same sorting value are popped in the order they were first pushed, which is the same behaviour as
+MinPriorityOrder.
+
+Input:
+meth_soring_value:      Method invoked on elements to be sorted, returning the value they should be sorted by.
+
+Behaviour:
+push(element):          Pushes an element in the order in the right placement.
+pop():                  Returns the first element in the order and deletes it internally.
+update(element):        Moves an element after its sorting value has changed. Without element the whole order is rebuilt.
+remove(element):        Removes an element from the order.
+peek():                 Returns the first element in the order without removing it.
+contains(element):      Returns True if the element is in the order.
+size():                 Returns the amount of elements in the order.
+"""
+
+
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#         Class
+#*************************
+class IndexedMinPriorityOrder():
+
+# Constructor
+    def __init__(self, meth_sorting_value, *elements):
+
+        self.meth_sorting_value = meth_sorting_value
+
+        # The heap holds [sorting value, push number, element]. The push number breaks ties in FIFO order.
+        self.__heap = []
+        # Maps every element in the heap to its index in the heap.
+        self.__index = {}
+        self.__push_counter = 0
+        for element in elements:
+            self.push(element)
+
+    # Method for adding an element. An element allready in the order is only moved.
+    def push(self, push_element):
+        if push_element in self.__index:
+            return self.update(push_element)
+        entry = [self.meth_sorting_value(push_element), self.__push_counter, push_element]
+        self.__push_counter += 1
+        self.__heap.append(entry)
+        self.__index[push_element] = len(self.__heap) - 1
+        self.__sift_up(len(self.__heap) - 1)
+        if verbose: print('push was used and gave this que:')
+        if verbose: self.print_order()
+        return True
+
+    # Method for returning and removing the first element in the order
+    def pop(self):
+        if not self.__heap:
+            print('pop gave a IndexError')
+            return None
+        first = self.__heap[0]
+        last = self.__heap.pop()
+        del self.__index[first[2]]
+        if self.__heap:
+            self.__heap[0] = last
+            self.__index[last[2]] = 0
+            self.__sift_down(0)
+        if verbose: print('Found element:', first[0])
+        return first[2]
+
+    # Method for restacking the priority order. Given an element only that element is moved (decrease-key).
+    def update(self, element=None):
+        if element is None:
+            for entry in self.__heap:
+                entry[0] = self.meth_sorting_value(entry[2])
+            for i in range(len(self.__heap) // 2 - 1, -1, -1):
+                self.__sift_down(i)
+            return True
+        i = self.__index.get(element)
+        if i is None:
+            return False
+        old_value = self.__heap[i][0]
+        self.__heap[i][0] = self.meth_sorting_value(element)
+        if self.__heap[i][0] < old_value:
+            self.__sift_up(i)
+        else:
+            self.__sift_down(i)
+        return True
+
+    # Method for removing an element from anywhere in the order.
+    def remove(self, element):
+        i = self.__index.pop(element, None)
+        if i is None:
+            return False
+        last = self.__heap.pop()
+        if i < len(self.__heap):
+            self.__heap[i] = last
+            self.__index[last[2]] = i
+            self.__sift_up(i)
+            self.__sift_down(self.__index[last[2]])
+        return True
+
+    # Method for returning the first element in the order without removing it.
+    def peek(self):
+        if not self.__heap:
+            return None
+        return self.__heap[0][2]
+
+    # Method for checking if an element is in the order.
+    def contains(self, element):
+        return element in self.__index
+
+    def __contains__(self, element):
+        return element in self.__index
+
+    # Method for returning amount of elements in order
+    def size(self):
+        return len(self.__heap)
+
+    # Prints the internal state of the order.
+    def print_order(self):
+        print(sorted(entry[0] for entry in self.__heap))
+
+
+# Helping methods
+
+    # Moves the entry at index i up until its parent is smaller.
+    def __sift_up(self, i):
+        heap = self.__heap
+        entry = heap[i]
+        key = (entry[0], entry[1])
+        while i > 0:
+            parent = (i - 1) >> 1
+            if (heap[parent][0], heap[parent][1]) <= key:
+                break
+            heap[i] = heap[parent]
+            self.__index[heap[i][2]] = i
+            i = parent
+        heap[i] = entry
+        self.__index[entry[2]] = i
+
+    # Moves the entry at index i down until both children are larger.
+    def __sift_down(self, i):
+        heap = self.__heap
+        size = len(heap)
+        entry = heap[i]
+        key = (entry[0], entry[1])
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and (heap[child + 1][0], heap[child + 1][1]) < (heap[child][0], heap[child][1]):
+                child += 1
+            if key <= (heap[child][0], heap[child][1]):
+                break
+            heap[i] = heap[child]
+            self.__index[heap[i][2]] = i
+            i = child
+        heap[i] = entry
+        self.__index[entry[2]] = i
+
+
+
+#*************************
+#         Test
+#*************************
+import random
+
+class Node():
+    def __init__(self, state, f_cost=None):
+        self.state = state
+        self.f_cost = f_cost
+
+def func_test():
+    nodes = []
+    for i in range(200):
+        nodes.append(Node(i, random.randrange(0, 25)))
+    order = IndexedMinPriorityOrder(lambda x: x.f_cost, *nodes)
+
+    # Lower the value of some of the nodes, the order should follow.
+    for node in random.sample(nodes, 50):
+        node.f_cost -= random.randrange(0, 10)
+        order.update(node)
+
+    # Remove some of the nodes.
+    for node in random.sample(nodes, 20):
+        order.remove(node)
+        nodes.remove(node)
+
+    expected = sorted(nodes, key=lambda x: x.f_cost)
+    poped = []
+    while order.size():
+        poped.append(order.pop())
+    print('Sorted correctly:', [node.f_cost for node in poped] == [node.f_cost for node in expected])
+
+    # Equal values should come out in the order they were pushed.
+    order = IndexedMinPriorityOrder(lambda x: x.f_cost, *[Node(i, 1) for i in range(10)])
+    print('FIFO on ties:', [order.pop().state for i in range(10)] == list(range(10)))
+
+if __name__ == "__main__":
+    func_test()
@@ -0,0 +1,292 @@
+"""
+Contains Jump Point Search (JPS), an A* variant for grids where every passable cell has the same cost.
+
+On an open grid with uniform costs there are many paths of the same length, and A* expands all of them. JPS removes the
+symmetric paths: it only puts jump points on the open list, which are cells where the path has to be able to turn
+because of a wall. The cells in between are skipped by jumping along straight and diagonal lines.
+
+Both 4-connected and 8-connected movement is supported. 8-connected movement follows generate_adjacent_states_dagonal
+in Part1and2.py, so diagonal moves are allowed past the corners of walls. A diagonal move costs sqrt(2) times the cell
+cost. The paths have the same length as the ones GridAStar and AStar find, but can be a different one of the equally
+long paths.
+
+JumpPointSearch is a GridAStar, and takes the same input. It raises a ValueError if the map does not have uniform costs.
+
+Behaviour:
+run(start_pos=None, goal_pos=None):     Returns the full path as a list of positions [x, y], or None if there is no path.
+jump_points:                            The jump points on the path found by the last run.
+expansions:                             Amount of jump points expanded by the last run.
+has_uniform_costs(int_map):             Returns True if all passable cells on the map have the same cost.
+grid_search(map_obj, diagonal=False, jump_points=None):
+                                        Returns a JumpPointSearch if jump_points is True, a GridAStar if it is False.
+                                        When it is None, JumpPointSearch is chosen if the map has uniform costs.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from heapq import heappush, heappop
+
+import numpy as np
+
+from GridAStar import GridAStar
+
+
+#*************************
+#       Functions
+#*************************
+
+# Returns True if all passable cells on the map have the same cost.
+def has_uniform_costs(int_map):
+    return len(np.unique(int_map[int_map != -1])) <= 1
+
+# Returns the search to use on the map.
+def grid_search(map_obj, diagonal=False, jump_points=None):
+    if jump_points is None:
+        jump_points = has_uniform_costs(map_obj.int_map)
+    if jump_points:
+        return JumpPointSearch(map_obj, diagonal)
+    return GridAStar(map_obj, diagonal)
+
+# Returns -1, 0 or 1 depending on the sign of the value.
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+#*************************
+#    JPS as a class
+#*************************
+class JumpPointSearch(GridAStar):
+
+# Constructor checks the costs and sets up the same arrays as GridAStar.
+    def __init__(self, map_obj, diagonal=False):
+        if not has_uniform_costs(map_obj.int_map):
+            raise ValueError('Jump point search needs a map where every passable cell has the same cost.')
+        GridAStar.__init__(self, map_obj, diagonal)
+        self.jump_points = None
+
+        # Set at the start of every run, and used by the jump methods.
+        self.goal = None
+        self.walkable = None
+        self.cell_cost = None
+
+    # Method for running the search from start_pos to goal_pos.
+    def run(self, start_pos=None, goal_pos=None):
+        start_pos = self.map_obj.get_start_pos() if start_pos is None else start_pos
+        goal_pos = self.map_obj.get_goal_pos() if goal_pos is None else goal_pos
+        start, goal = self.to_index(start_pos), self.to_index(goal_pos)
+
+        self.reset()
+        self.goal = goal
+        self.walkable = memoryview(self.costs)
+        self.cell_cost = float(self.costs[start])
+        g_costs, parents, closed = memoryview(self.g_costs), memoryview(self.parents), memoryview(self.closed)
+        heuristic = self.heuristic_function(goal)
+
+        g_costs[start] = 0
+        parents[start] = -1
+        push_counter = 1
+        open_heap = [(heuristic(start), 0, start)]
+
+        while open_heap:
+            current = heappop(open_heap)[2]
+            if closed[current]:
+                continue
+            closed[current] = True
+            self.expansions += 1
+            if verbose: print('pop id:', self.to_pos(current))
+
+            if current == goal:
+                self.cost = float(g_costs[goal])
+                self.jump_points = GridAStar.find_path(self, goal)
+                return self.find_path(goal)
+
+            for d_row, d_col in self.pruned_directions(current, parents[current]):
+                jump_point = self.jump(current, d_row, d_col)
+                if jump_point == -1 or closed[jump_point]:
+                    continue
+                g_jump_point = g_costs[current] + self.distance(current, jump_point)
+                if g_jump_point < g_costs[jump_point]:
+                    g_costs[jump_point] = g_jump_point
+                    parents[jump_point] = current
+                    heappush(open_heap, (g_jump_point + heuristic(jump_point), push_counter, jump_point))
+                    push_counter += 1
+
+        print("No solution was found.")
+        self.cost = None
+        self.jump_points = None
+        return None
+
+
+# Helping methods
+
+    # Returns True if the cell at the index is not a wall.
+    def is_walkable(self, index):
+        return self.walkable[index] != -1
+
+    # Returns the cost of going in a straight or diagonal line between two jump points.
+    def distance(self, index, other):
+        row, col = divmod(index, self.padded_width)
+        other_row, other_col = divmod(other, self.padded_width)
+        d_row, d_col = abs(row - other_row), abs(col - other_col)
+        if self.diagonal:
+            return self.cell_cost * (max(d_row, d_col) + (2 ** 0.5 - 1) * min(d_row, d_col))
+        return self.cell_cost * (d_row + d_col)
+
+    # Returns the directions worth searching from a jump point, given the jump point it was reached from.
+    def pruned_directions(self, index, parent):
+        if parent == -1:
+            if self.diagonal:
+                return [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i != 0 or j != 0]
+            return [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+        row, col = divmod(index, self.padded_width)
+        parent_row, parent_col = divmod(parent, self.padded_width)
+        d_row, d_col = sign(row - parent_row), sign(col - parent_col)
+        width = self.padded_width
+        walkable = self.is_walkable
+
+        if not self.diagonal:
+            # Moving along a row the path may turn to either side. Moving along a column it may turn to either side or
+            # go on, since the jump along the column stops where a turn is needed.
+            if d_col != 0:
+                return [(-1, 0), (1, 0), (0, d_col)]
+            return [(0, -1), (0, 1), (d_row, 0)]
+
+        if d_row != 0 and d_col != 0:
+            directions = [(0, d_col), (d_row, 0), (d_row, d_col)]
+            if not walkable(index - d_row * width):
+                directions.append((-d_row, d_col))
+            if not walkable(index - d_col):
+                directions.append((d_row, -d_col))
+        elif d_row != 0:
+            directions = [(d_row, 0)]
+            if not walkable(index + 1):
+                directions.append((d_row, 1))
+            if not walkable(index - 1):
+                directions.append((d_row, -1))
+        else:
+            directions = [(0, d_col)]
+            if not walkable(index + width):
+                directions.append((1, d_col))
+            if not walkable(index - width):
+                directions.append((-1, d_col))
+        return directions
+
+    # Jumps from the index in the given direction. Returns the next jump point, or -1 if a wall is hit first.
+    def jump(self, index, d_row, d_col):
+        if d_row != 0 and d_col != 0:
+            return self.jump_diagonal(index, d_row, d_col)
+        if self.diagonal:
+            return self.jump_straight(index, d_row, d_col)
+        if d_col != 0:
+            return self.jump_along_row(index, d_col)
+        return self.jump_along_column(index, d_row)
+
+    # 8-connected straight jump. Stops where a wall beside the line ends, since the path may have to turn there.
+    def jump_straight(self, index, d_row, d_col):
+        width, walkable, goal = self.padded_width, self.is_walkable, self.goal
+        step = d_row * width + d_col
+        side = 1 if d_row != 0 else width
+        while True:
+            index += step
+            if not walkable(index):
+                return -1
+            if index == goal:
+                return index
+            if (walkable(index + step + side) and not walkable(index + side)) or \
+                    (walkable(index + step - side) and not walkable(index - side)):
+                return index
+
+    # 8-connected diagonal jump. At every step it also jumps straight along both components of the direction.
+    def jump_diagonal(self, index, d_row, d_col):
+        width, walkable, goal = self.padded_width, self.is_walkable, self.goal
+        step = d_row * width + d_col
+        while True:
+            index += step
+            if not walkable(index):
+                return -1
+            if index == goal:
+                return index
+            if (walkable(index - d_row * width + d_col) and not walkable(index - d_row * width)) or \
+                    (walkable(index + d_row * width - d_col) and not walkable(index - d_col)):
+                return index
+            if self.jump_straight(index, d_row, 0) != -1 or self.jump_straight(index, 0, d_col) != -1:
+                return index
+
+    # 4-connected jump along a row. Stops where a cell above or below opens up after a wall.
+    def jump_along_row(self, index, d_col):
+        width, walkable, goal = self.padded_width, self.is_walkable, self.goal
+        while True:
+            index += d_col
+            if not walkable(index):
+                return -1
+            if index == goal:
+                return index
+            if (walkable(index - width) and not walkable(index - d_col - width)) or \
+                    (walkable(index + width) and not walkable(index - d_col + width)):
+                return index
+
+    # 4-connected jump along a column. Stops where a jump along the row to either side finds a jump point.
+    def jump_along_column(self, index, d_row):
+        width, walkable, goal = self.padded_width, self.is_walkable, self.goal
+        step = d_row * width
+        while True:
+            index += step
+            if not walkable(index):
+                return -1
+            if index == goal:
+                return index
+            if (walkable(index - 1) and not walkable(index - step - 1)) or \
+                    (walkable(index + 1) and not walkable(index - step + 1)):
+                return index
+            if self.jump_along_row(index, 1) != -1 or self.jump_along_row(index, -1) != -1:
+                return index
+
+    # Follows the parents back to the start, and fills in the cells between the jump points.
+    def find_path(self, index):
+        jump_points = GridAStar.find_path(self, index)
+        path = [jump_points[0]]
+        for x, y in jump_points[1:]:
+            d_x, d_y = sign(x - path[-1][0]), sign(y - path[-1][1])
+            while path[-1] != [x, y]:
+                path.append([path[-1][0] + d_x, path[-1][1] + d_y])
+        return path
+
+
+
+#*************************
+#         Test
+#*************************
+from Map import Map_Obj
+from MapGenerator import open_field, random_free_pos
+
+# Checks that JPS finds paths as long as the ones GridAStar finds, on task 1 and 2 and on generated maps.
+def func_test():
+    for diagonal in (False, True):
+        for task in (1, 2):
+            map_obj = Map_Obj(task)
+            grid_a_star = GridAStar(map_obj, diagonal)
+            grid_a_star.run()
+            jps = grid_search(map_obj, diagonal)
+            path = jps.run()
+            print('Task', task, 'diagonal:', diagonal, 'same cost:', abs(jps.cost - grid_a_star.cost) < 1e-9,
+                  'path length:', len(path), 'expansions:', grid_a_star.expansions, '->', jps.expansions)
+
+        rng = np.random.default_rng(0)
+        mismatches = 0
+        for i in range(200):
+            int_map = open_field(30, 30, rng.uniform(0.1, 0.4), seed=i)
+            map_obj = Map_Obj.from_int_map(int_map, random_free_pos(int_map, rng), random_free_pos(int_map, rng))
+            grid_a_star, jps = GridAStar(map_obj, diagonal), JumpPointSearch(map_obj, diagonal)
+            grid_path, path = grid_a_star.run(), jps.run()
+            if (grid_path is None) != (path is None) or (path is not None and abs(jps.cost - grid_a_star.cost) > 1e-9):
+                mismatches += 1
+        print('Generated maps, diagonal:', diagonal, 'mismatches:', mismatches)
+
+if __name__ == "__main__":
+    func_test()
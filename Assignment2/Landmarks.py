@@ -0,0 +1,213 @@
+"""
+Contains the landmark (ALT) heuristic, for running many searches on the same map.
+
+walking_distance in Part1and2.py does not know about walls, so on the Samfundet maps it is far below the real cost. With
+landmarks, the exact cost from and to a few chosen cells (the landmarks) is computed once for every cell on the map. By
+the triangle inequality, for a landmark L:
+    cost(cell, goal) >= cost(L, goal) - cost(L, cell)
+    cost(cell, goal) >= cost(cell, L) - cost(goal, L)
+The heuristic is the largest of these bounds over all landmarks, and never larger than the real cost. Both directions
+are needed, since the cost of a move is the cost of the cell that is entered, so cost(a, b) and cost(b, a) can differ.
+
+The landmarks are picked one at a time as the cell furthest away from the landmarks picked so far. The tables are saved
+next to the csv file of the map (Samfundet_map_1.csv gives Samfundet_map_1.landmarks.npz), and read from there as long
+as the map and the settings are the same. A file that can not be read, e.g. one that is cut short, is computed again.
+The file is written to a temporary file first and moved into place, so it is never read half written, and the tables
+are only kept in memory if the file can not be written.
+
+The tables are only valid for the costs the map had when they were computed. If the map is changed, a new Landmarks
+object has to be made.
+
+Landmarks takes the following input:
+map_obj:                            The Map_Obj to compute the tables for.
+count:                              The amount of landmarks.
+diagonal:                           If True diagonal moves are allowed, like in GridAStar.
+path:                               Where the tables are saved. By default next to the csv file, or not saved at all if
+                                    the map was not read from a file.
+persist:                            If False the tables are neither read from nor saved to file.
+
+Behaviour:
+heuristic(state):                   Can be given to AStar as func_heuristic. The state is (Map_Obj, x, y) like in
+                                    Part1and2.py, and the goal is the goal of the map.
+estimate(pos, goal_pos):            The heuristic from pos to goal_pos.
+landmarks:                          The positions of the landmarks.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+import os
+import zipfile
+
+import numpy as np
+
+from GridAStar import GridAStar
+
+
+#*************************
+#  Landmarks as a class
+#*************************
+class Landmarks():
+
+# Constructor reads the tables from file, or computes and saves them.
+    def __init__(self, map_obj, count=8, diagonal=False, path=None, persist=True):
+
+        self.map_obj = map_obj
+        self.count = count
+        self.diagonal = diagonal
+        if path is None and map_obj.path_to_map is not None:
+            path = os.path.splitext(map_obj.path_to_map)[0] + '.landmarks.npz'
+        self.path = path if persist else None
+
+        if not self.load():
+            self.compute()
+            self.save()
+
+        # The heuristic for every cell towards the last goal asked for.
+        self.goal_pos = None
+        self.goal_table = None
+
+    # Method to give to AStar as func_heuristic.
+    def heuristic(self, state):
+        return self.estimate([state[1], state[2]], state[0].get_goal_pos())
+
+    # Returns a lower bound on the cost from pos to goal_pos.
+    def estimate(self, pos, goal_pos):
+        if goal_pos != self.goal_pos:
+            self.goal_pos = [goal_pos[0], goal_pos[1]]
+            self.goal_table = self.make_goal_table(goal_pos)
+        return self.goal_table[pos[0], pos[1]]
+
+
+# Helping methods
+
+    # Picks the landmarks and computes the cost from and to every landmark for every cell.
+    def compute(self):
+        grid = GridAStar(self.map_obj, self.diagonal)
+        shape = self.map_obj.int_map.shape
+        self.from_landmarks = np.empty((self.count,) + shape)
+        self.to_landmarks = np.empty((self.count,) + shape)
+        self.landmarks = []
+
+        # The first landmark is the cell furthest away from an arbitrary cell. The next ones are the cells furthest away
+        # from the closest landmark picked so far.
+        free = np.argwhere(self.map_obj.int_map != -1)
+        closest = grid.dijkstra(free[0])
+        for i in range(self.count):
+            reachable = np.where(np.isfinite(closest), closest, -1)
+            landmark = [int(value) for value in np.unravel_index(np.argmax(reachable), shape)]
+            self.landmarks.append(landmark)
+            self.from_landmarks[i] = grid.dijkstra(landmark)
+            self.to_landmarks[i] = grid.dijkstra(landmark, reverse=True)
+            closest = self.from_landmarks[i] if i == 0 else np.minimum(closest, self.from_landmarks[i])
+            if verbose: print('Landmark', i, 'at', landmark)
+
+    # Returns the heuristic from every cell to the goal as an array shaped like the map.
+    def make_goal_table(self, goal_pos):
+        from_goal = self.from_landmarks[:, goal_pos[0], goal_pos[1]][:, None, None]
+        to_goal = self.to_landmarks[:, goal_pos[0], goal_pos[1]][:, None, None]
+        with np.errstate(invalid='ignore'):
+            bounds = np.maximum(from_goal - self.from_landmarks, self.to_landmarks - to_goal)
+        # Cells a landmark can not reach, or be reached from, give no bound.
+        bounds[~np.isfinite(bounds)] = 0
+        return np.maximum(bounds.max(axis=0), 0)
+
+    # Reads the tables from file. Returns False if there is no file, or it was made for another map or other settings.
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return False
+        try:
+            # The file is opened here, since np.load leaves it open when the file is not a zip file.
+            with open(self.path, 'rb') as file, np.load(file) as tables:
+                if not np.array_equal(tables['int_map'], self.map_obj.int_map) or int(tables['count']) != self.count \
+                        or bool(tables['diagonal']) != self.diagonal:
+                    return False
+                self.landmarks = tables['landmarks'].tolist()
+                self.from_landmarks = tables['from_landmarks']
+                self.to_landmarks = tables['to_landmarks']
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as error:
+            if verbose: print('Could not read', self.path, error)
+            return False
+        if verbose: print('Landmarks read from', self.path)
+        return True
+
+    # Saves the tables together with the map they were made for, through a temporary file in the same directory like
+    # write_binary_map in MapFile.py.
+    def save(self):
+        if self.path is None:
+            return
+        import tempfile
+        try:
+            descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(self.path) + '.',
+                                                          dir=os.path.dirname(self.path) or '.')
+        except OSError as error:
+            if verbose: print('Could not save', self.path, error)
+            return
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                np.savez(file, int_map=self.map_obj.int_map, count=self.count, diagonal=self.diagonal,
+                         landmarks=np.array(self.landmarks), from_landmarks=self.from_landmarks,
+                         to_landmarks=self.to_landmarks)
+            # mkstemp makes the file readable by its owner only.
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+
+
+#*************************
+#         Test
+#*************************
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+
+# Runs random queries on the maps with both heuristics, and checks that the landmarks give the same costs.
+def func_test():
+    rng = np.random.default_rng(0)
+    for task in (1, 3, 4):
+        map_obj = Map_Obj(task)
+        landmarks = Landmarks(map_obj)
+        free = np.argwhere(map_obj.int_map != -1).tolist()
+        same_costs, expansions, landmark_expansions = True, 0, 0
+        for i in range(20):
+            map_obj.goal_pos = free[rng.integers(len(free))]
+            start_state = (map_obj, *free[rng.integers(len(free))])
+            results = []
+            for func_heuristic in (Part1and2.walking_distance, landmarks.heuristic):
+                a_star = AStar(start_state, func_heuristic, Part1and2.generate_adjacent_states, Part1and2.goal_evaluate,
+                               Part1and2.find_cost)
+                node_path = a_star.run()
+                results.append((node_path[-1].g_cost, len(a_star.closed)))
+            same_costs = same_costs and results[0][0] == results[1][0]
+            expansions += results[0][1]
+            landmark_expansions += results[1][1]
+        print('Task', task, 'same costs:', same_costs, 'expansions:', expansions, '->', landmark_expansions)
+
+    # A file cut in half is computed and saved again, and reading it leaves no file open.
+    import tempfile
+    import warnings
+    map_obj = Map_Obj(3)
+    with tempfile.TemporaryDirectory() as directory, warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        path = os.path.join(directory, 'map.landmarks.npz')
+        landmarks = Landmarks(map_obj, path=path)
+        with open(path, 'rb') as file:
+            data = file.read()
+        with open(path, 'wb') as file:
+            file.write(data[:len(data) // 2])
+        recomputed = Landmarks(map_obj, path=path)
+        print('Cut file computed again:', recomputed.landmarks == landmarks.landmarks,
+              'read again:', Landmarks(map_obj, path=path).load(),
+              'files left:', sorted(os.listdir(directory)),
+              'resource warnings:', sum(issubclass(warning.category, ResourceWarning) for warning in caught))
+
+if __name__ == "__main__":
+    func_test()
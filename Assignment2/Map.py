@@ -7,14 +7,23 @@ Behavior:
 pos is allways given by [x, y]
 
 Map_Obj(task=1):                            Initialises the object with task 1 as default.
-    read_map(path):                         Reads in the map from a csv file.
+Map_Obj.from_int_map(int_map, start_pos, goal_pos, end_goal_pos=None, copy=True):
+                                            Initialises the object from an integer map instead of a task. With
+                                            copy=False the map is used as it is, e.g. a view of shared memory.
+Map_Obj.from_file(path, start_pos, goal_pos, end_goal_pos=None):
+                                            Initialises the object from a csv, MovingAI .map or binary map file.
+    read_map(path):                         Reads in the map from a csv file, through its binary file in MapFile.py.
+    make_str_map(int_map):                  Converts an integer map to a string map.
     fill_critical_positions(task):          Takes in task number and gives the map the apropriate values in the right places.
 
-get_cell_value(pos):                        Takes in pos as [x, y] and returns the cost of moving across the cell.
+get_cell_value(pos):                        Takes in pos as [x, y] and returns the cost of moving across the cell, as
+                                            an int.
 get_goal_pos():                             Returns the goal position.
 get_start_pos():                            Returns the start position.
 get_end_goal_pos():                         Returns the position th goal will end at. Only relevant if the goal will move.
 get_maps():                                 Returns the map in string and int format.
+str_map:                                    The string map. It is only made the first time it is used, e.g. by show_map
+                                            or get_maps, from int_map and the start and goal positions.
 
 move_goal_pos(pos):                         Moves the current goal position.
 set_cell_value(pos, value, str_map=True):   Sets a cells values to a new value. Can be used on string- or int map.
@@ -26,40 +35,112 @@ set_start_pos_str_marker(start_pos, map):   Sets the startposition on the map.
 set_goal_pos_str_marker(goal_pos, map):     Sets the current goal positon on the map.
 
 show_map(map=None):                          Displays the provided map as a pdf file.
+save_map(file_path, map=None):              Saves the provided map as an image file, e.g. a png, without displaying it.
+
+version:                                    Counts the changes to int_map made through replace_map_values and
+                                            set_cell_value, so results computed from the map can tell if they are old.
+changes:                                    Log of the changes counted by version, as ((x, y), old value, new value).
+                                            changes[v] is the change that made version v + 1.
 
 
 """
 
 
 import numpy as np
-np.set_printoptions(threshold=np.inf, linewidth=300)
-import pandas as pd
+from MapFile import read_map_file
+from MapRender import str_map_image, save_image, show_image
 import time
-from PIL import Image
 
 class Map_Obj():
     def __init__(self, task=1):
         self.start_pos, self.goal_pos, self.end_goal_pos, self.path_to_map = self.fill_critical_positions(task)
-        self.int_map, self.str_map = self.read_map(self.path_to_map)
-        self.tmp_cell_value = self.get_cell_value(self.goal_pos)
-        self.set_cell_value(self.start_pos, ' S ')
-        self.set_cell_value(self.goal_pos, ' G ')
-        self.tick_counter = 0
+        self.int_map = self.read_map(self.path_to_map)
+        self.version = 0
+        self.changes = []
+        self.set_markers()
         #self.set_start_pos_str_marker(start_pos, self.str_map)
         #self.set_goal_pos_str_marker(goal_pos, self.str_map)
 
+    @classmethod
+    def from_int_map(cls, int_map, start_pos, goal_pos, end_goal_pos=None, copy=True):
+        """
+        Makes a map object from an integer map, for maps that are not one of the tasks, e.g. generated maps.
+        :param int_map: 2D array with -1 for walls and the cost of the cell otherwise
+        :param start_pos: Start position
+        :param goal_pos: Initial goal position
+        :param end_goal_pos: End goal position, the same as goal_pos if not given.
+        :param copy: If False the map is not copied, so changes to it are seen by the map object and the other way around
+        :return: the map object
+        """
+        map_obj = cls.__new__(cls)
+        map_obj.start_pos = [start_pos[0], start_pos[1]]
+        map_obj.goal_pos = [goal_pos[0], goal_pos[1]]
+        map_obj.end_goal_pos = map_obj.goal_pos if end_goal_pos is None else [end_goal_pos[0], end_goal_pos[1]]
+        map_obj.path_to_map = None
+        map_obj.int_map = np.array(int_map) if copy else np.asarray(int_map)
+        map_obj.version = 0
+        map_obj.changes = []
+        map_obj.set_markers()
+        return map_obj
+
+    @classmethod
+    def from_file(cls, path, start_pos, goal_pos, end_goal_pos=None):
+        """
+        Makes a map object from a map file, for maps that are not one of the tasks.
+        :param path: Path to a .csv map, a MovingAI .map, or a binary map made by MapFile.py
+        :param start_pos: Start position
+        :param goal_pos: Initial goal position
+        :param end_goal_pos: End goal position, the same as goal_pos if not given.
+        :return: the map object
+        """
+        map_obj = cls.__new__(cls)
+        map_obj.start_pos = [start_pos[0], start_pos[1]]
+        map_obj.goal_pos = [goal_pos[0], goal_pos[1]]
+        map_obj.end_goal_pos = map_obj.goal_pos if end_goal_pos is None else [end_goal_pos[0], end_goal_pos[1]]
+        map_obj.path_to_map = path
+        map_obj.int_map = map_obj.read_map(path)
+        map_obj.version = 0
+        map_obj.changes = []
+        map_obj.set_markers()
+        return map_obj
+
+    @property
+    def str_map(self):
+        # Made the first time it is used, with the start and goal marked.
+        if self._str_map is None:
+            self._str_map = self.make_str_map(self.int_map)
+            self._str_map[self.start_pos[0], self.start_pos[1]] = ' S '
+            self._str_map[self.goal_pos[0], self.goal_pos[1]] = ' G '
+        return self._str_map
+
+    @str_map.setter
+    def str_map(self, str_map):
+        self._str_map = str_map
+
+# Helping method called by constructor
+    def set_markers(self):
+        self.tmp_cell_value = self.get_cell_value(self.goal_pos)
+        # The start and goal are marked when the string map is made.
+        self._str_map = None
+        self.tick_counter = 0
+
 # Helping method called by constructor
     def read_map(self, path):
         """
-        Reads maps specified in path from file, converts them to a numpy array and a string array. Then replaces
-        specific values in the string array with predefined values more suitable for printing.
-        :param path: Path to .csv maps
-        :return: the integer map and string map
+        Reads maps specified in path from file. A .csv map is converted to a binary map next to it the first time, and
+        the binary map is opened as a copy on write numpy.memmap, so the cells are not parsed or copied.
+        :param path: Path to .csv maps, or binary maps
+        :return: the integer map
+        """
+        return read_map_file(path)
+
+# Helping method called by str_map
+    def make_str_map(self, data):
+        """
+        Converts an integer map to a string map, replacing the numeric values with symbols more suitable for printing.
+        :param data: The integer map
+        :return: the string map
         """
-        # Read map from provided csv file
-        df = pd.read_csv(path, index_col=None, header=None)#,error_bad_lines=False)
-        # Convert pandas dataframe to numpy array
-        data = df.values
         # Convert numpy array to string to make it more human readable
         data_str = data.astype(str)
         # Replace numeric values with more human readable symbols
@@ -68,7 +149,7 @@ class Map_Obj():
         data_str[data_str == '2'] = ' , '
         data_str[data_str == '3'] = ' : '
         data_str[data_str == '4'] = ' ; '
-        return data, data_str
+        return data_str
 
 # Helping method called by constructor
     def fill_critical_positions(self, task):
@@ -108,7 +189,8 @@ class Map_Obj():
         return start_pos, goal_pos, end_goal_pos, path_to_map
 
     def get_cell_value(self, pos):
-        return self.int_map[pos[0], pos[1]]
+        # item gives a python int, so sums of costs do not overflow the int8 of a binary map
+        return self.int_map.item(pos[0], pos[1])
 
     def get_goal_pos(self):
         return self.goal_pos
@@ -139,13 +221,17 @@ class Map_Obj():
     def set_cell_value(self, pos, value, str_map = True):
         if str_map:
             self.str_map[pos[0], pos[1]] = value
-        else:
+        elif self.int_map[pos[0], pos[1]] != value:
+            self.changes.append(((pos[0], pos[1]), int(self.int_map[pos[0], pos[1]]), value))
             self.int_map[pos[0], pos[1]] = value
+            self.version += 1
 
     def print_map(self, map_to_print):
-        # For every column in provided map, print it
-        for column in map_to_print:
-            print(column)
+        # For every column in provided map, print it. The whole column is printed on one line, without changing how
+        # numpy prints arrays elsewhere
+        with np.printoptions(threshold=np.inf, linewidth=300):
+            for column in map_to_print:
+                print(column)
 
 
     def pick_move(self):
@@ -180,9 +266,14 @@ class Map_Obj():
             str_value = ' ; '
         else:
             str_value = str(value)
-        self.int_map[pos[0]][pos[1]] = value
-        self.str_map[pos[0]][pos[1]] = str_value
-        self.str_map[goal_pos[0], goal_pos[1]] = ' G '
+        if self.int_map[pos[0]][pos[1]] != value:
+            self.changes.append(((pos[0], pos[1]), int(self.int_map[pos[0]][pos[1]]), value))
+            self.int_map[pos[0]][pos[1]] = value
+            self.version += 1
+        # If the string map is not made yet, it is made from int_map with the goal marked when it is used
+        if self._str_map is not None:
+            self._str_map[pos[0]][pos[1]] = str_value
+            self._str_map[goal_pos[0], goal_pos[1]] = ' G '
 
 
     def tick(self):
@@ -232,6 +323,25 @@ class Map_Obj():
         :param map: map to use
         :return: nothing.
         """
+        show_image(self.map_image(map))
+
+    def save_map(self, file_path, map=None):
+        """
+        A function used to draw the map as an image and save it, e.g. as a png. Works without a display.
+        :param file_path: where to save the image
+        :param map: map to use
+        :return: nothing.
+        """
+        save_image(self.map_image(map), file_path)
+
+# Helping method called by show_map and save_map
+    def map_image(self, map):
+        """
+        Draws the map as an RGB array. Every cell is 20 x 20 pixels, colored by its value in the string map
+        (undefined values are yellow, this is how the yellow path is painted). See MapRender.py.
+        :param map: map to use
+        :return: the image
+        """
         # If a map is provided, set the goal and start positions
         if map is not None:
             self.set_start_pos_str_marker(self.start_pos, map)
@@ -239,28 +349,5 @@ class Map_Obj():
         # If no map is provided, use string_map
         else:
             map = self.str_map
-
-        # Define width and height of image
-        width = map.shape[1]
-        height = map.shape[0]
-        # Define scale of the image
-        scale = 20
-        # Create an all-yellow image
-        image = Image.new('RGB', (width * scale, height * scale), (255, 255, 0))
-        # Load image
-        pixels = image.load()
-
-        # Define what colors to give to different values of the string map (undefined values will remain yellow, this is
-        # how the yellow path is painted)
-        colors = {' # ': (255, 0, 0), ' . ': (215, 215, 215), ' , ': (166, 166, 166), ' : ': (96, 96, 96),
-                  ' ; ': (36, 36, 36), ' S ': (255, 0, 255), ' G ': (0, 128, 255)}
-        # Go through image and set pixel color for every position
-        for y in range(height):
-            for x in range(width):
-                if map[y][x] not in colors: continue
-                for i in range(scale):
-                    for j in range(scale):
-                        pixels[x * scale + i, y * scale + j] = colors[map[y][x]]
-        # Show image
-        image.show()
+        return str_map_image(map, scale=20)
 
@@ -0,0 +1,202 @@
+"""
+Contains a binary file format for the maps, which is opened without parsing or copying the cells.
+
+Parsing a csv map with pandas reads and converts every number as text. A binary map is a header followed by the cells as
+one byte each, row by row, and is opened with numpy.memmap. Only the header is read when the map is opened, and the
+cells are read from the file by the operating system when they are first used. The map is opened copy on write, so it
+can be changed like any other int_map without changing the file.
+
+The header is 16 bytes: the 8 bytes in MAGIC, followed by the height and the width of the map as little endian
+unsigned 32 bit integers. The cells are int8, so the values have to be between -128 and 127. The maps use -1 for walls,
+1-4 for costs and 5 for paths drawn on the map.
+
+Map_Obj reads a csv map through the binary file next to it (Samfundet_map_1.csv gives Samfundet_map_1.map.bin). The
+binary file is made from the csv file the first time, and made again if the csv file is newer. It is written to a
+temporary file in the same directory and then moved into place, so another process opening the map at the same time
+sees either the old file or the whole new one. If the binary file can not be written, e.g. in a read-only checkout, or
+the map has values that do not fit in int8, like a cell costing 200, the text file is read into memory instead, and
+the values keep their full width. MovingAI .map files, the
+format of the grid benchmarks at movingai.com, are read the same way (arena.map gives arena.map.bin). In those the cells
+in PASSABLE cost 1 and every other cell is a wall, and the rows of the file are the x of a position [x, y].
+
+Behaviour:
+read_binary_map(path):                      Returns the map in the file as a copy on write memmap.
+write_binary_map(path, int_map):            Writes an integer map to a binary file, through a temporary file.
+convert_text_map(text_path, path=None):     Converts a csv or MovingAI map to a binary map, by default next to it.
+                                            Returns the path of the binary map.
+read_map_file(path):                        Returns the map in a csv, MovingAI or binary file. A csv or MovingAI file is
+                                            read through its binary file, which is made if it is missing or older than
+                                            the text file. It is read in memory if the binary file can not be written
+                                            or its values do not fit in int8.
+binary_path(text_path):                     The path of the binary map made from a csv or MovingAI map.
+read_text_map(path):                        Reads a csv or MovingAI map, chosen by the file extension.
+read_csv_map(path):                         Reads a csv map with pandas.
+read_movingai_map(path):                    Reads a MovingAI .map file.
+
+Run with the paths of csv or MovingAI maps as arguments to convert them, e.g. python MapFile.py Samfundet_map_1.csv
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+MAGIC = b'TDTMAP1\0'
+HEADER_SIZE = 16
+# The cells of a MovingAI map that can be walked on: ground, also in the octile maps of games, and swamp.
+PASSABLE = b'.GS'
+
+#*************************
+#        Imports
+#*************************
+import os
+import sys
+
+import numpy as np
+
+
+#*************************
+#       Functions
+#*************************
+
+# Opens a binary map. Only the header is read here.
+def read_binary_map(path):
+    with open(path, 'rb') as file:
+        header = file.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE or header[:8] != MAGIC:
+        raise ValueError(path + ' is not a binary map.')
+    height, width = np.frombuffer(header, dtype='<u4', offset=8)
+    if os.path.getsize(path) != HEADER_SIZE + int(height) * int(width):
+        raise ValueError(path + ' does not have the size given in its header.')
+    return np.memmap(path, dtype=np.int8, mode='c', offset=HEADER_SIZE, shape=(int(height), int(width)))
+
+# Writes an integer map as a binary map. The file is only replaced when the new one is complete.
+def write_binary_map(path, int_map):
+    import tempfile
+    int_map = np.asarray(int_map)
+    if int_map.size and (int_map.min() < -128 or int_map.max() > 127):
+        raise ValueError('The values of the map do not fit in int8.')
+    descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(path) + '.',
+                                                  dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(MAGIC)
+            file.write(np.array(int_map.shape, dtype='<u4').tobytes())
+            file.write(np.ascontiguousarray(int_map, dtype=np.int8).tobytes())
+        # mkstemp makes the file readable by its owner only.
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+# Converts a csv or MovingAI map to a binary map.
+def convert_text_map(text_path, path=None):
+    path = binary_path(text_path) if path is None else path
+    write_binary_map(path, read_text_map(text_path))
+    if verbose: print('Converted', text_path, 'to', path)
+    return path
+
+# Returns the map in a csv, MovingAI or binary file, through the binary file for the text files.
+def read_map_file(path):
+    if not path.endswith(('.csv', '.map')):
+        return read_binary_map(path)
+    converted = binary_path(path)
+    if not os.path.exists(converted) or os.path.getmtime(converted) < os.path.getmtime(path):
+        int_map = read_text_map(path)
+        try:
+            write_binary_map(converted, int_map)
+        except (OSError, ValueError) as error:
+            if verbose: print('Could not write', converted, error)
+            return int_map
+    return read_binary_map(converted)
+
+# Samfundet_map_1.csv gives Samfundet_map_1.map.bin, and arena.map gives arena.map.bin.
+def binary_path(text_path):
+    return os.path.splitext(text_path)[0] + '.map.bin'
+
+# Reads a csv or MovingAI map.
+def read_text_map(path):
+    return read_movingai_map(path) if path.endswith('.map') else read_csv_map(path)
+
+# Reads a csv map without a header.
+def read_csv_map(path):
+    import pandas as pd
+    return pd.read_csv(path, index_col=None, header=None).values
+
+# Reads a MovingAI map. The header gives the type, height and width, and the rows follow the line 'map'.
+def read_movingai_map(path):
+    with open(path, 'rb') as file:
+        lines = file.read().splitlines()
+    header = {}
+    for i, line in enumerate(lines):
+        if line.strip() == b'map':
+            break
+        key, value = line.decode().split(maxsplit=1)
+        header[key] = value.strip()
+    else:
+        raise ValueError(path + ' is not a MovingAI map.')
+    height, width = int(header['height']), int(header['width'])
+    rows = [line.rstrip() for line in lines[i + 1:i + 1 + height]]
+    if len(rows) != height or any(len(row) != width for row in rows):
+        raise ValueError(path + ' does not have the size given in its header.')
+    cells = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(height, width)
+    return np.where(np.isin(cells, np.frombuffer(PASSABLE, dtype=np.uint8)), 1, -1).astype(np.int8)
+
+
+
+#*************************
+#         Test
+#*************************
+# Checks that the binary maps are the same as the csv maps, and that changing the map does not change the file.
+def func_test():
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('Samfundet_map_1.csv', 'Samfundet_map_2.csv', 'Samfundet_map_Edgar_full.csv'):
+            csv_map = read_csv_map(name)
+            path = convert_text_map(name, os.path.join(directory, binary_path(name)))
+            binary_map = read_binary_map(path)
+            same = np.array_equal(binary_map, csv_map)
+            binary_map[1, 1] = 5
+            unchanged = np.array_equal(read_binary_map(path), csv_map)
+            print(name, 'same as csv:', same, 'file unchanged after a change to the map:', unchanged,
+                  'bytes:', os.path.getsize(name), '->', os.path.getsize(path))
+
+        path = os.path.join(directory, 'broken.map.bin')
+        with open(path, 'wb') as file:
+            file.write(MAGIC + b'\x10\0\0\0\x10\0\0\0')
+        try:
+            read_binary_map(path)
+            print('Truncated map was read')
+        except ValueError as error:
+            print('Truncated map gives:', error)
+
+        # Trees (T) and water (W) are walls, swamp (S) costs 1 like ground.
+        path = os.path.join(directory, 'small.map')
+        with open(path, 'w') as file:
+            file.write('type octile\nheight 3\nwidth 4\nmap\n..@.\nT.S.\n.W..\n')
+        print('MovingAI map read:', read_map_file(path).tolist() == [[1, 1, -1, 1], [-1, 1, 1, 1], [1, -1, 1, 1]],
+              'converted:', os.path.exists(binary_path(path)))
+
+        # A binary file that can not be written, here since a directory is in the way, gives the map read in memory.
+        path = os.path.join(directory, 'blocked.map')
+        with open(path, 'w') as file:
+            file.write('type octile\nheight 2\nwidth 2\nmap\n.@\n..\n')
+        os.mkdir(binary_path(path))
+        os.utime(binary_path(path), (0, 0))
+        print('Read in memory when the binary map can not be written:', read_map_file(path).tolist() == [[1, -1], [1, 1]],
+              'temporary files left:', [name for name in os.listdir(directory) if name.endswith('.tmp')])
+
+        # A cost that does not fit in int8 is kept, and no binary map is made.
+        path = os.path.join(directory, 'expensive.csv')
+        with open(path, 'w') as file:
+            file.write('-1,-1,-1\n-1,200,-1\n-1,1,-1\n')
+        int_map = read_map_file(path)
+        print('Cost 200 kept:', int(int_map[1, 1]) == 200, 'binary map made:', os.path.exists(binary_path(path)))
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for text_path in sys.argv[1:]:
+            print(text_path, '->', convert_text_map(text_path))
+    else:
+        func_test()
@@ -0,0 +1,163 @@
+"""
+Contains functions for generating maps in the same format as the Samfundet maps. Used for benchmarking on maps of
+other sizes than the ones given with the assignment.
+
+A map is a 2D numpy array where -1 is a wall and 1-4 is the cost of moving into the cell. The outer border is always
+walls, like in the csv maps.
+
+Behaviour:
+open_field(height, width, obstacle_density=0.2, seed=None):      Returns a map with randomly placed walls.
+maze(height, width, seed=None):                                  Returns a maze with corridors one cell wide, where
+                                                                 there is exactly one path between two cells.
+rooms(height, width, room_size=16, door_width=2, seed=None):     Returns a map of square rooms with a door to every
+                                                                 neighbouring room.
+weighted_terrain(int_map, cost_weights=(0.4, 0.3, 0.2, 0.1), patch_size=8, seed=None):
+                                                                 Returns the map with the free cells given the costs
+                                                                 1-4, with the probabilities in cost_weights. The
+                                                                 costs come in square patches of patch_size cells, like
+                                                                 areas of different terrain.
+generate_map(kind, height, width, obstacle_density=0.2, cost_weights=None, seed=None):
+                                                                 Returns a map of the kind 'open', 'maze', 'rooms' or
+                                                                 'weighted', an open field with weighted terrain. Any
+                                                                 kind gets weighted terrain if cost_weights is given.
+random_free_pos(int_map, rng):                                   Returns a random position that is not a wall.
+"""
+
+#*************************
+#        Imports
+#*************************
+import numpy as np
+
+
+#*************************
+#       Functions
+#*************************
+
+# Makes a map with walls on the border and randomly placed walls inside. Every other cell costs 1.
+def open_field(height, width, obstacle_density=0.2, seed=None):
+    rng = np.random.default_rng(seed)
+    int_map = np.where(rng.random((height, width)) < obstacle_density, -1, 1)
+    set_border(int_map)
+    return int_map
+
+# Makes a maze by a depth first search over every second cell, knocking down the wall to every cell it visits first.
+# The cells with even coordinates are walls, except where the search went through them.
+def maze(height, width, seed=None):
+    rng = np.random.default_rng(seed)
+    int_map = np.full((height, width), -1)
+    rows, cols = (height - 1) // 2, (width - 1) // 2
+    visited = np.zeros((rows, cols), dtype=bool)
+    visited[0, 0] = True
+    int_map[1, 1] = 1
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        unvisited = [(row + i, col + j) for i, j in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                     if 0 <= row + i < rows and 0 <= col + j < cols and not visited[row + i, col + j]]
+        if not unvisited:
+            stack.pop()
+            continue
+        next_row, next_col = unvisited[rng.integers(len(unvisited))]
+        visited[next_row, next_col] = True
+        int_map[2 * next_row + 1, 2 * next_col + 1] = 1
+        int_map[row + next_row + 1, col + next_col + 1] = 1
+        stack.append((next_row, next_col))
+    return int_map
+
+# Makes a grid of rooms. Every wall between two rooms gets a door at a random place, so all rooms are connected.
+def rooms(height, width, room_size=16, door_width=2, seed=None):
+    rng = np.random.default_rng(seed)
+    int_map = np.ones((height, width), dtype=np.int64)
+    int_map[::room_size, :] = -1
+    int_map[:, ::room_size] = -1
+    for wall in range(room_size, height - 1, room_size):
+        for start in range(0, width - 1, room_size):
+            end = min(start + room_size, width - 1)
+            door = rng.integers(start + 1, max(end - door_width, start + 1) + 1)
+            int_map[wall, door:min(door + door_width, end)] = 1
+    for wall in range(room_size, width - 1, room_size):
+        for start in range(0, height - 1, room_size):
+            end = min(start + room_size, height - 1)
+            door = rng.integers(start + 1, max(end - door_width, start + 1) + 1)
+            int_map[door:min(door + door_width, end), wall] = 1
+    set_border(int_map)
+    return int_map
+
+# Gives the free cells costs 1-4 in patches. The cost of every patch is drawn with the probabilities in cost_weights.
+def weighted_terrain(int_map, cost_weights=(0.4, 0.3, 0.2, 0.1), patch_size=8, seed=None):
+    rng = np.random.default_rng(seed)
+    height, width = int_map.shape
+    cost_weights = np.asarray(cost_weights, dtype=float)
+    patches = rng.choice(np.arange(1, len(cost_weights) + 1), p=cost_weights / cost_weights.sum(),
+                         size=(-(-height // patch_size), -(-width // patch_size)))
+    costs = np.repeat(np.repeat(patches, patch_size, axis=0), patch_size, axis=1)[:height, :width]
+    return np.where(int_map == -1, -1, costs)
+
+# Returns a map of the given kind.
+def generate_map(kind, height, width, obstacle_density=0.2, cost_weights=None, seed=None):
+    if kind == 'open':
+        int_map = open_field(height, width, obstacle_density, seed)
+    elif kind == 'maze':
+        int_map = maze(height, width, seed)
+    elif kind == 'rooms':
+        int_map = rooms(height, width, seed=seed)
+    elif kind == 'weighted':
+        int_map = weighted_terrain(open_field(height, width, obstacle_density, seed), seed=seed)
+    else:
+        raise ValueError('Unknown kind of map: ' + str(kind))
+    if cost_weights is not None:
+        int_map = weighted_terrain(int_map, cost_weights, seed=seed)
+    return int_map
+
+# Returns a random position [x, y] on the map which is not a wall.
+def random_free_pos(int_map, rng):
+    free = np.argwhere(int_map != -1)
+    x, y = free[rng.integers(len(free))]
+    return [int(x), int(y)]
+
+# Sets the outer border of the map to walls.
+def set_border(int_map):
+    int_map[0, :] = -1
+    int_map[-1, :] = -1
+    int_map[:, 0] = -1
+    int_map[:, -1] = -1
+
+
+
+#*************************
+#         Test
+#*************************
+def func_test():
+    int_map = open_field(10, 20, seed=1)
+    print(int_map)
+    print('Border is walls:', bool((int_map[0] == -1).all() and (int_map[:, -1] == -1).all()))
+    print('Free position:', random_free_pos(int_map, np.random.default_rng(1)))
+
+    # Every free cell of a maze or of the rooms should be reached from any other.
+    for kind in ('maze', 'rooms'):
+        int_map = generate_map(kind, 41, 61, seed=1)
+        print(kind, 'border is walls:', bool((int_map[0] == -1).all() and (int_map[:, -1] == -1).all()),
+              'connected:', connected(int_map))
+    print(maze(11, 21, seed=1))
+    int_map = generate_map('open', 200, 200, 0.0, cost_weights=(0.7, 0.1, 0.1, 0.1), seed=1)
+    free = int_map[int_map != -1]
+    print('Weighted terrain, share of every cost:', [round(float(np.mean(free == cost)), 2) for cost in (1, 2, 3, 4)])
+
+# Returns True if all free cells can be reached from the first free cell, by filling outwards from it.
+def connected(int_map):
+    free = int_map != -1
+    reached = np.zeros_like(free)
+    reached[tuple(np.argwhere(free)[0])] = True
+    while True:
+        grown = reached.copy()
+        grown[1:] |= reached[:-1]
+        grown[:-1] |= reached[1:]
+        grown[:, 1:] |= reached[:, :-1]
+        grown[:, :-1] |= reached[:, 1:]
+        grown &= free
+        if np.array_equal(grown, reached):
+            return bool(np.array_equal(reached, free))
+        reached = grown
+
+if __name__ == "__main__":
+    func_test()
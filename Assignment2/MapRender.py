@@ -0,0 +1,177 @@
+"""
+Contains rendering of the maps as images with whole array numpy operations.
+
+show_map used to paint every pixel of every cell through PIL one at a time. Here the color of every cell is looked up in
+a table with one numpy index operation, and every cell is then made scale x scale pixels with np.repeat. The image is
+given to PIL in one call, only to be shown or saved. The colors are the ones show_map has allways used: walls are red,
+the costs 1-4 are lighter to darker grey, the start is purple, the goal blue, and everything else, like the path, is
+yellow.
+
+A path can be drawn from the int_map of a Map_Obj without writing the path into the map, so many paths can be drawn on
+the same map, and the map can still be used for searching afterwards.
+
+Behaviour:
+str_map_image(str_map, scale=20):           Returns the image of a string map as an RGB array shaped
+                                            (height * scale, width * scale, 3).
+path_image(map_obj, path=None, scale=20):   Returns the image of the int_map of the map with the path, the start and the
+                                            goal drawn on it.
+heatmap_image(map_obj, order, scale=20):   Returns the image of the map with the expanded cells colored by when they
+                                            were expanded, from cyan for the first to dark blue for the last. order is
+                                            shaped like the map with the number of the expansion, or -1, like
+                                            expansion_order in SearchStats.py gives it.
+save_image(image, file_path):               Saves an RGB array as an image file, e.g. a png. Needs no display.
+show_image(image):                          Shows an RGB array with the image viewer of the system.
+render_paths(map_obj, paths, directory, scale=20, prefix='path'):
+                                            Saves an image of every path to the directory, as prefix_0.png,
+                                            prefix_1.png and so on, and returns the file paths.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+# The colors of the string map. Values that are not here are yellow.
+COLORS = {' # ': (255, 0, 0), ' . ': (215, 215, 215), ' , ': (166, 166, 166), ' : ': (96, 96, 96),
+          ' ; ': (36, 36, 36), ' S ': (255, 0, 255), ' G ': (0, 128, 255)}
+YELLOW = (255, 255, 0)
+# The colors of the first and the last expanded cell in a heatmap.
+FIRST_EXPANDED = (0, 255, 255)
+LAST_EXPANDED = (0, 0, 139)
+
+#*************************
+#        Imports
+#*************************
+import os
+
+import numpy as np
+
+# The colors of the int map, indexed by the value of the cell plus one, so walls (-1) are first. The rows after the
+# costs are the path, the start and the goal.
+CELL_COLORS = np.array([COLORS[' # '], YELLOW, COLORS[' . '], COLORS[' , '], COLORS[' : '], COLORS[' ; '], YELLOW,
+                        COLORS[' S '], COLORS[' G ']], dtype=np.uint8)
+PATH, START, GOAL = 6, 7, 8
+
+
+#*************************
+#       Functions
+#*************************
+
+# The image of a string map. Every distinct string is looked up once.
+def str_map_image(str_map, scale=20):
+    values, codes = np.unique(np.asarray(str_map), return_inverse=True)
+    table = np.array([COLORS.get(value, YELLOW) for value in values], dtype=np.uint8)
+    return upscale(table[codes.reshape(np.shape(str_map))], scale)
+
+# The image of the int map with a path on it. The map itself is not changed.
+def path_image(map_obj, path=None, scale=20):
+    return upscale(CELL_COLORS[cell_codes(map_obj, path)], scale)
+
+# The image of the map with the expanded cells colored by the order they were expanded in. The start and goal keep
+# their colors.
+def heatmap_image(map_obj, order, scale=20):
+    codes = cell_codes(map_obj)
+    cells = CELL_COLORS[codes]
+    expanded = (np.asarray(order) >= 0) & (codes != START) & (codes != GOAL)
+    fraction = (order[expanded] / max(int(np.max(order)), 1))[:, None]
+    cells[expanded] = np.rint((1 - fraction) * FIRST_EXPANDED + fraction * LAST_EXPANDED).astype(np.uint8)
+    return upscale(cells, scale)
+
+# Saves an image. PIL is only imported when an image is saved or shown.
+def save_image(image, file_path):
+    from PIL import Image
+    Image.fromarray(image).save(file_path)
+
+# Shows an image.
+def show_image(image):
+    from PIL import Image
+    Image.fromarray(image).show()
+
+# Saves an image of every path on the map to the directory.
+def render_paths(map_obj, paths, directory, scale=20, prefix='path'):
+    os.makedirs(directory, exist_ok=True)
+    codes = cell_codes(map_obj)
+    file_paths = []
+    for i, path in enumerate(paths):
+        file_path = os.path.join(directory, prefix + '_' + str(i) + '.png')
+        save_image(upscale(CELL_COLORS[mark_path(codes.copy(), map_obj, path)], scale), file_path)
+        file_paths.append(file_path)
+        if verbose: print('Saved', file_path)
+    return file_paths
+
+
+# Helping functions
+
+# Returns the row in CELL_COLORS of every cell, with the path, start and goal marked. Values without a color of their
+# own are drawn as the path.
+def cell_codes(map_obj, path=None):
+    int_map = np.asarray(map_obj.int_map)
+    codes = np.where((int_map >= -1) & (int_map <= 4), int_map + 1, PATH).astype(np.intp)
+    return mark_path(codes, map_obj, path)
+
+# Marks the path after its first cell, then the start and the goal, like visualise_path_map and show_map.
+def mark_path(codes, map_obj, path):
+    if path is not None and len(path) > 1:
+        cells = np.asarray(path)[1:]
+        codes[cells[:, 0], cells[:, 1]] = PATH
+    codes[map_obj.start_pos[0], map_obj.start_pos[1]] = START
+    codes[map_obj.goal_pos[0], map_obj.goal_pos[1]] = GOAL
+    return codes
+
+# Makes every cell scale x scale pixels.
+def upscale(cells, scale):
+    return np.repeat(np.repeat(cells, scale, axis=0), scale, axis=1)
+
+
+
+#*************************
+#         Test
+#*************************
+# The image drawn the way show_map did it before, one pixel at a time.
+def pixel_image(str_map, scale=20):
+    from PIL import Image
+    height, width = str_map.shape
+    image = Image.new('RGB', (width * scale, height * scale), YELLOW)
+    pixels = image.load()
+    for y in range(height):
+        for x in range(width):
+            if str_map[y][x] not in COLORS: continue
+            for i in range(scale):
+                for j in range(scale):
+                    pixels[x * scale + i, y * scale + j] = COLORS[str_map[y][x]]
+    return np.array(image)
+
+# Checks that the images are the same as the ones drawn one pixel at a time and the ones in Maps, and that drawing a
+# path does not change the map.
+def func_test():
+    # Imported here since Map.py imports this module.
+    import tempfile
+    from PIL import Image
+    from Map import Map_Obj
+    from GridAStar import GridAStar
+    for task in (1, 2, 3, 4):
+        map_obj = Map_Obj(task)
+        path = GridAStar(map_obj).run()
+        int_map = np.array(map_obj.int_map)
+        image = path_image(map_obj, path)
+        unchanged = np.array_equal(int_map, map_obj.int_map) and map_obj.version == 0
+
+        # Draw the path into the map like visualise_path_map in Part1and2.py.
+        for position in path[1:]:
+            map_obj.replace_map_values(position, 5, map_obj.get_goal_pos())
+        same_as_pixels = np.array_equal(str_map_image(map_obj.str_map), pixel_image(map_obj.str_map)) and \
+            np.array_equal(image, pixel_image(map_obj.str_map))
+        same_as_saved = np.array_equal(image, np.array(Image.open('Maps/task' + str(task) + '.png').convert('RGB')))
+        print('Task', task, 'same as pixel by pixel:', same_as_pixels, 'same as Maps/task' + str(task) + '.png:',
+              same_as_saved, 'map unchanged by path_image:', unchanged)
+
+    map_obj = Map_Obj(3)
+    path = GridAStar(map_obj).run()
+    paths = [path[:length] for length in (10, 20, len(path))]
+    with tempfile.TemporaryDirectory() as directory:
+        file_paths = render_paths(map_obj, paths, directory)
+        print('Rendered:', [os.path.basename(file_path) for file_path in file_paths],
+              'same as path_image:', all(np.array_equal(np.array(Image.open(file_path)), path_image(map_obj, path))
+                                         for file_path, path in zip(file_paths, paths)))
+
+if __name__ == "__main__":
+    func_test()
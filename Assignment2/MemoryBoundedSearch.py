@@ -0,0 +1,384 @@
+"""
+Contains searches that use a bounded amount of memory, for state spaces too large to keep every node like AStar does.
+
+IterativeDeepeningAStar (IDA*) runs depth first searches that stop at states with an f-cost above a threshold. The
+threshold starts at the heuristic of the start, and is raised to the smallest f-cost above it after every search. Only
+the current path is kept, together with a transposition cache of the cheapest g-cost each state has been reached with
+in the current search. A state reached again at a cost that is no better is not searched again. The cache is bounded,
+and the states added first are removed when it is full.
+
+SMAStar (simplified memory-bounded A*) works like A*, but generates one successor at a time and keeps at most max_nodes
+nodes. When memory is full the leaf with the highest f-cost is dropped, and the parent remembers its f-cost so the leaf
+can be generated again if it becomes the best choice. The f-cost of a node whose successors are all generated is the
+smallest f-cost of its successors, so a parent knows how good the paths below it are after they are dropped. The path is
+the shortest as long as max_nodes is larger than the amount of states on it.
+
+Both take the same input as AStar, and:
+cache_size:                         The most states in the transposition cache of IterativeDeepeningAStar.
+max_nodes:                          The most nodes SMAStar keeps in memory.
+
+Behaviour:
+run():                              Returns the path as a list of states, or None if there is no path.
+cost:                               Cost of the path found.
+expansions:                         Amount of states expanded, counting states expanded again.
+peak_nodes:                         The most states kept at the same time, on the path and in the cache for IDA*.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from heapq import heappush, heappop, heapify
+from math import inf
+
+
+#*************************
+#     IDA* as a class
+#*************************
+class IterativeDeepeningAStar():
+
+# Constructor
+    def __init__(self, start_state, func_heuristic, func_adjacent_states, func_goal_evaluate, func_cost=lambda x, y: 1,
+                 cache_size=10000):
+
+        self.start_state = start_state
+        self.func_heuristic = func_heuristic
+        self.func_adjacent_states = func_adjacent_states
+        self.func_goal_evaluate = func_goal_evaluate
+        self.func_cost = func_cost
+        self.cache_size = cache_size
+
+        self.cost = None
+        self.expansions = 0
+        self.iterations = 0
+        self.peak_nodes = 0
+
+    # Method for running searches with higher thresholds until the goal is found.
+    def run(self):
+        threshold = self.func_heuristic(self.start_state)
+        while True:
+            self.iterations += 1
+            if verbose: print('Threshold:', threshold)
+            path, threshold = self.search(threshold)
+            if path is not None:
+                return path
+            if threshold == inf:
+                print("No solution was found.")
+                self.cost = None
+                return None
+
+
+# Helping methods
+
+    # Depth first search that does not go past the threshold. Returns the path if the goal is found, and the next
+    # threshold otherwise.
+    def search(self, threshold):
+        if self.func_goal_evaluate(self.start_state):
+            self.cost = 0
+            return [self.start_state], threshold
+
+        # The stack holds the states on the current path, with their g-cost and the successors not yet tried.
+        stack = [(self.start_state, 0, iter(self.func_adjacent_states(self.start_state)))]
+        on_path = {self.start_state}
+        cache = {self.start_state: 0}
+        next_threshold = inf
+        while stack:
+            state, g_cost, successors = stack[-1]
+            next_state = next(successors, None)
+            if next_state is None:
+                stack.pop()
+                on_path.discard(state)
+                continue
+            if next_state in on_path:
+                continue
+
+            new_cost = g_cost + self.func_cost(state, next_state)
+            f_cost = new_cost + self.func_heuristic(next_state)
+            if f_cost > threshold:
+                next_threshold = min(next_threshold, f_cost)
+                continue
+            if cache.get(next_state, inf) <= new_cost:
+                continue
+            if next_state not in cache and len(cache) >= self.cache_size:
+                del cache[next(iter(cache))]
+            cache[next_state] = new_cost
+
+            if self.func_goal_evaluate(next_state):
+                self.cost = new_cost
+                return [entry[0] for entry in stack] + [next_state], threshold
+            stack.append((next_state, new_cost, iter(self.func_adjacent_states(next_state))))
+            on_path.add(next_state)
+            self.expansions += 1
+            self.peak_nodes = max(self.peak_nodes, len(stack) + len(cache))
+        return None, next_threshold
+
+
+#*************************
+#   Nodes for SMA*
+#*************************
+class SMANode():
+
+# Constructor
+    def __init__(self, state, g_cost, f_cost, parent=None, depth=0):
+
+        self.state = state
+        self.g_cost = g_cost
+        self.f_cost = f_cost
+        self.parent = parent
+        self.depth = depth
+        self.children = {}  # The successors in memory, by state.
+        self.forgotten = {}  # The f-costs of successors that were dropped, by state.
+        self.pending = None  # Successor states not yet generated. Made when the node is first chosen.
+        self.generated_all = False  # True when every successor has been generated once.
+        self.in_memory = True
+
+    # Returns True if the node has successors left to generate.
+    def is_expandable(self):
+        return self.pending is None or len(self.pending) > 0 or len(self.forgotten) > 0
+
+
+#*************************
+#     SMA* as a class
+#*************************
+class SMAStar():
+
+# Constructor
+    def __init__(self, start_state, func_heuristic, func_adjacent_states, func_goal_evaluate, func_cost=lambda x, y: 1,
+                 max_nodes=1000):
+
+        self.func_heuristic = func_heuristic
+        self.func_adjacent_states = func_adjacent_states
+        self.func_goal_evaluate = func_goal_evaluate
+        self.func_cost = func_cost
+        self.max_nodes = max_nodes
+
+        self.root = SMANode(start_state, 0, func_heuristic(start_state))
+        self.node_count = 1
+        # The node with the lowest g-cost for every state in memory. Paths that are no better are not generated.
+        self.state_node_map = {start_state: self.root}
+        # Heaps for the best node to expand, and the worst leaf to drop. Entries that are out of date are skipped.
+        self.open = []
+        self.leaves = []
+        self.push_counter = 0
+        self.push_node(self.root)
+
+        self.cost = None
+        self.expansions = 0
+        self.peak_nodes = 1
+
+    # Method for running the search until the goal is chosen as the best node.
+    def run(self):
+        while True:
+            best = self.best_node()
+            if best is None or best.f_cost == inf:
+                print("No solution was found.")
+                self.cost = None
+                return None
+            if self.func_goal_evaluate(best.state):
+                self.cost = best.g_cost
+                return self.find_path(best)
+            # Room is made before the successor is generated, so there are never more than max_nodes nodes.
+            if self.node_count >= self.max_nodes:
+                self.drop_worst_leaf(best)
+            self.generate_successor(best)
+
+
+# Helping methods
+
+    # Puts the node in the heaps it belongs in, with its current f-cost. The entries that are out of date would make the
+    # heaps grow without bound, so the heaps are made again from the nodes in memory when they get too long.
+    def push_node(self, node):
+        if len(self.open) + len(self.leaves) > 2 * self.max_nodes:
+            self.rebuild_heaps()
+        self.push_counter += 1
+        if node.is_expandable():
+            heappush(self.open, (node.f_cost, -node.depth, self.push_counter, node))
+        if not node.children and node is not self.root:
+            heappush(self.leaves, (-node.f_cost, node.depth, self.push_counter, node))
+
+    def rebuild_heaps(self):
+        self.open, self.leaves = [], []
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            nodes += node.children.values()
+            self.push_counter += 1
+            if node.is_expandable():
+                self.open.append((node.f_cost, -node.depth, self.push_counter, node))
+            if not node.children and node is not self.root:
+                self.leaves.append((-node.f_cost, node.depth, self.push_counter, node))
+        heapify(self.open)
+        heapify(self.leaves)
+
+    # Returns the expandable node with the lowest f-cost, the deepest first.
+    def best_node(self):
+        while self.open:
+            f_cost, depth, push_number, node = self.open[0]
+            if node.in_memory and node.is_expandable() and f_cost == node.f_cost:
+                return node
+            heappop(self.open)
+        return None
+
+    # Generates the next successor of the node. Dropped successors are generated again when the others are used.
+    def generate_successor(self, node):
+        if node.pending is None:
+            node.pending = list(self.func_adjacent_states(node.state))
+            self.expansions += 1
+        elif not node.pending:
+            node.pending = list(node.forgotten)
+        while node.pending:
+            state = node.pending.pop(0)
+            forgotten = node.forgotten.pop(state, 0)
+            g_cost = node.g_cost + self.func_cost(node.state, state)
+            other = self.state_node_map.get(state)
+            if self.is_ancestor(node, state) or (other is not None and other.g_cost <= g_cost):
+                continue
+            # The f-cost is never lower than the parent's (pathmax), or than what was found before it was dropped.
+            f_cost = max(node.f_cost, g_cost + self.func_heuristic(state), forgotten)
+            if node.depth + 1 >= self.max_nodes - 1 and not self.func_goal_evaluate(state):
+                f_cost = inf
+            child = SMANode(state, g_cost, f_cost, node, node.depth + 1)
+            node.children[state] = child
+            self.state_node_map[state] = child
+            self.node_count += 1
+            self.peak_nodes = max(self.peak_nodes, self.node_count)
+            self.push_node(child)
+            break
+        if not node.pending:
+            node.generated_all = True
+        self.backup(node)
+
+    # Returns True if the state is on the path to the node, so going there would make a cycle.
+    def is_ancestor(self, node, state):
+        while node is not None:
+            if node.state == state:
+                return True
+            node = node.parent
+        return False
+
+    # When all successors of a node are generated, its f-cost is the lowest f-cost below it. The change is passed up.
+    def backup(self, node):
+        while node is not None:
+            f_cost = node.f_cost
+            if node.generated_all:
+                f_cost = min([child.f_cost for child in node.children.values()] + list(node.forgotten.values()),
+                             default=inf)
+            changed = f_cost != node.f_cost
+            node.f_cost = f_cost
+            self.push_node(node)
+            if not changed:
+                return
+            node = node.parent
+
+    # Drops the leaf with the highest f-cost, the shallowest first, and lets the parent remember it. The node about to
+    # be expanded is kept.
+    def drop_worst_leaf(self, keep):
+        kept = None
+        while self.leaves:
+            entry = heappop(self.leaves)
+            f_cost, depth, push_number, leaf = entry
+            if not leaf.in_memory or leaf.children or -f_cost != leaf.f_cost:
+                continue
+            if leaf is keep:
+                kept = entry
+                continue
+            if verbose: print('Drop:', leaf.state)
+            leaf.in_memory = False
+            parent = leaf.parent
+            del parent.children[leaf.state]
+            parent.forgotten[leaf.state] = leaf.f_cost
+            if self.state_node_map.get(leaf.state) is leaf:
+                del self.state_node_map[leaf.state]
+            self.node_count -= 1
+            self.backup(parent)
+            break
+        if kept is not None:
+            heappush(self.leaves, kept)
+
+    # Returns the states from the start to the node.
+    def find_path(self, node):
+        path = []
+        while node is not None:
+            path.append(node.state)
+            node = node.parent
+        path.reverse()
+        return path
+
+
+
+#*************************
+#         Test
+#*************************
+import tracemalloc
+
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+
+# States on a grid without borders. The goal is at (12, 12), and moving right or down costs 1, left or up costs 2. The
+# heuristic is half the walking distance, so many states are searched.
+def open_grid_adjacent_states(state):
+    return [(state[0] + 1, state[1]), (state[0], state[1] + 1), (state[0] - 1, state[1]), (state[0], state[1] - 1)]
+
+def open_grid_cost(state, next_state):
+    return 1 if next_state[0] > state[0] or next_state[1] > state[1] else 2
+
+def open_grid_heuristic(state):
+    return (abs(12 - state[0]) + abs(12 - state[1])) // 2
+
+def open_grid_goal_evaluate(state):
+    return state == (12, 12)
+
+# Checks the costs against AStar on the tasks, and that the memory used stays within the bounds given.
+def func_test():
+    for task in (1, 3, 4):
+        map_obj = Map_Obj(task)
+        start_state = (map_obj, *map_obj.get_start_pos())
+        functions = (Part1and2.walking_distance, Part1and2.generate_adjacent_states, Part1and2.goal_evaluate,
+                     Part1and2.find_cost)
+        shortest = AStar(start_state, *functions).run()[-1].g_cost
+        ida_star = IterativeDeepeningAStar(start_state, *functions, cache_size=2000)
+        ida_star.run()
+        sma_star = SMAStar(start_state, *functions, max_nodes=120)
+        sma_star.run()
+        print('Task', task, 'shortest:', shortest, 'IDA*:', ida_star.cost, 'expansions', ida_star.expansions,
+              'peak nodes', ida_star.peak_nodes, 'SMA*:', sma_star.cost, 'expansions', sma_star.expansions,
+              'peak nodes', sma_star.peak_nodes)
+
+    # On a grid without borders AStar keeps every state it reaches. The memory of the bounded searches should stay
+    # below the caps, counted both in nodes and in bytes, and the costs should still be the shortest.
+    a_star = AStar((0, 0), open_grid_heuristic, open_grid_adjacent_states, open_grid_goal_evaluate, open_grid_cost)
+    shortest = a_star.run()[-1].g_cost
+    print('Grid without borders, shortest:', shortest, 'nodes kept by AStar:', len(a_star.state_node_map))
+    for max_nodes in (100, 200):
+        sma_star = SMAStar((0, 0), open_grid_heuristic, open_grid_adjacent_states, open_grid_goal_evaluate,
+                           open_grid_cost, max_nodes=max_nodes)
+        tracemalloc.start()
+        sma_star.run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert sma_star.cost == shortest, 'SMA* did not find the shortest path'
+        assert sma_star.peak_nodes <= max_nodes, 'SMA* kept more nodes than max_nodes'
+        assert peak < 2048 * max_nodes, 'SMA* used more than 2 kB per node allowed'
+        print('SMA* max nodes', max_nodes, 'cost', sma_star.cost, 'peak nodes', sma_star.peak_nodes, 'peak kB',
+              peak // 1024)
+
+    # The path can not be longer than the shortest cost, since every move costs at least 1.
+    for cache_size in (100, 200):
+        ida_star = IterativeDeepeningAStar((0, 0), open_grid_heuristic, open_grid_adjacent_states,
+                                           open_grid_goal_evaluate, open_grid_cost, cache_size=cache_size)
+        tracemalloc.start()
+        ida_star.run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert ida_star.cost == shortest, 'IDA* did not find the shortest path'
+        assert ida_star.peak_nodes <= cache_size + shortest + 1, 'IDA* kept more than the cache and the path'
+        assert peak < 2048 * (cache_size + shortest + 1), 'IDA* used more than 2 kB per state allowed'
+        print('IDA* cache size', cache_size, 'cost', ida_star.cost, 'peak nodes', ida_star.peak_nodes, 'peak kB',
+              peak // 1024)
+
+if __name__ == "__main__":
+    func_test()
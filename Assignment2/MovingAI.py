@@ -0,0 +1,273 @@
+"""
+Contains loading of the MovingAI grid benchmarks, and a runner checking the engines against their optimal lengths.
+
+The benchmarks at movingai.com are maps in .map files, and scenarios in .scen files. Every line of a scenario file is
+one query on a map, with the optimal length of the path. The queries are put in buckets by their length, bucket b holding
+the ones of optimal length from 4b up to 4b + 4, so the engines can be compared on short and long paths.
+
+The optimal lengths are for 8-connected movement where every passable cell costs 1, a diagonal move costs sqrt(2), and a
+diagonal move is not allowed past the corner of a wall. The engines are run the same way: GridAStar with diagonal moves
+and corner_cutting=False, and AStar with generate_adjacent_states_octile and find_cost_diagonal. JumpPointSearch cuts
+corners, so it can not be checked against the optimal lengths, and is not an engine here.
+
+The maps are read by Map_Obj.from_file through MapFile.py, so every map is converted to a binary map the first time, and
+opened from that afterwards. In a MovingAI file a position is (x, y) with x the column. Here it is turned into [x, y]
+like everywhere else in this repository, where x is the row, so (x, y) in the file is [y, x] here.
+
+Engines:
+GridAStar:                          GridAStar with diagonal moves and no corner cutting, made once per map.
+AStar:                              AStar with diagonal_distance from Part1and2.py, generate_adjacent_states_octile
+                                    and find_cost_diagonal.
+
+Behaviour:
+read_scenarios(path):               Returns the scenarios in a .scen file as a list of Scenario.
+load_map(scenario, map_directory):  Returns the map of a scenario as a Map_Obj with the start and goal of the scenario.
+generate_adjacent_states_octile(state):
+                                    Returns the 8-connected adjacent states of a (Map_Obj, x, y) state, without the
+                                    moves past the corner of a wall or off the map.
+run_scenarios(scenarios, map_directory, engines=('GridAStar',)):
+                                    Runs every scenario through every engine. Returns one dict per scenario and engine
+                                    with the cost found and if it is the optimal length.
+bucket_rows(results):               Returns one row per bucket and engine with the amount of scenarios, the amount
+                                    with the optimal length, the mean expansions and the scenarios per second.
+main(arguments=None):               The command line interface, run when the module is run. See python MovingAI.py
+                                    --help for the options.
+
+Example:
+python MovingAI.py arena.map.scen --maps maps/dao --engines GridAStar AStar --buckets 0 20
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+# How far a cost can be from the optimal length, which is given with 8 decimals.
+TOLERANCE = 1e-6
+
+#*************************
+#        Imports
+#*************************
+import argparse
+import contextlib
+import io
+import os
+import time
+from collections import namedtuple
+
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+from GridAStar import GridAStar
+from Benchmark import print_table
+
+# One line of a scenario file, with the positions as [x, y] in this repository.
+Scenario = namedtuple('Scenario', ('bucket', 'map_name', 'width', 'height', 'start_pos', 'goal_pos', 'optimal_length'))
+
+
+#*************************
+#        Engines
+#*************************
+
+# Every engine is made once per map, and returns a function solving one query as (cost, expansions). The cost is None
+# if there is no path.
+
+def grid_engine(map_obj):
+    grid = GridAStar(map_obj, diagonal=True, corner_cutting=False)
+    def solve(start_pos, goal_pos):
+        grid.run(start_pos, goal_pos)
+        return grid.cost, grid.expansions
+    return solve
+
+def astar_engine(map_obj):
+    def solve(start_pos, goal_pos):
+        map_obj.start_pos, map_obj.goal_pos = start_pos, goal_pos
+        a_star = AStar((map_obj, *start_pos), Part1and2.diagonal_distance, generate_adjacent_states_octile,
+                       Part1and2.goal_evaluate, Part1and2.find_cost_diagonal)
+        node_path = a_star.run()
+        return None if node_path is None else float(node_path[-1].g_cost), len(a_star.closed)
+    return solve
+
+ENGINES = {'GridAStar': grid_engine, 'AStar': astar_engine}
+
+
+
+#*************************
+#       Functions
+#*************************
+
+# Reads a scenario file. The first line is the version, in the files that have one.
+def read_scenarios(path):
+    scenarios = []
+    with open(path) as file:
+        for line in file:
+            fields = line.split()
+            if not fields or fields[0] == 'version':
+                continue
+            if len(fields) != 9:
+                raise ValueError(path + ' has a line that is not a scenario: ' + line.strip())
+            bucket, width, height, start_x, start_y, goal_x, goal_y = (int(field) for field in fields[:1] + fields[2:8])
+            scenarios.append(Scenario(bucket, fields[1], width, height, [start_y, start_x], [goal_y, goal_x],
+                                      float(fields[8])))
+    return scenarios
+
+# Loads the map of a scenario. The map is looked for by its file name in map_directory, since the scenario files give
+# the path the map had where the scenarios were made.
+def load_map(scenario, map_directory):
+    map_obj = Map_Obj.from_file(os.path.join(map_directory, os.path.basename(scenario.map_name)), scenario.start_pos,
+                                scenario.goal_pos)
+    if map_obj.int_map.shape != (scenario.height, scenario.width):
+        raise ValueError(scenario.map_name + ' is not the size given in the scenario.')
+    return map_obj
+
+# Returns the adjacent states when a diagonal move needs both cells it passes to be free.
+def generate_adjacent_states_octile(state):
+    map_obj, x, y = state
+    height, width = map_obj.int_map.shape
+    states = []
+    for i, j in [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i != 0 or j != 0]:
+        if not (0 <= x + i < height and 0 <= y + j < width) or map_obj.get_cell_value([x + i, y + j]) == -1:
+            continue
+        if i != 0 and j != 0 and (map_obj.get_cell_value([x + i, y]) == -1 or map_obj.get_cell_value([x, y + j]) == -1):
+            continue
+        states.append((map_obj, x + i, y + j))
+    return states
+
+# Runs the scenarios. Every map is loaded once, and every engine made once per map. The searches print when they
+# finish, which is kept out of the output.
+def run_scenarios(scenarios, map_directory, engines=('GridAStar',)):
+    solvers = {}
+    results = []
+    for number, scenario in enumerate(scenarios):
+        if scenario.map_name not in solvers:
+            map_obj = load_map(scenario, map_directory)
+            solvers[scenario.map_name] = [(engine, ENGINES[engine](map_obj)) for engine in engines]
+        for engine, solve in solvers[scenario.map_name]:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                cost, expansions = solve(scenario.start_pos, scenario.goal_pos)
+                seconds = time.perf_counter() - start
+            optimal = cost is not None and abs(cost - scenario.optimal_length) < TOLERANCE
+            if verbose and not optimal: print('Scenario', number, engine, 'cost:', cost, 'optimal:',
+                                              scenario.optimal_length)
+            results.append({'scenario': number, 'bucket': scenario.bucket, 'map': scenario.map_name,
+                            'engine': engine, 'optimal_length': scenario.optimal_length, 'cost': cost,
+                            'optimal': optimal, 'expansions': expansions, 'seconds': seconds})
+    return results
+
+# Returns one row per bucket and engine, sorted by bucket.
+def bucket_rows(results):
+    groups = {}
+    for result in results:
+        groups.setdefault((result['bucket'], result['engine']), []).append(result)
+    rows = []
+    for (bucket, engine), group in sorted(groups.items()):
+        seconds = sum(result['seconds'] for result in group)
+        rows.append((bucket, engine, len(group), sum(result['optimal'] for result in group),
+                     sum(result['expansions'] for result in group) / len(group),
+                     len(group) / seconds if seconds else '', 1e3 * seconds / len(group)))
+    return rows
+
+# The command line interface.
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Runs MovingAI scenarios and checks the optimal lengths.')
+    parser.add_argument('scenarios', nargs='+', help='.scen files to run.')
+    parser.add_argument('--maps', help='Directory of the .map files. By default the directory of every .scen file.')
+    parser.add_argument('--engines', nargs='*', default=['GridAStar'], choices=list(ENGINES), help='Engines to run.')
+    parser.add_argument('--buckets', type=int, nargs=2, default=None, metavar=('FIRST', 'LAST'),
+                        help='Only run the buckets from FIRST to LAST.')
+    parser.add_argument('--limit', type=int, default=None, help='Most scenarios to run from every file.')
+    args = parser.parse_args(arguments)
+
+    results = []
+    for path in args.scenarios:
+        scenarios = read_scenarios(path)
+        if args.buckets is not None:
+            scenarios = [scenario for scenario in scenarios if args.buckets[0] <= scenario.bucket <= args.buckets[1]]
+        scenarios = scenarios[:args.limit]
+        map_directory = os.path.dirname(path) if args.maps is None else args.maps
+        results += run_scenarios(scenarios, map_directory, args.engines)
+
+    print_table(('bucket', 'engine', 'scenarios', 'optimal', 'expansions', 'scenarios/s', 'ms'), bucket_rows(results))
+    wrong = [result for result in results if not result['optimal']]
+    print('Scenarios not solved with the optimal length:', len(wrong))
+    for result in wrong[:10]:
+        print('  ', result['map'], 'scenario', result['scenario'], result['engine'], 'cost:', result['cost'],
+              'optimal:', result['optimal_length'])
+    return results
+
+
+
+#*************************
+#         Test
+#*************************
+import tempfile
+
+import numpy as np
+
+from MapGenerator import generate_map, random_free_pos
+
+# Writes a map as a MovingAI map, with walls as '@' and the other cells as '.'.
+def write_movingai_map(path, int_map):
+    with open(path, 'w') as file:
+        file.write('type octile\nheight ' + str(int_map.shape[0]) + '\nwidth ' + str(int_map.shape[1]) + '\nmap\n')
+        for row in int_map:
+            file.write(''.join('@' if value == -1 else '.' for value in row) + '\n')
+
+# Checks a small map where cutting the corner would be shorter, and that GridAStar and AStar find the optimal lengths
+# on a generated map, given by a Dijkstra written here without GridAStar.
+def func_test():
+    with tempfile.TemporaryDirectory() as directory:
+        # The diagonal from (0, 0) to (1, 1) passes the wall at (1, 0), so the optimal length is 2, not sqrt(2). The
+        # second scenario goes around that wall, and ends with a diagonal move up to (3, 0).
+        with open(os.path.join(directory, 'corner.map'), 'w') as file:
+            file.write('type octile\nheight 4\nwidth 4\nmap\n.@..\n....\n.T@.\n....\n')
+        with open(os.path.join(directory, 'corner.map.scen'), 'w') as file:
+            file.write('version 1\n')
+            file.write('0\tmaps/corner.map\t4\t4\t0\t0\t1\t1\t2.00000000\n')
+            file.write('1\tmaps/corner.map\t4\t4\t0\t0\t3\t0\t' + '{:.8f}'.format(3 + 2 ** 0.5) + '\n')
+        results = main([os.path.join(directory, 'corner.map.scen'), '--engines', 'GridAStar', 'AStar'])
+        print('Corner scenarios optimal:', all(result['optimal'] for result in results))
+
+        # Scenarios on a generated map, with the optimal lengths from Dijkstra in the test.
+        int_map = generate_map('rooms', 64, 48, seed=3)
+        write_movingai_map(os.path.join(directory, 'rooms.map'), int_map)
+        rng = np.random.default_rng(0)
+        with open(os.path.join(directory, 'rooms.map.scen'), 'w') as file:
+            file.write('version 1\n')
+            for i in range(30):
+                start_pos, goal_pos = random_free_pos(int_map, rng), random_free_pos(int_map, rng)
+                length = octile_dijkstra(int_map, start_pos)[goal_pos[0], goal_pos[1]]
+                if length == np.inf:
+                    continue
+                file.write('\t'.join(str(value) for value in (int(length // 4), 'rooms.map', 48, 64, start_pos[1],
+                                                             start_pos[0], goal_pos[1], goal_pos[0]))
+                           + '\t{:.8f}\n'.format(length))
+        results = main([os.path.join(directory, 'rooms.map.scen'), '--engines', 'GridAStar', 'AStar'])
+        print('Generated scenarios optimal:', all(result['optimal'] for result in results),
+              'binary map made:', os.path.exists(os.path.join(directory, 'rooms.map.bin')))
+
+# Dijkstra with octile moves and no corner cutting, written without GridAStar.
+def octile_dijkstra(int_map, start_pos):
+    from heapq import heappush, heappop
+    height, width = int_map.shape
+    distances = np.full(int_map.shape, np.inf)
+    distances[start_pos[0], start_pos[1]] = 0
+    open_heap = [(0.0, start_pos[0], start_pos[1])]
+    while open_heap:
+        distance, x, y = heappop(open_heap)
+        if distance > distances[x, y]:
+            continue
+        for i in (-1, 0, 1):
+            for j in (-1, 0, 1):
+                if (i, j) == (0, 0) or not (0 <= x + i < height and 0 <= y + j < width) or int_map[x + i, y + j] == -1:
+                    continue
+                if i != 0 and j != 0 and (int_map[x + i, y] == -1 or int_map[x, y + j] == -1):
+                    continue
+                next_distance = distance + (2 ** 0.5 if i != 0 and j != 0 else 1)
+                if next_distance < distances[x + i, y + j]:
+                    distances[x + i, y + j] = next_distance
+                    heappush(open_heap, (next_distance, x + i, y + j))
+    return distances
+
+if __name__ == "__main__":
+    main()
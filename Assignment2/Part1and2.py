@@ -8,13 +8,19 @@ func_heuristic(state):              Function for estimating the remainding cost
 func_adjacent_states(state):         Function for generating the successing nodes for a given state.
 func_goal_evaluate(state):          Function returns True if the state is the goal, else False.
 func_cost(state, next_state):       Function returning the cost of going from one state to another. Set to 1 by default.
+
+main and main2 save the paths as images in output_directory, Output by default, which is not tracked by git. The images
+in Maps are the references MapRender.py is tested against, and are not written by this file.
 """
 
 #*************************
 #       Imports
 #*************************
+import os
+
 from Map import Map_Obj
 from AStar import AStar, Node
+from MapRender import path_image, save_image, show_image
 
 
 #*************************
@@ -27,6 +33,17 @@ def walking_distance(state):
     x_goal, y_goal = state[0].get_goal_pos()[0], state[0].get_goal_pos()[1]
     return abs(x_current - x_goal) + abs(y_current - y_goal)
 
+# The heuristic for searching backwards from the goal, the walking distance to the start.
+def walking_distance_to_start(state):
+    x_start, y_start = state[0].get_start_pos()[0], state[0].get_start_pos()[1]
+    return abs(state[1] - x_start) + abs(state[2] - y_start)
+
+# A heuristic function for when diagonal moves are allowed. A diagonal step costs sqrt(2).
+def diagonal_distance(state):
+    x_distance = abs(state[1] - state[0].get_goal_pos()[0])
+    y_distance = abs(state[2] - state[0].get_goal_pos()[1])
+    return max(x_distance, y_distance) + (2 ** 0.5 - 1) * min(x_distance, y_distance)
+
 # Returns all nodes adjacent to the given node.
 def generate_adjacent_states_dagonal(state):
     states = []
@@ -62,17 +79,28 @@ def find_cost(state, next_state):
             return next_state[0].get_cell_value([next_state[1], next_state[2]])
     print('Can find cost. The nodes are not adjacent.')
 
-def visualise_path_map(state_map, path):
-    for position in path[1: len(path)]:
-        state_map.replace_map_values(position, 5, state_map.get_goal_pos())
-    state_map.show_map()
+# Returns the cost of moving to a position when diagonal moves are allowed. Diagonal moves cost sqrt(2) times the cell.
+def find_cost_diagonal(state, next_state):
+    cost = next_state[0].get_cell_value([next_state[1], next_state[2]])
+    if state[1] != next_state[1] and state[2] != next_state[2]:
+        return cost * 2 ** 0.5
+    return cost
+
+# Draws the path on the map without changing it. Saves the image if a file is given, and shows it otherwise.
+def visualise_path_map(state_map, path, file_path=None):
+    image = path_image(state_map, path)
+    if file_path is None:
+        show_image(image)
+    else:
+        save_image(image, file_path)
 
 #*************************
 #          Main
 #*************************
 
 # Main for part 1
-def main():
+def main(output_directory='Output'):
+    os.makedirs(output_directory, exist_ok=True)
 
     # Task 1
     map = Map_Obj(1)
@@ -86,7 +114,7 @@ def main():
     print('Positions in the path of task 1:')
     print(pos_path)
 
-    visualise_path_map(map, pos_path)
+    visualise_path_map(map, pos_path, os.path.join(output_directory, 'task1.png'))
 
     # Task 2
     map = Map_Obj(2)
@@ -100,10 +128,11 @@ def main():
     print('Positions in the path of task 2:')
     print(pos_path)
 
-    visualise_path_map(map, pos_path)
+    visualise_path_map(map, pos_path, os.path.join(output_directory, 'task2.png'))
 
 # Main for Part 2
-def main2():
+def main2(output_directory='Output'):
+    os.makedirs(output_directory, exist_ok=True)
 
     # Task 3
 
@@ -118,7 +147,7 @@ def main2():
     print('Positions in the path of task 3:')
     print(pos_path)
 
-    visualise_path_map(map, pos_path)
+    visualise_path_map(map, pos_path, os.path.join(output_directory, 'task3.png'))
 
     # Task 4
 
@@ -133,7 +162,7 @@ def main2():
     print('Positions in the path of task 3:')
     print(pos_path)
 
-    visualise_path_map(map, pos_path)
+    visualise_path_map(map, pos_path, os.path.join(output_directory, 'task4.png'))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,199 @@
+"""
+Contains a cache of shortest paths in front of GridAStar, for workloads where the same queries come again and again.
+
+A path is kept by (map, version, start, goal, cost model), where the map is the Map_Obj itself, so two maps with the
+same cells are still different maps, and the cost model is whether diagonal moves are allowed. GridAStar gives the same
+paths as AStar with the functions in Part1and2.py. The paths used least recently are thrown away when there are more
+than max_paths.
+
+When the map has changed, the cache reads the changes since the version its paths were found at from the changes log
+of the map, and moves the paths that are still the shortest on to the new version:
+- A cell that costs more, or is now a wall, only makes the paths through it worse. The paths through the cell are
+  thrown away, and every other path is still the shortest.
+- A cell that costs less, or is no longer a wall, can give a shorter path to queries that did not go through it. Every
+  move costs at least 1, so a path through the cell costs at least the distance from the start to the cell plus the
+  distance from the cell to the goal. The paths that cost more than that are thrown away, with the paths through the
+  cell, since the cost of those has changed.
+
+PathCache takes the following input:
+max_paths:                          The most paths that are kept.
+
+Behaviour:
+path(map_obj, start_pos=None, goal_pos=None, diagonal=False):
+                                    Returns the shortest path as a list of positions [x, y], or None if there is no
+                                    path. The start and goal of the map are used if no positions are given.
+cost(map_obj, start_pos=None, goal_pos=None, diagonal=False):
+                                    Returns the cost of the path, or None if there is no path.
+hits:                               Amount of queries answered from the cache.
+misses:                             Amount of queries that had to be searched.
+evictions:                          Amount of paths thrown away because there were more than max_paths.
+invalidations:                      Amount of paths thrown away because the map changed.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from collections import OrderedDict
+from math import sqrt, inf
+
+from GridAStar import GridAStar
+
+
+#*************************
+#   Path cache as class
+#*************************
+class PathCache():
+
+# Constructor
+    def __init__(self, max_paths=1000):
+
+        self.max_paths = max_paths
+        # The paths by (map, start, goal, diagonal), with the one used last at the end. Every path is kept with its
+        # cost, and is the shortest at the version of the map in versions.
+        self.paths = OrderedDict()
+        self.versions = {}
+        # The keys of the paths through every cell, by (map, x, y).
+        self.through = {}
+        # A GridAStar for every map and cost model, with the version its costs were read at.
+        self.grids = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # Returns the path from start_pos to goal_pos.
+    def path(self, map_obj, start_pos=None, goal_pos=None, diagonal=False):
+        return self.lookup(map_obj, start_pos, goal_pos, diagonal)[0]
+
+    # Returns the cost of the path from start_pos to goal_pos.
+    def cost(self, map_obj, start_pos=None, goal_pos=None, diagonal=False):
+        return self.lookup(map_obj, start_pos, goal_pos, diagonal)[1]
+
+
+# Helping methods
+
+    # Returns the path and its cost from the cache, or from a new search.
+    def lookup(self, map_obj, start_pos, goal_pos, diagonal):
+        start_pos = map_obj.get_start_pos() if start_pos is None else start_pos
+        goal_pos = map_obj.get_goal_pos() if goal_pos is None else goal_pos
+        self.catch_up(map_obj)
+        key = (map_obj, int(start_pos[0]), int(start_pos[1]), int(goal_pos[0]), int(goal_pos[1]), diagonal)
+        result = self.paths.get(key)
+        if result is not None:
+            self.hits += 1
+            self.paths.move_to_end(key)
+            return result
+
+        self.misses += 1
+        grid, version = self.grids.get((map_obj, diagonal), (None, None))
+        if grid is None:
+            grid = GridAStar(map_obj, diagonal)
+        elif version != map_obj.version:
+            grid.update_costs()
+        self.grids[(map_obj, diagonal)] = (grid, map_obj.version)
+        result = (grid.run(start_pos, goal_pos), grid.cost)
+        self.paths[key] = result
+        for x, y in result[0] or ():
+            self.through.setdefault((map_obj, x, y), set()).add(key)
+        if len(self.paths) > self.max_paths:
+            self.evictions += 1
+            self.remove(next(iter(self.paths)))
+        return result
+
+    # Goes through the changes to the map since the paths were checked, and throws away the paths that may no longer
+    # be the shortest.
+    def catch_up(self, map_obj):
+        version = self.versions.get(map_obj, map_obj.version)
+        for pos, old_value, new_value in map_obj.changes[version:map_obj.version]:
+            if verbose: print('Cell', pos, 'changed from', old_value, 'to', new_value)
+            stale = set(self.through.get((map_obj, pos[0], pos[1]), ()))
+            if old_value == -1 or (new_value != -1 and new_value < old_value):
+                for key in self.paths:
+                    if key[0] is map_obj and self.through_cost(key, pos) < self.known_cost(key):
+                        stale.add(key)
+            self.invalidations += len(stale)
+            for key in stale:
+                self.remove(key)
+        self.versions[map_obj] = map_obj.version
+
+    # The cost of the path of a key, where no path costs inf, since a cell that is no longer a wall may give one.
+    def known_cost(self, key):
+        cost = self.paths[key][1]
+        return inf if cost is None else cost
+
+    # The lowest cost a path from the start to the goal of the key can have if it goes through pos.
+    def through_cost(self, key, pos):
+        map_obj, start_x, start_y, goal_x, goal_y, diagonal = key
+        return distance(start_x, start_y, pos[0], pos[1], diagonal) + distance(pos[0], pos[1], goal_x, goal_y, diagonal)
+
+    # Throws away the path of a key.
+    def remove(self, key):
+        path, cost = self.paths.pop(key)
+        for x, y in path or ():
+            keys = self.through[(key[0], x, y)]
+            keys.discard(key)
+            if not keys:
+                del self.through[(key[0], x, y)]
+
+
+
+#*************************
+#       Functions
+#*************************
+
+# The lowest cost between two cells when every move costs at least 1. Diagonal moves cost at least sqrt(2).
+def distance(x, y, other_x, other_y, diagonal):
+    d_x, d_y = abs(x - other_x), abs(y - other_y)
+    if diagonal:
+        return max(d_x, d_y) + (sqrt(2) - 1) * min(d_x, d_y)
+    return d_x + d_y
+
+
+
+#*************************
+#         Test
+#*************************
+import numpy as np
+
+from Map import Map_Obj
+
+# Checks that hits give the same paths as a new search, also after cells on and off the paths have changed.
+def func_test():
+    rng = np.random.default_rng(0)
+    map_obj = Map_Obj(4)
+    free = np.argwhere(map_obj.int_map != -1).tolist()
+    queries = [(free[rng.integers(len(free))], free[rng.integers(len(free))]) for i in range(20)]
+    path_cache = PathCache(max_paths=15)
+    same_costs = True
+    for change in range(10):
+        for start_pos, goal_pos in queries + queries[:10]:
+            grid_a_star = GridAStar(map_obj)
+            grid_a_star.run(start_pos, goal_pos)
+            same_costs = same_costs and path_cache.cost(map_obj, start_pos, goal_pos) == grid_a_star.cost
+        # Change a few cells, both up and down in cost.
+        for i in range(3):
+            pos = free[rng.integers(len(free))]
+            map_obj.replace_map_values(pos, int(rng.integers(1, 5)), map_obj.get_goal_pos())
+        pos = free[rng.integers(len(free))]
+        map_obj.set_cell_value(pos, -1, str_map=False)
+    print('Same costs as GridAStar:', same_costs, 'hits:', path_cache.hits, 'misses:', path_cache.misses,
+          'evictions:', path_cache.evictions, 'invalidations:', path_cache.invalidations)
+
+    # A change on the path throws it away, a change far from it does not.
+    map_obj = Map_Obj(3)
+    path_cache = PathCache()
+    path = path_cache.path(map_obj)
+    map_obj.replace_map_values([0, 0], 2, map_obj.get_goal_pos())
+    kept = path_cache.path(map_obj) is path and path_cache.hits == 1
+    map_obj.replace_map_values(path[len(path) // 2], 4, map_obj.get_goal_pos())
+    path_cache.path(map_obj)
+    print('Kept after a change off the path:', kept, 'searched again after a change on the path:',
+          path_cache.misses == 2 and path_cache.invalidations == 1)
+
+if __name__ == "__main__":
+    func_test()
@@ -0,0 +1,246 @@
+"""
+Contains instrumentation of a search, counting and timing what it does without changing the search itself.
+
+SearchStats is attached to an AStar, or a search built on it like AnytimeAStar, after it is made and before it is run.
+It replaces the functions and methods of that one object with wrappers that count the calls and add up their time, the
+same way the functions would be replaced by hand. Nothing in AStar knows about it, so a search without a SearchStats
+attached runs exactly as before, and costs nothing extra. detach() puts the original functions back.
+
+What is counted:
+expansions:                         Nodes whose successors were generated, the calls to expand.
+generated:                          Successor states given by func_adjacent_states.
+reopenings:                         Calls to propagate_path_improvements, when an expanded node gets a cheaper path.
+heuristic_calls, cost_calls, goal_tests:
+                                    Calls to func_heuristic, func_cost and func_goal_evaluate after the stats were
+                                    attached. The heuristic of the start is computed when the search is made, and is
+                                    not counted.
+peak_open, peak_closed:             The largest amount of open and closed nodes after an expansion.
+times:                              Seconds spent in every phase: run, expand, successors, heuristic, cost, goal test
+                                    and path. The phases inside expand are also part of expand, and expand is part of
+                                    run. Only taken if timing is True.
+
+SearchStats takes the following input:
+search:                             The AStar to attach to.
+timing:                             If True the time of every phase is taken. Costs two clock reads per call.
+trace:                              If True the state of every expanded node is kept in the order they were expanded.
+
+Behaviour:
+as_dict():                          Returns the counters, and the times if taken, as a dict.
+expansion_trace(func_position=None):
+                                    Returns the expansion order as a numpy array with one row per expansion. By default
+                                    the state is taken to be (Map_Obj, x, y), and the rows are [x, y].
+expansion_order(shape, func_position=None):
+                                    Returns an array shaped like the map with the number of the expansion of every cell,
+                                    starting at 0, and -1 for cells that were not expanded. Can be drawn with
+                                    heatmap_image in MapRender.py.
+detach():                           Gives the search its own functions and methods back.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+import time
+
+import numpy as np
+
+
+#*************************
+#  Search stats as class
+#*************************
+class SearchStats():
+
+# Constructor wraps the functions and methods of the search.
+    def __init__(self, search, timing=True, trace=False):
+
+        self.search = search
+        self.timing = timing
+        self.trace = [] if trace else None
+        self.expansions = 0
+        self.generated = 0
+        self.reopenings = 0
+        self.heuristic_calls = 0
+        self.cost_calls = 0
+        self.goal_tests = 0
+        self.peak_open = search.open.size()
+        self.peak_closed = len(search.closed)
+        self.times = {phase: 0.0 for phase in ('run', 'expand', 'successors', 'heuristic', 'cost', 'goal test', 'path')}
+
+        # The originals, to be given back by detach. The functions are attributes of the search, the methods are taken
+        # from its class and shadowed by attributes on the object.
+        self.originals = {name: getattr(search, name) for name in ('func_heuristic', 'func_adjacent_states',
+                                                                   'func_cost', 'func_goal_evaluate')}
+        self.wrap_functions()
+        self.wrap_methods()
+
+    # Returns the counters and times.
+    def as_dict(self):
+        stats = {'expansions': self.expansions, 'generated': self.generated, 'reopenings': self.reopenings,
+                 'heuristic_calls': self.heuristic_calls, 'cost_calls': self.cost_calls,
+                 'goal_tests': self.goal_tests, 'peak_open': self.peak_open, 'peak_closed': self.peak_closed}
+        if self.timing:
+            stats.update(('time ' + phase, seconds) for phase, seconds in self.times.items())
+        return stats
+
+    # Returns the expanded positions in the order they were expanded.
+    def expansion_trace(self, func_position=None):
+        if self.trace is None:
+            raise ValueError('The stats were made without trace=True.')
+        func_position = (lambda state: (state[1], state[2])) if func_position is None else func_position
+        return np.array([func_position(state) for state in self.trace], dtype=np.int64).reshape(-1, 2)
+
+    # Returns the number of the expansion of every cell, or -1.
+    def expansion_order(self, shape, func_position=None):
+        trace = self.expansion_trace(func_position)
+        order = np.full(shape, -1, dtype=np.int64)
+        # A cell expanded more than once, like in AnytimeAStar, gets its first number.
+        order[trace[::-1, 0], trace[::-1, 1]] = np.arange(len(trace))[::-1]
+        return order
+
+    # Gives the search its own functions and methods back.
+    def detach(self):
+        for name, function in self.originals.items():
+            setattr(self.search, name, function)
+        for name in ('expand', 'propagate_path_improvements', 'run', 'find_path'):
+            self.search.__dict__.pop(name, None)
+
+
+# Helping methods
+
+    # Wraps the functions given to the search.
+    def wrap_functions(self):
+        search, originals, times, timing = self.search, self.originals, self.times, self.timing
+        func_heuristic, func_adjacent_states = originals['func_heuristic'], originals['func_adjacent_states']
+        func_cost, func_goal_evaluate = originals['func_cost'], originals['func_goal_evaluate']
+        clock = time.perf_counter
+
+        def heuristic(state):
+            self.heuristic_calls += 1
+            if not timing:
+                return func_heuristic(state)
+            start = clock()
+            result = func_heuristic(state)
+            times['heuristic'] += clock() - start
+            return result
+
+        def adjacent_states(state):
+            if not timing:
+                states = func_adjacent_states(state)
+            else:
+                start = clock()
+                states = func_adjacent_states(state)
+                times['successors'] += clock() - start
+            self.generated += len(states)
+            return states
+
+        def cost(state, next_state):
+            self.cost_calls += 1
+            if not timing:
+                return func_cost(state, next_state)
+            start = clock()
+            result = func_cost(state, next_state)
+            times['cost'] += clock() - start
+            return result
+
+        def goal_evaluate(state):
+            self.goal_tests += 1
+            if not timing:
+                return func_goal_evaluate(state)
+            start = clock()
+            result = func_goal_evaluate(state)
+            times['goal test'] += clock() - start
+            return result
+
+        search.func_heuristic, search.func_adjacent_states = heuristic, adjacent_states
+        search.func_cost, search.func_goal_evaluate = cost, goal_evaluate
+
+    # Wraps the methods of the search, on the object only.
+    def wrap_methods(self):
+        search, times, timing, trace = self.search, self.times, self.timing, self.trace
+        expand, propagate = search.expand, search.propagate_path_improvements
+        run, find_path = search.run, search.find_path
+        clock = time.perf_counter
+
+        def expand_node(current_node):
+            self.expansions += 1
+            if trace is not None:
+                trace.append(current_node.state)
+            if not timing:
+                successors = expand(current_node)
+            else:
+                start = clock()
+                successors = expand(current_node)
+                times['expand'] += clock() - start
+            self.peak_open = max(self.peak_open, search.open.size())
+            self.peak_closed = max(self.peak_closed, len(search.closed))
+            return successors
+
+        def propagate_path_improvements(parent_node):
+            self.reopenings += 1
+            return propagate(parent_node)
+
+        def run_search(*args, **kwargs):
+            start = clock()
+            result = run(*args, **kwargs)
+            times['run'] += clock() - start
+            return result
+
+        def find_search_path(*args, **kwargs):
+            start = clock()
+            result = find_path(*args, **kwargs)
+            times['path'] += clock() - start
+            return result
+
+        search.expand, search.propagate_path_improvements = expand_node, propagate_path_improvements
+        if timing:
+            search.run, search.find_path = run_search, find_search_path
+
+
+
+#*************************
+#         Test
+#*************************
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+
+# Checks the counters against the search, that the path is the same with the stats attached, and that detach gives
+# the search back its own methods.
+def func_test():
+    for task in (1, 3, 4):
+        map_obj = Map_Obj(task)
+        start_state = (map_obj, *map_obj.get_start_pos())
+        functions = (Part1and2.walking_distance, Part1and2.generate_adjacent_states, Part1and2.goal_evaluate,
+                     Part1and2.find_cost)
+        plain = AStar(start_state, *functions)
+        plain_path = [node.state for node in plain.run()]
+
+        a_star = AStar(start_state, *functions)
+        search_stats = SearchStats(a_star, trace=True)
+        path = [node.state for node in a_star.run()]
+        stats = search_stats.as_dict()
+        order = search_stats.expansion_order(map_obj.int_map.shape)
+        print('Task', task, 'same path:', path == plain_path,
+              'expansions match closed:', stats['expansions'] == len(a_star.closed) - 1,
+              'generated:', stats['generated'], 'cost calls:', stats['cost_calls'],
+              'reopenings:', stats['reopenings'], 'peak open:', stats['peak_open'],
+              'trace in order:', order[start_state[1], start_state[2]] == 0 and order.max() == stats['expansions'] - 1,
+              'run ms: {:.2f}'.format(1e3 * stats['time run']))
+
+    # A heuristic that is not consistent makes expanded nodes get cheaper paths later.
+    map_obj = Map_Obj(4)
+    a_star = AStar((map_obj, *map_obj.get_start_pos()), lambda state: 3 * ((7 * state[1] + 13 * state[2]) % 5),
+                   Part1and2.generate_adjacent_states, Part1and2.goal_evaluate, Part1and2.find_cost)
+    search_stats = SearchStats(a_star, timing=False)
+    a_star.run()
+    print('Reopenings with an inconsistent heuristic, expect 11:', search_stats.reopenings, 'times taken:',
+          'time run' in search_stats.as_dict())
+
+    search_stats.detach()
+    print('Detached:', 'expand' not in a_star.__dict__ and a_star.func_cost is Part1and2.find_cost)
+
+if __name__ == "__main__":
+    func_test()
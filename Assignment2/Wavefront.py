@@ -0,0 +1,171 @@
+"""
+Contains distance fields computed with whole array numpy operations instead of a search over one cell at a time.
+
+On maps where every cell costs the same, the distance is found by a wavefront (brushfire): the cells reached in step n
+are the free cells next to the cells reached in step n - 1 that are not reached before. Every step is a few shifted
+array operations over the whole map.
+
+With different costs the field is found by relaxation sweeps. In every sweep each cell gets the lowest of its own
+distance and the distance of a neighbour plus the cost of the move, for all neighbours at once. The sweeps stop when
+nothing changes. Like in find_cost, a move costs the value of the cell that is entered, and diagonal moves cost sqrt(2)
+times that. The fields are the costs from the sources, or to the sources if reverse is True.
+
+Many fields can be computed at the same time. They are then stacked along a first axis, and every operation works on
+all of them.
+
+Behaviour:
+distance_field(int_map, sources, diagonal=False, reverse=False):
+                                            Returns the cost from the closest of the sources to every cell. Walls and
+                                            cells that can not be reached are inf. The wavefront is used when all free
+                                            cells cost the same and there are no diagonal moves, and sweeps otherwise.
+batch_fields(int_map, goals, diagonal=False, reverse=True):
+                                            Returns one field for every goal, computed together, as an array shaped
+                                            (goals, height, width). By default the cost to the goal is given.
+wavefront(int_map, sources_per_field):      The wavefront, giving the amount of steps from the sources.
+relaxation_sweeps(int_map, sources_per_field, diagonal=False, reverse=False):
+                                            The relaxation sweeps.
+"""
+#*************************
+# Global static variables
+#*************************
+verbose = False  # Should be used during debugging.
+
+#*************************
+#        Imports
+#*************************
+from math import inf, sqrt
+
+import numpy as np
+
+
+#*************************
+#       Functions
+#*************************
+
+# Returns the cost from the closest source to every cell.
+def distance_field(int_map, sources, diagonal=False, reverse=False):
+    return compute_fields(int_map, [sources], diagonal, reverse)[0]
+
+# Returns a field for every goal, with a single source each.
+def batch_fields(int_map, goals, diagonal=False, reverse=True):
+    return compute_fields(int_map, [[goal] for goal in goals], diagonal, reverse)
+
+# Chooses between the wavefront and the sweeps. With one cost c for every free cell, n steps cost n * c.
+def compute_fields(int_map, sources_per_field, diagonal, reverse):
+    int_map = np.asarray(int_map)
+    costs = np.unique(int_map[int_map != -1])
+    if not diagonal and len(costs) == 1:
+        return wavefront(int_map, sources_per_field) * float(costs[0])
+    return relaxation_sweeps(int_map, sources_per_field, diagonal, reverse)
+
+# Returns the amount of steps from the sources to every cell, with one field for every list of sources.
+def wavefront(int_map, sources_per_field):
+    free = np.asarray(int_map) != -1
+    distances = start_fields(free.shape, sources_per_field)
+    reached = distances == 0
+    frontier = reached.copy()
+    step = 0
+    while frontier.any():
+        step += 1
+        grown = np.zeros_like(frontier)
+        for i, j in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            grown |= shifted(frontier, i, j, False)
+        frontier = grown & free & ~reached
+        distances[frontier] = step
+        reached |= frontier
+        if verbose: print('Step', step, 'reached', int(frontier.sum()), 'cells')
+    return distances
+
+# Returns the cost from the sources to every cell, or from every cell to the sources if reverse is True.
+def relaxation_sweeps(int_map, sources_per_field, diagonal=False, reverse=False):
+    int_map = np.asarray(int_map)
+    walls = int_map == -1
+    costs = np.where(walls, inf, int_map).astype(np.float64)
+    moves = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if (i != 0 or j != 0) and (diagonal or i == 0 or j == 0)]
+
+    # The cost of every move, as an array for every direction. Going forward into a cell costs the cell itself, going
+    # backwards the cost is of the neighbour the move comes from.
+    move_costs = []
+    for i, j in moves:
+        factor = sqrt(2) if i != 0 and j != 0 else 1
+        move_costs.append(factor * (shifted(costs, i, j, inf) if reverse else costs))
+
+    distances = start_fields(int_map.shape, sources_per_field)
+    distances[:, walls] = inf
+    sweeps = 0
+    while True:
+        sweeps += 1
+        relaxed = distances.copy()
+        for (i, j), move_cost in zip(moves, move_costs):
+            np.minimum(relaxed, shifted(distances, i, j, inf) + move_cost, out=relaxed)
+        relaxed[:, walls] = inf
+        if np.array_equal(relaxed, distances):
+            if verbose: print('Sweeps:', sweeps)
+            return distances
+        distances = relaxed
+
+# Returns an array with inf everywhere except at the sources of every field, which are 0.
+def start_fields(shape, sources_per_field):
+    distances = np.full((len(sources_per_field),) + tuple(shape), inf)
+    for field, sources in enumerate(sources_per_field):
+        for source in sources:
+            distances[field, source[0], source[1]] = 0
+    return distances
+
+# Returns the array moved so every cell holds the value of its neighbour at offset (-i, -j) on the last two axes.
+# Cells moved in from outside the map get fill.
+def shifted(array, i, j, fill):
+    result = np.full_like(array, fill)
+    height, width = array.shape[-2:]
+    result[..., max(i, 0):height + min(i, 0), max(j, 0):width + min(j, 0)] = \
+        array[..., max(-i, 0):height + min(-i, 0), max(-j, 0):width + min(-j, 0)]
+    return result
+
+
+
+#*************************
+#         Test
+#*************************
+import Part1and2
+from Map import Map_Obj
+from AStar import AStar
+
+# Returns the cost AStar finds from start_pos to goal_pos with the functions in Part1and2.py.
+def a_star_cost(map_obj, start_pos, goal_pos, diagonal):
+    map_obj.goal_pos = goal_pos
+    if diagonal:
+        functions = (Part1and2.diagonal_distance, Part1and2.generate_adjacent_states_dagonal, Part1and2.goal_evaluate,
+                     Part1and2.find_cost_diagonal)
+    else:
+        functions = (Part1and2.walking_distance, Part1and2.generate_adjacent_states, Part1and2.goal_evaluate,
+                     Part1and2.find_cost)
+    node_path = AStar((map_obj, *start_pos), *functions).run()
+    return inf if node_path is None else node_path[-1].g_cost
+
+# Checks the fields against AStar from random cells, in both directions, with one and with several sources.
+def func_test():
+    rng = np.random.default_rng(0)
+    for task in (1, 2, 3, 4):
+        map_obj = Map_Obj(task)
+        int_map = map_obj.int_map
+        free = np.argwhere(int_map != -1).tolist()
+        for diagonal in (False, True):
+            same_costs = True
+            sources = [free[rng.integers(len(free))] for i in range(3)]
+            forward = distance_field(int_map, sources[:1], diagonal)
+            backward = distance_field(int_map, sources[:1], diagonal, reverse=True)
+            several = distance_field(int_map, sources, diagonal)
+            batch = batch_fields(int_map, sources, diagonal)
+            for i in range(5):
+                pos = free[rng.integers(len(free))]
+                same_costs = same_costs and \
+                    abs(forward[pos[0], pos[1]] - a_star_cost(map_obj, sources[0], pos, diagonal)) < 1e-9 and \
+                    abs(backward[pos[0], pos[1]] - a_star_cost(map_obj, pos, sources[0], diagonal)) < 1e-9 and \
+                    abs(several[pos[0], pos[1]] - min(a_star_cost(map_obj, source, pos, diagonal)
+                                                      for source in sources)) < 1e-9
+            same_costs = same_costs and np.allclose(batch[0], backward) and \
+                np.allclose(batch[1], distance_field(int_map, sources[1:2], diagonal, reverse=True))
+            print('Task', task, 'diagonal:', diagonal, 'same costs as AStar:', same_costs)
+
+if __name__ == "__main__":
+    func_test()